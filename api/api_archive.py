@@ -7,16 +7,22 @@
 from common import has_file_permission
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import Query
 from fastapi.responses import JSONResponse
 from fastapi_utils import cbv
 from httpx import AsyncClient
+from redis.asyncio import Redis
 
 from app.auth import jwt_required
 from app.components.user.models import CurrentUser
+from app.dependencies import get_redis
 from app.logger import logger
 from config import ConfigClass
 from models.api_response import APIResponse
 from models.api_response import EAPIResponseCode
+from services.archive import archive_listing_cache
+from services.archive import paginate_listing
+from services.meta import get_item_version
 
 router = APIRouter(tags=['Archive'])
 
@@ -24,12 +30,19 @@ router = APIRouter(tags=['Archive'])
 @cbv.cbv(router)
 class Archive:
     current_identity: CurrentUser = Depends(jwt_required)
+    redis: Redis = Depends(get_redis)
 
     @router.get(
         '/archive',
         summary='Get a zip preview given file id',
     )
-    async def get(self, file_id: str):
+    async def get(self, file_id: str, page: int = Query(0, ge=0), page_size: int | None = Query(None, gt=0)):
+        """Return the listing of zip archive content.
+
+        Listings are cached by file id and version, so the paging over the top level entries of large archives does
+        not repeat the listing in the dataops service.
+        """
+
         logger.info('GET archive called in bff')
         api_response = APIResponse()
         async with AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
@@ -46,10 +59,26 @@ class Archive:
             api_response.set_result('Permission denied')
             return api_response.json_response()
 
-        try:
-            async with AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
-                response = await client.get(ConfigClass.DATAOPS_SERVICE + 'archive', params={'file_id': file_id})
-        except Exception as e:
-            logger.info(f'Error calling dataops gr: {e}')
-            return JSONResponse(content=response.json(), status_code=response.status_code)
-        return JSONResponse(content=response.json(), status_code=response.status_code)
+        version = get_item_version(file_response)
+        listing = await archive_listing_cache.get(self.redis, file_id, version) if version else None
+        if listing is None:
+            try:
+                async with AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
+                    response = await client.get(ConfigClass.DATAOPS_SERVICE + 'archive', params={'file_id': file_id})
+            except Exception as e:
+                logger.info(f'Error calling dataops gr: {e}')
+                api_response.set_code(EAPIResponseCode.internal_error)
+                api_response.set_result(f'Error calling dataops gr: {e}')
+                return api_response.json_response()
+
+            if response.status_code != 200:
+                return JSONResponse(content=response.json(), status_code=response.status_code)
+
+            listing = response.json()
+            if version:
+                await archive_listing_cache.set(self.redis, file_id, version, listing)
+
+        if page_size is not None:
+            listing = paginate_listing(listing, page, page_size)
+
+        return JSONResponse(content=listing, status_code=200)
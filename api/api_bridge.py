@@ -6,7 +6,6 @@
 
 from typing import Annotated
 
-import httpx
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi.responses import JSONResponse
@@ -15,7 +14,6 @@ from fastapi_utils import cbv
 from app.auth import jwt_required
 from app.components.user.models import CurrentUser
 from app.logger import logger
-from config import ConfigClass
 from models.api_response import APIResponse
 from models.api_response import EAPIResponseCode
 from models.bridge import AddVisits
@@ -54,16 +52,5 @@ class Bridge:
 
             return res.json_response()
 
-        if entity == 'project':
-            url = f'{ConfigClass.PROJECT_SERVICE}/v1/projects/'
-        else:
-            url = f'{ConfigClass.DATASET_SERVICE}datasets/'
-
-        async with httpx.AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
-            response = await client.get(url, params={'code_any': ','.join(last_codes)})
-        content = response.json()
-
-        if response.status_code == 200:
-            content['result'] = await bridge_service.sort_result_by_visit_codes_order(last_codes, content['result'])
-
-        return JSONResponse(content=content, status_code=response.status_code)
+        status_code, content = await bridge_service.hydrate_visits(entity, last_codes)
+        return JSONResponse(content=content, status_code=status_code)
@@ -4,8 +4,9 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from typing import Any
+
 import jwt as pyjwt
-import requests
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import Request
@@ -15,6 +16,8 @@ from httpx import AsyncClient
 from starlette.responses import Response
 
 from app.auth import invalidate_cache
+from app.components.jobs import JobContext
+from app.components.jobs import job_runner
 from app.logger import logger
 from config import ConfigClass
 from models.models_item import ItemStatus
@@ -27,6 +30,71 @@ from services.project.client import get_project_service_client
 
 router = APIRouter(tags=['User Activate'])
 
+NAME_FOLDER_BATCH_SIZE = 50
+
+
+async def create_name_folders(folder_name: str, project_code_list: list[str]) -> None:
+    """Create name folders of the user in greenroom and core of every listed project."""
+
+    try:
+        logger.info(
+            f'bulk creating namespace folder in greenroom \
+                and core for user : {folder_name} under {project_code_list}'
+        )
+        zone_list = [ConfigClass.GREENROOM_ZONE_LABEL, ConfigClass.CORE_ZONE_LABEL]
+
+        folders = []
+        for zone in zone_list:
+            for project_code in project_code_list:
+                folders.append(
+                    {
+                        'name': folder_name,
+                        'zone': 0 if zone.lower() == 'greenroom' else 1,
+                        'type': 'name_folder',
+                        'status': ItemStatus.ACTIVE,
+                        'owner': folder_name,
+                        'container_code': project_code,
+                        'container_type': 'project',
+                        'size': 0,
+                        'location_uri': '',
+                        'version': '',
+                    }
+                )
+        payload = {'items': folders, 'skip_duplicates': True}
+        async with AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
+            response = await client.post(ConfigClass.METADATA_SERVICE + 'items/batch/', json=payload)
+        if response.status_code == 200:
+            logger.info(
+                f'In namespace: {zone}, folders bulk created successfully for user: {folder_name} \
+                    under {project_code_list}'
+            )
+        else:
+            error_msg = f'Error calling metadata service for name folder creation: {response.json()}'
+            logger.info(error_msg)
+            raise Exception(error_msg)
+
+    except Exception as error:
+        logger.error(
+            f'Error while trying to create namespace folder for user : {folder_name} under {project_code_list} : \
+                    {error}'
+        )
+        raise error
+
+
+@job_runner.handler('admin-name-folders')
+async def create_admin_name_folders(context: JobContext, payload: dict[str, Any]) -> None:
+    """Create name folders of the platform admin in all projects."""
+
+    project_service_client = get_project_service_client(ConfigClass)
+    project_result = await project_service_client.search()
+    project_code_list = [project.code for project in project_result['result']]
+
+    await context.set_total(len(project_code_list))
+    for start in range(0, len(project_code_list), NAME_FOLDER_BATCH_SIZE):
+        batch = project_code_list[start : start + NAME_FOLDER_BATCH_SIZE]
+        await create_name_folders(payload['username'], batch)
+        await context.advance(len(batch))
+
 
 @cbv.cbv(router)
 class ADUserUpdate:
@@ -77,7 +145,7 @@ class ADUserUpdate:
 
                 if invite_detail['platform_role'] == 'admin':
                     await self.assign_user_role_ad('platform-admin', email=email)
-                    await self.bulk_create_name_folder_admin(username)
+                    await job_runner.submit('admin-name-folders', username, {'username': username})
                 else:
                     if invite_detail['project_code']:
                         await self.add_user_to_project(
@@ -221,61 +289,4 @@ class ADUserUpdate:
         )
 
     async def bulk_create_folder(self, folder_name: str, project_code_list: list):
-        try:
-            logger.info(
-                f'bulk creating namespace folder in greenroom \
-                    and core for user : {folder_name} under {project_code_list}'
-            )
-            zone_list = [ConfigClass.GREENROOM_ZONE_LABEL, ConfigClass.CORE_ZONE_LABEL]
-
-            folders = []
-            for zone in zone_list:
-                for project_code in project_code_list:
-                    folders.append(
-                        {
-                            'name': folder_name,
-                            'zone': 0 if zone.lower() == 'greenroom' else 1,
-                            'type': 'name_folder',
-                            'status': ItemStatus.ACTIVE,
-                            'owner': folder_name,
-                            'container_code': project_code,
-                            'container_type': 'project',
-                            'size': 0,
-                            'location_uri': '',
-                            'version': '',
-                        }
-                    )
-            payload = {'items': folders, 'skip_duplicates': True}
-            response = requests.post(
-                ConfigClass.METADATA_SERVICE + 'items/batch/', json=payload, timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT
-            )
-            async with AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
-                response = await client.post(ConfigClass.METADATA_SERVICE + 'items/batch/', json=payload)
-            if response.status_code == 200:
-                logger.info(
-                    f'In namespace: {zone}, folders bulk created successfully for user: {folder_name} \
-                        under {project_code_list}'
-                )
-            else:
-                error_msg = f'Error calling metadata service for name folder creation: {response.json()}'
-                logger.info(error_msg)
-                raise Exception(error_msg)
-
-        except Exception as error:
-            logger.error(
-                f'Error while trying to create namespace folder for user : {folder_name} under {project_code_list} : \
-                        {error}'
-            )
-            raise error
-
-    async def bulk_create_name_folder_admin(self, username):
-        try:
-            project_code_list = []
-            project_result = await self.project_service_client.search()
-            projects = project_result['result']
-            for project in projects:
-                project_code_list.append(project.code)
-            await self.bulk_create_folder(folder_name=username, project_code_list=project_code_list)
-            return False
-        except Exception as error:
-            logger.error(f'Error while querying Container details : {error}')
+        await create_name_folders(folder_name, project_code_list)
@@ -14,6 +14,7 @@ from fastapi.responses import JSONResponse
 from fastapi_utils import cbv
 from httpx import AsyncClient
 
+from app.auth import invalidate_cache
 from app.auth import jwt_required
 from app.components.exceptions import APIException
 from app.components.user.models import CurrentUser
@@ -73,6 +74,7 @@ class ContainerUser:
         )
         if not is_updated:
             return JSONResponse(content=response, status_code=code)
+        await invalidate_cache(username)
 
         title = f'Project {project.code} Notification: New Invitation'
         template = 'user_actions/invite.html'
@@ -108,6 +110,7 @@ class ContainerUser:
         )
         if not is_updated:
             return JSONResponse(content=response, status_code=code)
+        await invalidate_cache(username)
 
         title = f'Project {project.name} Notification: Role Modified'
         template = 'role/update.html'
@@ -147,6 +150,7 @@ class ContainerUser:
         await keycloak_user_role_delete(
             user_email, f'{project.code}-{project_role}', project.code, self.current_identity['username']
         )
+        await invalidate_cache(username)
 
         async with AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
             response = await client.delete(
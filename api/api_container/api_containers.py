@@ -10,6 +10,8 @@ from fastapi import Request
 from fastapi_utils import cbv
 
 from app.auth import jwt_required
+from app.components.invalidation import InvalidationScope
+from app.components.invalidation import invalidation_bus
 from app.components.user.models import CurrentUser
 from app.logger import logger
 from models.api_response import APIResponse
@@ -96,5 +98,6 @@ class Container:
             del update_data['icon']
 
         result = await project.update(**update_data)
+        await invalidation_bus.publish(InvalidationScope.PROJECT, project.code)
         api_response.set_result(await result.json())
         return api_response.json_response()
@@ -18,7 +18,7 @@ from config import ConfigClass
 from models.api_response import APIResponse
 from models.api_response import EAPIResponseCode
 from models.models_item import ItemStatus
-from services.meta import search_entities
+from services.meta.folder_resolver import folder_path_resolver
 
 router = APIRouter(tags=['Folder Create'])
 
@@ -56,11 +56,8 @@ class FolderCreation:
                 api_response.set_error_msg('Permission denied')
                 return api_response.json_response()
         else:
-            search_parent_path = '/'.join(parent_path.split('/')[:-1])
-            name = ''.join(parent_path.split('/')[-1])
             headers = {'Authorization': request.headers.get('Authorization')}
-            parent_entity = await search_entities(project_code, search_parent_path, zone, headers, name=name)
-            parent_entity = parent_entity[0]
+            parent_entity = await folder_path_resolver.resolve(project_code, zone, parent_path, headers)
             if not parent_entity:
                 api_response.set_code(EAPIResponseCode.forbidden)
                 api_response.set_error_msg('Permission denied')
@@ -90,6 +87,9 @@ class FolderCreation:
             else:
                 payload['parent_path'] = parent_entity['name']
 
-        with httpx.Client(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
-            response = client.post(ConfigClass.METADATA_SERVICE + 'item/', json=payload)
+        async with httpx.AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
+            response = await client.post(ConfigClass.METADATA_SERVICE + 'item/', json=payload)
+        if response.status_code == 200:
+            folder_path_resolver.invalidate(project_code, zone, '/'.join(filter(None, [parent_path, folder_name])))
+
         return JSONResponse(content=response.json(), status_code=response.status_code)
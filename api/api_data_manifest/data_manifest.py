@@ -4,6 +4,8 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from typing import Any
+
 import httpx
 from common import has_file_permission
 from common import has_permission
@@ -15,6 +17,8 @@ from fastapi_utils import cbv
 
 from app.auth import jwt_required
 from app.components.exceptions import APIException
+from app.components.jobs import JobContext
+from app.components.jobs import job_runner
 from app.components.user.models import CurrentUser
 from app.logger import logger
 from config import ConfigClass
@@ -26,6 +30,155 @@ from services.permissions_service.decorators import PermissionsCheck
 
 router = APIRouter(tags=['Attribute Templates'])
 
+TEMPLATE_USAGE_SCOPES = [(zone, status) for zone in [0, 1] for status in [ItemStatus.ACTIVE, ItemStatus.ARCHIVED]]
+
+
+async def is_template_used(
+    manifest_id: str, project_code: str, zone: int, status: ItemStatus, headers: dict[str, str]
+) -> bool:
+    """Check if the attribute template is attached to any file of the project in the zone with the status."""
+
+    params = {
+        'container_code': project_code,
+        'zone': zone,
+        'recursive': True,
+        'status': status,
+        'type': 'file',
+    }
+    async with httpx.AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
+        url = f'{ConfigClass.METADATA_SERVICE}items/search/'
+        response = await client.get(url, params=params, headers=headers)
+
+    if response.status_code != 200:
+        raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg='Failed to search for items')
+
+    return any(manifest_id in item['extended']['extra']['attributes'] for item in response.json()['result'])
+
+
+async def find_attributes_targets(
+    item: dict[str, Any], manifest_id: str, project_code: str, headers: dict[str, str]
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Return entities the attributes should be attached to and results for files already having the template.
+
+    Attributes of a folder are attached to all active files of the folder owner within the folder.
+    """
+
+    if item['type'] != 'folder':
+        return [item], []
+
+    parent_path = item['parent_path']
+    name = item['name']
+    params = {
+        'container_code': project_code,
+        'zone': item['zone'],
+        'recursive': True,
+        'status': ItemStatus.ACTIVE,
+        'type': 'file',
+        'owner': item['owner'],
+        'parent_path': f'{parent_path}/{name}',
+    }
+    async with httpx.AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
+        url = f'{ConfigClass.METADATA_SERVICE}items/search/'
+        response = await client.get(url, params=params, headers=headers)
+
+    if response.status_code != 200:
+        raise APIException(status_code=EAPIResponseCode.internal_error.value, error_msg='Failed to search for items')
+
+    targets = []
+    terminated = []
+    for found in response.json()['result']:
+        if manifest_id in found['extended']['extra']['attributes']:
+            terminated.append(
+                {
+                    'name': found['name'],
+                    'geid': found['id'],
+                    'operation_status': 'TERMINATED',
+                    'error_type': 'attributes_duplicate',
+                }
+            )
+        else:
+            targets.append(found)
+
+    return targets, terminated
+
+
+async def attach_attributes(
+    targets: list[dict[str, Any]], manifest_id: str, attributes: dict[str, Any]
+) -> httpx.Response:
+    """Attach attributes of the template to all target entities in one batch."""
+
+    payload = {
+        'items': [
+            {
+                'parent': target['parent'],
+                'parent_path': target['parent_path'],
+                'tags': target['extended']['extra']['tags'],
+                'system_tags': target['extended']['extra']['system_tags'],
+                'type': target['type'],
+                'attribute_template_id': manifest_id,
+                'attributes': attributes,
+            }
+            for target in targets
+        ]
+    }
+    params = {'ids': [target['id'] for target in targets]}
+    async with httpx.AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
+        url = f'{ConfigClass.METADATA_SERVICE}items/batch/'
+        return await client.put(url, params=params, json=payload)
+
+
+@job_runner.handler('delete-attribute-template')
+async def delete_template_job(context: JobContext, payload: dict[str, Any]) -> str:
+    """Delete the attribute template once none of the project files uses it.
+
+    The bearer token of the user is not kept in the job, permissions are checked before the job is submitted.
+    """
+
+    await context.set_total(len(TEMPLATE_USAGE_SCOPES))
+    for zone, status in TEMPLATE_USAGE_SCOPES:
+        if await is_template_used(payload['manifest_id'], payload['project_code'], zone, status, {}):
+            raise ValueError('Cant delete manifest attached to files')
+        await context.advance()
+
+    async with httpx.AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
+        url = f'{ConfigClass.METADATA_SERVICE}template/'
+        response = await client.delete(url, params={'id': payload['manifest_id']})
+
+    if response.status_code != 200:
+        raise ValueError('Failed to delete attribute template not found')
+
+    return 'success'
+
+
+@job_runner.handler('attach-attributes')
+async def attach_attributes_job(context: JobContext, payload: dict[str, Any]) -> dict[str, Any]:
+    """Attach attributes to the files and to the files within the folders.
+
+    The bearer token of the user is not kept in the job, permissions are checked before the job is submitted.
+    """
+
+    await context.set_total(len(payload['items']))
+    results = []
+    targets = []
+    for item in payload['items']:
+        item_targets, terminated = await find_attributes_targets(
+            item, payload['manifest_id'], payload['project_code'], {}
+        )
+        targets.extend(item_targets)
+        results.extend(terminated)
+        await context.advance()
+
+    if targets:
+        response = await attach_attributes(targets, payload['manifest_id'], payload['attributes'])
+        if response.status_code != 200:
+            raise ValueError(f'Attaching attributes failed: {response.text}')
+        results.extend(
+            {'name': item['name'], 'geid': item['id'], 'operation_status': 'SUCCEED'}
+            for item in response.json()['result']
+        )
+
+    return {'result': results, 'total': len(results)}
+
 
 @cbv.cbv(router)
 class RestfulManifests:
@@ -143,7 +296,7 @@ class RestfulManifest:
         '/data/manifest/{manifest_id}',
         summary='Delete an attribute template',
     )
-    async def delete(self, manifest_id: str, request: Request):  # noqa: C901
+    async def delete(self, manifest_id: str, request: Request, background: bool = False):  # noqa: C901
         """Delete an attribute template."""
         my_res = APIResponse()
         async with httpx.AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
@@ -164,33 +317,20 @@ class RestfulManifest:
             my_res.set_result('Permission denied')
             return my_res.json_response()
 
-        try:
-            for zone in [0, 1]:
-                for status in [ItemStatus.ACTIVE, ItemStatus.ARCHIVED]:
-                    params = {
-                        'container_code': project_code,
-                        'zone': zone,
-                        'recursive': True,
-                        'status': status,
-                        'type': 'file',
-                    }
-
-                    async with httpx.AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
-                        auth = {'Authorization': request.headers.get('Authorization')}
-                        url = f'{ConfigClass.METADATA_SERVICE}items/search/'
-                        response = await client.get(url, params=params, headers=auth)
-
-                    if response.status_code != 200:
-                        my_res.set_code(EAPIResponseCode.internal_error)
-                        my_res.set_error_msg('Failed to search for items')
-                        return my_res.json_response()
+        if background:
+            payload = {'manifest_id': manifest_id, 'project_code': project_code}
+            job = await job_runner.submit('delete-attribute-template', self.current_identity['username'], payload)
+            my_res.set_code(EAPIResponseCode.accepted)
+            my_res.set_result(job.dict())
+            return my_res.json_response()
 
-                    items = response.json()['result']
-                    for item in items:
-                        if manifest_id in item['extended']['extra']['attributes']:
-                            my_res.set_code(EAPIResponseCode.forbidden)
-                            my_res.set_result('Cant delete manifest attached to files')
-                            return my_res.json_response()
+        try:
+            auth = {'Authorization': request.headers.get('Authorization')}
+            for zone, status in TEMPLATE_USAGE_SCOPES:
+                if await is_template_used(manifest_id, project_code, zone, status, auth):
+                    my_res.set_code(EAPIResponseCode.forbidden)
+                    my_res.set_result('Cant delete manifest attached to files')
+                    return my_res.json_response()
 
             params = {'id': manifest_id}
 
@@ -206,6 +346,10 @@ class RestfulManifest:
             my_res.set_code(EAPIResponseCode.success)
             my_res.set_result('success')
             return my_res.json_response()
+        except APIException as e:
+            my_res.set_code(e.status_code)
+            my_res.set_error_msg(e.error_msg)
+            return my_res.json_response()
         except Exception as e:
             logger.error(f'Error when calling metadata service: {e}')
             error_msg = {'result': str(e)}
@@ -369,11 +513,10 @@ class AttachAttributes:
         '/file/attributes/attach',
         summary='Attach attributes to files or folders',
     )
-    async def post(self, request: Request):  # noqa: C901
+    async def post(self, request: Request, background: bool = False):  # noqa: C901
         api_response = APIResponse()
         required_fields = ['manifest_id', 'item_ids', 'attributes', 'project_code']
         data = await request.json()
-        payload = {'items': []}
         responses = {'result': []}
         for field in required_fields:
             if field not in data:
@@ -383,70 +526,37 @@ class AttachAttributes:
 
         item_ids = data.get('item_ids')
         project_code = data.get('project_code')
-        updated_items = []
         try:
+            items = []
             for item_id in item_ids:
                 item = await async_get_entity_by_id(item_id)
                 if not await has_file_permission(ConfigClass.AUTH_SERVICE, item, 'annotate', self.current_identity):
                     api_response.set_code(EAPIResponseCode.forbidden)
                     api_response.set_result('Permission denied')
                     return api_response.json_response()
-                if item['type'] == 'folder':
-                    parent_path = item['parent_path']
-                    name = item['name']
-                    params = {
-                        'container_code': project_code,
-                        'zone': item['zone'],
-                        'recursive': True,
-                        'status': ItemStatus.ACTIVE,
-                        'type': 'file',
-                        'owner': item['owner'],
-                        'parent_path': f'{parent_path}/{name}',
-                    }
-                    async with httpx.AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
-                        url = f'{ConfigClass.METADATA_SERVICE}items/search/'
-                        auth = {'Authorization': request.headers.get('Authorization')}
-                        response = await client.get(url, params=params, headers=auth)
-                    if response.status_code != 200:
-                        api_response.set_code(EAPIResponseCode.internal_error)
-                        api_response.set_error_msg('Failed to search for items')
-                        return api_response.json_response()
-                    else:
-                        items_found = response.json()['result']
-                        for found in items_found:
-                            if data['manifest_id'] in found['extended']['extra']['attributes']:
-                                responses['result'].append(
-                                    {
-                                        'name': found['name'],
-                                        'geid': found['id'],
-                                        'operation_status': 'TERMINATED',
-                                        'error_type': 'attributes_duplicate',
-                                    }
-                                )
-                            else:
-                                updated_items.append(found)
-                else:
-                    updated_items.append(item)
-            if updated_items:
-                file_ids = []
-                for updated in updated_items:
-                    update = {
-                        'parent': updated['parent'],
-                        'parent_path': updated['parent_path'],
-                        'tags': updated['extended']['extra']['tags'],
-                        'system_tags': updated['extended']['extra']['system_tags'],
-                        'type': updated['type'],
-                        'attribute_template_id': data['manifest_id'],
-                        'attributes': data['attributes'],
-                    }
-                    payload['items'].append(update)
-                    file_ids.append(updated['id'])
-
-                params = {'ids': file_ids}
-                async with httpx.AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
-                    url = f'{ConfigClass.METADATA_SERVICE}items/batch/'
-                    response = await client.put(url, params=params, json=payload)
+                items.append(item)
+
+            if background:
+                payload = {
+                    'items': items,
+                    'manifest_id': data['manifest_id'],
+                    'attributes': data['attributes'],
+                    'project_code': project_code,
+                }
+                job = await job_runner.submit('attach-attributes', self.current_identity['username'], payload)
+                api_response.set_code(EAPIResponseCode.accepted)
+                api_response.set_result(job.dict())
+                return api_response.json_response()
+
+            auth = {'Authorization': request.headers.get('Authorization')}
+            updated_items = []
+            for item in items:
+                targets, terminated = await find_attributes_targets(item, data['manifest_id'], project_code, auth)
+                updated_items.extend(targets)
+                responses['result'].extend(terminated)
 
+            if updated_items:
+                response = await attach_attributes(updated_items, data['manifest_id'], data['attributes'])
                 if response.status_code != 200:
                     logger.error(f'Attaching attributes failed: {response.text}')
                     api_response.set_code(response.status_code)
@@ -460,6 +570,10 @@ class AttachAttributes:
             responses['total'] = len(responses['result'])
             api_response.set_result(responses)
             return api_response.json_response()
+        except APIException as e:
+            api_response.set_code(e.status_code)
+            api_response.set_error_msg(e.error_msg)
+            return api_response.json_response()
         except Exception as e:
             logger.error(f'Error when calling metadata service: {e}')
             api_response.set_code(EAPIResponseCode.forbidden)
@@ -12,6 +12,8 @@ from fastapi.responses import JSONResponse
 from fastapi_utils import cbv
 
 from app.auth import jwt_required
+from app.components.invalidation import InvalidationScope
+from app.components.invalidation import invalidation_bus
 from app.components.user.models import CurrentUser
 from config import ConfigClass
 from services.permissions_service.decorators import DatasetPermission
@@ -46,6 +48,8 @@ class SchemaTemplate:
         respon = requests.put(
             url, json=payload_json, headers=request.headers, timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT
         )
+        if respon.ok:
+            await invalidation_bus.publish(InvalidationScope.TEMPLATE, template_id)
         return JSONResponse(content=respon.json(), status_code=respon.status_code)
 
     @router.delete(
@@ -59,6 +63,8 @@ class SchemaTemplate:
         respon = requests.delete(
             url, json=payload_json, headers=request.headers, timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT
         )
+        if respon.ok:
+            await invalidation_bus.publish(InvalidationScope.TEMPLATE, template_id)
         return JSONResponse(content=respon.json(), status_code=respon.status_code)
 
 
@@ -28,6 +28,8 @@ from starlette.datastructures import MultiDict
 from app.auth import jwt_required
 from app.components.exceptions import APIException
 from app.components.exceptions import UnhandledException
+from app.components.invalidation import InvalidationScope
+from app.components.invalidation import invalidation_bus
 from app.components.user.models import CurrentUser
 from app.logger import logger
 from config import ConfigClass
@@ -68,6 +70,8 @@ class Dataset:
         respon = requests.put(
             url, json=payload_json, headers=request.headers, timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT
         )
+        if respon.status_code == 200:
+            await invalidation_bus.publish(InvalidationScope.DATASET, respon.json()['code'])
         return JSONResponse(content=respon.json(), status_code=respon.status_code)
 
     @router.delete(
@@ -90,6 +94,7 @@ class Dataset:
             respon = await client.delete(url, headers=dict(request.headers))
             if respon.status_code == 200:
                 logger.info(f'Successfully deleted dataset with id or code "{dataset_id_or_code}".')
+                await invalidation_bus.publish(InvalidationScope.DATASET, dataset['code'])
                 return Response(status_code=respon.status_code)
             else:
                 return JSONResponse(content={'err_msg': respon.content}, status_code=respon.status_code)
@@ -5,6 +5,7 @@
 # You may not use this file except in compliance with the License.
 
 import re
+from typing import Any
 
 from fastapi import APIRouter
 from fastapi import Depends
@@ -13,6 +14,10 @@ from fastapi_utils import cbv
 from httpx import AsyncClient
 
 from app.auth import jwt_required
+from app.components.jobs import JobContext
+from app.components.jobs import job_runner
+from app.components.priority_lanes import INTERACTIVE_LANE
+from app.components.priority_lanes import priority_lanes
 from app.components.user.models import CurrentUser
 from app.logger import logger
 from config import ConfigClass
@@ -24,6 +29,31 @@ from services.permissions_service.decorators import PermissionsCheck
 router = APIRouter(tags=['Email'])
 
 
+async def send_notification_email(
+    subject: str, message_body: str, emails: list[str] | None, send_to_all_active: bool | None
+) -> None:
+    """Send email to the listed or to all active platform users."""
+
+    async with priority_lanes.enter('bulk' if send_to_all_active else INTERACTIVE_LANE):
+        if send_to_all_active:
+            payload = {'status': 'active', 'page_size': 1000}
+            async with AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
+                res = await client.get(ConfigClass.AUTH_SERVICE + 'users', params=payload)
+            users = res.json()['result']
+            emails = [i['email'] for i in users if i.get('email')]
+
+        email_service = SrvEmail()
+        await email_service.async_send(subject, emails, content=message_body)
+
+
+@job_runner.handler('notification-email')
+async def send_notification_email_job(context: JobContext, payload: dict[str, Any]) -> str:
+    await context.set_total(1)
+    await send_notification_email(**payload)
+    await context.advance()
+    return 'success'
+
+
 @cbv.cbv(router)
 class EmailRestful:
     current_identity: CurrentUser = Depends(jwt_required)
@@ -33,7 +63,7 @@ class EmailRestful:
         summary='Send notification email to platform users',
         dependencies=[Depends(PermissionsCheck('notification', '*', 'manage'))],
     )
-    async def post(self, request: Request):
+    async def post(self, request: Request, background: bool = False):
         """Send notification email to platform users."""
 
         response = APIResponse()
@@ -70,22 +100,26 @@ class EmailRestful:
             logger.error(error)
             return response.json_response()
 
-        if send_to_all_active:
-            payload = {'status': 'active', 'page_size': 1000}
-            async with AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
-                res = await client.get(ConfigClass.AUTH_SERVICE + 'users', params=payload)
-            users = res.json()['result']
-            emails = [i['email'] for i in users if i.get('email')]
-        else:
-            if not isinstance(emails, list):
-                error = 'emails must be list'
-                response.set_result(EAPIResponseCode.bad_request)
-                response.set_result(error)
-                logger.error(error)
-                return response.json_response()
+        if not send_to_all_active and not isinstance(emails, list):
+            error = 'emails must be list'
+            response.set_result(EAPIResponseCode.bad_request)
+            response.set_result(error)
+            logger.error(error)
+            return response.json_response()
 
-        email_service = SrvEmail()
-        email_service.send(subject, emails, content=message_body)
+        if background:
+            payload = {
+                'subject': subject,
+                'message_body': message_body,
+                'emails': emails,
+                'send_to_all_active': send_to_all_active,
+            }
+            job = await job_runner.submit('notification-email', self.current_identity['username'], payload)
+            response.set_code(EAPIResponseCode.accepted)
+            response.set_result(job.dict())
+            return response.json_response()
+
+        await send_notification_email(subject, message_body, emails, send_to_all_active)
 
         logger.info('Notification Email Sent')
         response.set_code(EAPIResponseCode.success)
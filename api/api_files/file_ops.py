@@ -15,6 +15,8 @@ from fastapi_utils import cbv
 
 from app.auth import jwt_required
 from app.components.exceptions import APIException
+from app.components.invalidation import InvalidationScope
+from app.components.invalidation import invalidation_bus
 from app.components.user.models import CurrentUser
 from config import ConfigClass
 from models.api_response import EAPIResponseCode
@@ -96,6 +98,9 @@ class FileActions:
         response = requests.post(
             data_actions_utility_url, json=payload, headers=request.headers, timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT
         )
+        if response.ok:
+            await invalidation_bus.publish(InvalidationScope.PROJECT, request_body['project_code'])
+
         return JSONResponse(content=response.json(), status_code=response.status_code)
 
 
@@ -0,0 +1,82 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
+from fastapi_utils import cbv
+
+from app.auth import jwt_required
+from app.components.exceptions import APIException
+from app.components.jobs import job_runner
+from app.components.user.models import CurrentUser
+from config import ConfigClass
+from models.api_response import APIResponse
+from models.api_response import EAPIResponseCode
+from models.jobs import Job
+from models.jobs import SubmitJob
+
+router = APIRouter(tags=['Jobs'])
+
+
+@cbv.cbv(router)
+class Jobs:
+    current_identity: CurrentUser = Depends(jwt_required)
+
+    async def get_job(self, job_id: str) -> Job:
+        """Return the job if it belongs to the current user or the user is platform admin."""
+
+        job = await job_runner.store.get(job_id)
+        if job is None or (job.owner != self.current_identity['username'] and self.current_identity['role'] != 'admin'):
+            raise APIException(error_msg='Job not found', status_code=EAPIResponseCode.not_found.value)
+
+        return job
+
+    @router.post('/jobs', summary='Submit background job')
+    async def submit(self, data: SubmitJob) -> JSONResponse:
+        response = APIResponse()
+        if self.current_identity['role'] != 'admin':
+            response.set_code(EAPIResponseCode.forbidden)
+            response.set_error_msg('Permission denied')
+            return response.json_response()
+
+        if data.type not in job_runner.job_types:
+            response.set_code(EAPIResponseCode.bad_request)
+            response.set_error_msg(f'Unknown job type "{data.type}"')
+            return response.json_response()
+
+        job = await job_runner.submit(data.type, self.current_identity['username'], data.payload)
+        response.set_code(EAPIResponseCode.accepted)
+        response.set_result(job.dict())
+        return response.json_response()
+
+    @router.get('/jobs/{job_id}', summary='Get background job status and progress')
+    async def get(self, job_id: str) -> JSONResponse:
+        response = APIResponse()
+        job = await self.get_job(job_id)
+        response.set_result(job.dict())
+        return response.json_response()
+
+    @router.get('/jobs/{job_id}/progress', summary='Stream background job progress as server-sent events')
+    async def progress(self, job_id: str) -> StreamingResponse:
+        await self.get_job(job_id)
+
+        async def stream() -> AsyncIterator[str]:
+            async for job in job_runner.watch(job_id, ConfigClass.JOB_PROGRESS_INTERVAL):
+                yield f'data: {job.json()}\n\n'
+
+        return StreamingResponse(stream(), media_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+    @router.delete('/jobs/{job_id}', summary='Cancel background job')
+    async def cancel(self, job_id: str) -> JSONResponse:
+        response = APIResponse()
+        await self.get_job(job_id)
+        job = await job_runner.cancel(job_id)
+        response.set_result(job.dict())
+        return response.json_response()
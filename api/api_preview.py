@@ -4,28 +4,58 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
-import requests
+import asyncio
+import json
+from contextlib import AsyncExitStack
+from typing import Any
+
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import Request
-from fastapi import Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
 from fastapi_utils import cbv
+from starlette.background import BackgroundTask
 
 from app.auth import jwt_required
 from app.components.user.models import CurrentUser
 from app.logger import logger
-from config import ConfigClass
 from models.api_response import APIResponse
 from models.api_response import EAPIResponseCode
 from services.dataset.client import DatasetServiceClient
 from services.dataset.client import get_dataset_service_client
-from services.meta import get_entity_by_id
+from services.dataset.preview_cache import preview_cache
+from services.meta import async_get_entity_by_id
+from services.meta import get_item_version
 from services.project.client import ProjectServiceClient
 from services.project.client import get_project_service_client
 
 router = APIRouter(tags=['Preview'])
 
+STREAM_CHUNK_SIZE = 64 * 1024
+FORWARDED_REQUEST_HEADERS = ('range', 'if-range')
+FORWARDED_RESPONSE_HEADERS = (
+    'content-type',
+    'content-length',
+    'content-range',
+    'content-encoding',
+    'accept-ranges',
+    'etag',
+    'last-modified',
+)
+
+
+async def get_dataset_and_file(
+    dataset_service_client: DatasetServiceClient, dataset_id: str, file_id: str
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Retrieve dataset and file concurrently."""
+
+    return await asyncio.gather(
+        dataset_service_client.get_dataset_by_id(dataset_id),
+        async_get_entity_by_id(file_id),
+    )
+
 
 @cbv.cbv(router)
 class Preview:
@@ -43,8 +73,7 @@ class Preview:
 
         data = request.query_params
         dataset_id = data.get('dataset_geid')
-        dataset_node = await self.dataset_service_client.get_dataset_by_id(dataset_id)
-        file_node = get_entity_by_id(file_id)
+        dataset_node, file_node = await get_dataset_and_file(self.dataset_service_client, dataset_id, file_id)
 
         if dataset_node['code'] != file_node['container_code']:
             api_response.set_code(EAPIResponseCode.forbidden)
@@ -56,18 +85,27 @@ class Preview:
             api_response.set_result('Permission denied')
             return api_response.json_response()
 
+        cache_key = None
+        version = get_item_version(file_node)
+        if version:
+            cache_key = preview_cache.make_key(file_id, version, None, data, stream=False)
+            cached = await preview_cache.get(cache_key)
+            if cached:
+                return JSONResponse(
+                    content=json.loads(await run_in_threadpool(cached.read)), status_code=cached.status_code
+                )
+
         try:
-            response = requests.get(
-                ConfigClass.DATASET_SERVICE + f'{file_id}/preview',
-                params=data,
-                headers=request.headers,
-                timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT,
-            )
+            response = await self.dataset_service_client.get_file_preview(file_id, data)
         except Exception as e:
             logger.info(f'Error calling dataops gr: {e}')
             api_response.set_code(EAPIResponseCode.internal_error)
             api_response.set_result(f'Error calling dataops gr: {e}')
             return api_response.json_response()
+
+        if cache_key and response.status_code == 200:
+            await preview_cache.put(cache_key, response.status_code, {}, response.content)
+
         return JSONResponse(content=response.json(), status_code=response.status_code)
 
 
@@ -82,13 +120,18 @@ class StreamPreview:
         summary='Preview a file with streaming response',
     )
     async def get(self, file_id: str, request: Request):
+        """Stream file preview from the dataset service.
+
+        The Range header is forwarded, so large previews can be paged, and the body is relayed chunk by chunk without
+        being buffered in memory.
+        """
+
         logger.info('GET preview called in bff')
         api_response = APIResponse()
 
         data = request.query_params
         dataset_id = data.get('dataset_geid')
-        dataset_node = await self.dataset_service_client.get_dataset_by_id(dataset_id)
-        file_node = get_entity_by_id(file_id)
+        dataset_node, file_node = await get_dataset_and_file(self.dataset_service_client, dataset_id, file_id)
 
         if dataset_node['code'] != file_node['container_code']:
             logger.error(f"File doesn't belong to dataset file: {file_id}, dataset: {dataset_id}")
@@ -101,19 +144,41 @@ class StreamPreview:
             api_response.set_result('Permission denied')
             return api_response.json_response()
 
+        cache_key = None
+        version = get_item_version(file_node)
+        if version:
+            cache_key = preview_cache.make_key(file_id, version, request.headers.get('range'), data, stream=True)
+            cached = await preview_cache.get(cache_key)
+            if cached:
+                return StreamingResponse(
+                    content=cached.iter_chunks(STREAM_CHUNK_SIZE),
+                    status_code=cached.status_code,
+                    headers=cached.headers,
+                )
+
+        headers = {key: request.headers[key] for key in FORWARDED_REQUEST_HEADERS if key in request.headers}
+        exit_stack = AsyncExitStack()
         try:
-            response = requests.get(
-                ConfigClass.DATASET_SERVICE + f'{file_id}/preview/stream',
-                params=data,
-                stream=True,
-                timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT,
-            )
-            return Response(
-                content=response.iter_content(chunk_size=10 * 1025),
-                media_type=response.headers.get('Content-Type', 'text/plain'),
+            response = await exit_stack.enter_async_context(
+                self.dataset_service_client.stream_file_preview(file_id, data, headers)
             )
         except Exception as e:
+            await exit_stack.aclose()
             logger.info(f'Error calling dataset service: {e}')
             api_response.set_code(EAPIResponseCode.internal_error)
             api_response.set_result(f'Error calling dataops gr: {e}')
             return api_response.json_response()
+
+        response_headers = {key: response.headers[key] for key in FORWARDED_RESPONSE_HEADERS if key in response.headers}
+        response_headers.setdefault('content-type', 'text/plain')
+
+        content = response.aiter_raw(STREAM_CHUNK_SIZE)
+        if cache_key and response.status_code in (200, 206):
+            content = preview_cache.tee(cache_key, response.status_code, response_headers, content)
+
+        return StreamingResponse(
+            content=content,
+            status_code=response.status_code,
+            headers=response_headers,
+            background=BackgroundTask(exit_stack.aclose),
+        )
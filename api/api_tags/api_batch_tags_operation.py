@@ -4,15 +4,20 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from typing import Any
+
 import requests
 from common import has_file_permission
 from fastapi import APIRouter
 from fastapi import Depends
 from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from fastapi_utils import cbv
 
 from app.auth import jwt_required
+from app.components.jobs import JobContext
+from app.components.jobs import job_runner
 from app.components.user.models import CurrentUser
 from app.logger import logger
 from config import ConfigClass
@@ -26,6 +31,74 @@ from .utils import get_new_tags
 router = APIRouter(tags=['Tags'])
 
 
+async def get_tags_updates(
+    entity: dict[str, Any], operation: str, tags: list[str], inherit: bool, only_files: bool, headers: dict[str, str]
+) -> tuple[list[dict[str, Any]], list[str]]:
+    """Return new tags and ids of the entity and, when inherited, of all entities within the folder."""
+
+    items = []
+    ids = []
+    if inherit and entity['type'] == 'folder':
+        child_entities = await search_entities(
+            entity['container_code'],
+            entity['parent_path'] + '/' + entity['name'],
+            entity['zone'],
+            headers,
+            recursive=True,
+        )
+        for child_entity in child_entities:
+            if only_files and child_entity['type'] == 'folder':
+                continue
+
+            items.append({'tags': get_new_tags(operation, child_entity, tags)})
+            ids.append(child_entity['id'])
+
+    if not (only_files and entity['type'] == 'folder'):
+        items.append({'tags': get_new_tags(operation, entity, tags)})
+        ids.append(entity['id'])
+
+    return items, ids
+
+
+def update_tags(items: list[dict[str, Any]], ids: list[str]) -> requests.Response:
+    """Store new tags of the entities in one batch."""
+
+    return requests.put(
+        ConfigClass.METADATA_SERVICE + 'items/batch',
+        json={'items': items},
+        params={'ids': ids},
+        timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT,
+    )
+
+
+@job_runner.handler('batch-tags')
+async def update_tags_job(context: JobContext, payload: dict[str, Any]) -> Any:
+    """Add or remove tags of the entities and of all entities within the folders.
+
+    The bearer token of the user is not kept in the job, permissions are checked before the job is submitted.
+    """
+
+    await context.set_total(len(payload['entities']))
+    items = []
+    ids = []
+    for entity in payload['entities']:
+        entity_items, entity_ids = await get_tags_updates(
+            entity, payload['operation'], payload['tags'], payload['inherit'], payload['only_files'], {}
+        )
+        items.extend(entity_items)
+        ids.extend(entity_ids)
+        await context.advance()
+
+    if not items:
+        return 'None updated'
+
+    response = await run_in_threadpool(update_tags, items, ids)
+    if response.status_code != 200:
+        raise ValueError(f'Error while performing batch operation for tags: {response.text}')
+
+    return response.json()
+
+
 @cbv.cbv(router)
 class BatchTagsAPIV2:
     current_identity: CurrentUser = Depends(jwt_required)
@@ -34,7 +107,7 @@ class BatchTagsAPIV2:
         '/entity/tags',
         summary='Bulk add or remove tags',
     )
-    async def post(self, request: Request):  # noqa: C901
+    async def post(self, request: Request, background: bool = False):
         api_response = APIResponse()
         data = await request.json()
         only_files = data.get('only_files', False)
@@ -43,57 +116,39 @@ class BatchTagsAPIV2:
         tags = data.get('tags')
         operation = data.get('operation')
         entities = get_entities_batch(entity_ids)
-        update_payload = {
-            'items': [],
-        }
-        params = {'ids': []}
         for entity in entities:
             if not await has_file_permission(ConfigClass.AUTH_SERVICE, entity, 'annotate', self.current_identity):
                 api_response.set_error_msg('Permission Denied')
                 api_response.set_code(EAPIResponseCode.forbidden)
                 return api_response.json_response()
 
-            if inherit:
-                if entity['type'] == 'folder':
-                    headers = {'Authorization': request.headers.get('Authorization')}
-                    child_entities = await search_entities(
-                        entity['container_code'],
-                        entity['parent_path'] + '/' + entity['name'],
-                        entity['zone'],
-                        headers,
-                        recursive=True,
-                    )
-                    for child_entity in child_entities:
-                        if only_files and child_entity['type'] == 'folder':
-                            continue
-
-                        update_payload['items'].append(
-                            {
-                                'tags': get_new_tags(operation, child_entity, tags),
-                            }
-                        )
-                        params['ids'].append(child_entity['id'])
-            if only_files and entity['type'] == 'folder':
-                continue
+        if background:
+            payload = {
+                'entities': entities,
+                'operation': operation,
+                'tags': tags,
+                'inherit': inherit,
+                'only_files': only_files,
+            }
+            job = await job_runner.submit('batch-tags', self.current_identity['username'], payload)
+            api_response.set_code(EAPIResponseCode.accepted)
+            api_response.set_result(job.dict())
+            return api_response.json_response()
 
-            update_payload['items'].append(
-                {
-                    'tags': get_new_tags(operation, entity, tags),
-                }
-            )
-            params['ids'].append(entity['id'])
+        headers = {'Authorization': request.headers.get('Authorization')}
+        items = []
+        ids = []
+        for entity in entities:
+            entity_items, entity_ids = await get_tags_updates(entity, operation, tags, inherit, only_files, headers)
+            items.extend(entity_items)
+            ids.extend(entity_ids)
 
-        if not update_payload['items']:
+        if not items:
             api_response.set_result('None updated')
             return api_response.json_response()
 
         try:
-            response = requests.put(
-                ConfigClass.METADATA_SERVICE + 'items/batch',
-                json=update_payload,
-                params=params,
-                timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT,
-            )
+            response = update_tags(items, ids)
             logger.info(f'Batch operation result: {response}')
             return JSONResponse(content=response.json(), status_code=response.status_code)
         except Exception as error:
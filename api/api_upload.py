@@ -8,6 +8,7 @@ import httpx
 from common import has_file_permission
 from fastapi import APIRouter
 from fastapi import Depends
+from fastapi import Query
 from fastapi import Request
 from fastapi.concurrency import run_in_threadpool
 from fastapi_utils.cbv import cbv
@@ -24,6 +25,10 @@ from models.api_upload import ResumableResponse
 from models.api_upload import ResumableUploadPOST
 from models.models_item import ItemStatus
 from services.meta import get_entity_by_id
+from services.meta.folder_resolver import folder_path_resolver
+from services.upload.client import UploadServiceClient
+from services.upload.client import UploadServiceException
+from services.upload.client import get_upload_service_client
 
 router = APIRouter()
 _API_NAMESPACE = 'api_upload'
@@ -153,6 +158,79 @@ class APIProject:
 
             return api_response.json_response()
 
+    @router.get(
+        '/project/{project_code}/files/chunks/presigned/bulk',
+        summary='proxy to upload service to generate presigned urls for multiple chunks',
+        tags=['V1 Files'],
+    )
+    async def generate_presigned_url_chunks_bulk(
+        self,
+        project_code,
+        request: Request,
+        key: str,
+        upload_id: str,
+        chunk_start: int | None = None,
+        chunk_end: int | None = None,
+        chunk_numbers: list[int] = Query([]),
+        upload_service_client: UploadServiceClient = Depends(get_upload_service_client),
+    ):
+        """
+        Summary:
+            The api will proxy to upload service and generate presigned urls
+            for a window of chunks in one response
+            Path Parameter:
+                - project_code(str): unique identifier of project
+            Parameter:
+                - key(str): file path
+                - upload_id(str): the unique identifier of upload process
+                - chunk_start(int): the first chunk number of the range (inclusive)
+                - chunk_end(int): the last chunk number of the range (inclusive)
+                - chunk_numbers(list[int]): the explicit chunk numbers, exclusive with the range
+        return:
+            - result(dict[int: str]): the pair of chunk_number: presigned url
+        """
+        api_response = APIResponse()
+        logger.info('API generate_presigned_url_chunks_bulk'.center(80, '-'))
+
+        if chunk_numbers and (chunk_start is not None or chunk_end is not None):
+            api_response.set_error_msg('chunk_numbers and chunk_start/chunk_end are mutually exclusive')
+            api_response.set_code(EAPIResponseCode.bad_request)
+            return api_response.json_response()
+
+        if chunk_numbers:
+            is_valid = min(chunk_numbers) >= 0
+            number_of_chunks = len(chunk_numbers)
+        else:
+            is_valid = chunk_start is not None and chunk_end is not None and 0 <= chunk_start <= chunk_end
+            number_of_chunks = chunk_end - chunk_start + 1 if is_valid else 0
+
+        if not is_valid:
+            api_response.set_error_msg('Either chunk_numbers or a valid chunk_start/chunk_end range is required')
+            api_response.set_code(EAPIResponseCode.bad_request)
+            return api_response.json_response()
+
+        if number_of_chunks > ConfigClass.UPLOAD_PRESIGNED_URLS_LIMIT:
+            api_response.set_error_msg(
+                f'Cannot generate more than {ConfigClass.UPLOAD_PRESIGNED_URLS_LIMIT} presigned urls at once'
+            )
+            api_response.set_code(EAPIResponseCode.bad_request)
+            return api_response.json_response()
+
+        if not chunk_numbers:
+            chunk_numbers = list(range(chunk_start, chunk_end + 1))
+
+        try:
+            headers = {'Session-ID': request.headers.get('Session-ID', '')}
+            presigned_urls = await upload_service_client.generate_presigned_urls(
+                'gr-' + project_code, key, upload_id, chunk_numbers, headers=headers
+            )
+            api_response.set_result(presigned_urls)
+        except UploadServiceException as e:
+            api_response.set_error_msg(f'chunk presigned Error: {e}')
+            api_response.set_code(EAPIResponseCode.internal_error)
+
+        return api_response.json_response()
+
     @router.post(
         '/project/{project_code}/files/resumable',
         response_model=ResumableResponse,
@@ -258,24 +336,8 @@ class APIProject:
 
 
 async def search_file_permissions_check(project_code, parent_path, name, headers, status=ItemStatus.ACTIVE):
-    async with httpx.AsyncClient() as client:
-        url = ConfigClass.METADATA_SERVICE + 'items/search/'
-        params = {
-            'container_code': project_code,
-            'container_type': 'project',
-            'zone': 0,
-            'name': name,
-            'status': status,
-            'parent_path': parent_path,
-        }
-        res = await client.get(url, params=params, headers=headers, timeout=None)
-    if res.status_code != 200:
-        error_msg = f'error when get item: {res.content}'
-        raise APIException(
-            error_msg=error_msg,
-            status_code=EAPIResponseCode.internal_error.value,
-        )
-    if not res.json().get('result'):
+    item = await folder_path_resolver.resolve(project_code, 0, f'{parent_path}/{name}', headers, status)
+    if not item:
         raise APIException(
             error_msg='Permission Denied',
             status_code=EAPIResponseCode.forbidden.value,
@@ -15,6 +15,7 @@ from api import api_dataset_rest_proxy
 from api import api_download
 from api import api_email
 from api import api_invitation
+from api import api_jobs
 from api import api_lineage_provenance
 from api import api_preview
 from api import api_project
@@ -72,6 +73,7 @@ def api_registry(app: FastAPI) -> None:
     app.include_router(api_central_node.router, prefix='/v1')
     app.include_router(api_folder.router, prefix='/v1')
     app.include_router(api_invitation.router, prefix='/v1')
+    app.include_router(api_jobs.router, prefix='/v1')
     app.include_router(api_schema.router, prefix='/v1')
     app.include_router(api_schema_template.router, prefix='/v1')
     app.include_router(api_validate.router, prefix='/v1')
@@ -9,8 +9,10 @@ import json
 import jwt
 from fastapi import Request
 from httpx import AsyncClient
-from redis.asyncio import Redis
 
+from app.components.invalidation import InvalidationScope
+from app.components.invalidation import invalidation_bus
+from app.components.redis import redis_cache
 from app.components.user.models import CurrentUser
 from app.logger import logger
 from config import ConfigClass
@@ -30,37 +32,39 @@ async def get_token(request: Request):
     return token.split()[-1]
 
 
+def evict_cached_identity(username: str | None) -> None:
+    """Evict identity of the user or all identities from the in-process cache."""
+
+    if username is None:
+        redis_cache.fallback.delete_matching(lambda key: key.startswith('current_identity-'))
+    else:
+        redis_cache.fallback.delete(f'current_identity-{username}')
+
+
+invalidation_bus.subscribe(InvalidationScope.USER, evict_cached_identity)
+
+
 async def invalidate_cache(username):
     if ConfigClass.ENABLE_USER_CACHE:
-        try:
-            redis = await Redis.from_url(ConfigClass.REDIS_URL)
-            user_key = f'current_identity-{username}'
-            await redis.delete(user_key)
-        except Exception as e:
-            logger.error(f"Couldn't connect to redis, skipping cache: {e}")
+        user_key = f'current_identity-{username}'
+        await redis_cache.delete(user_key)
+        await invalidation_bus.publish(InvalidationScope.USER, username)
     return False
 
 
 async def check_cache(username):
     if ConfigClass.ENABLE_USER_CACHE:
-        try:
-            redis = await Redis.from_url(ConfigClass.REDIS_URL)
-            user_key = f'current_identity-{username}'
-            if await redis.exists(user_key):
-                return json.loads(await redis.get(user_key))
-        except Exception as e:
-            logger.error(f"Couldn't connect to redis, skipping cache: {e}")
+        user_key = f'current_identity-{username}'
+        cached = await redis_cache.get(user_key)
+        if cached:
+            return json.loads(cached)
     return False
 
 
 async def set_cache(username, result):
     if ConfigClass.ENABLE_USER_CACHE:
-        try:
-            redis = await Redis.from_url(ConfigClass.REDIS_URL)
-            user_key = f'current_identity-{username}'
-            await redis.set(user_key, json.dumps(result), ConfigClass.USER_CACHE_EXPIRY)
-        except Exception as e:
-            logger.error(f"Couldn't connect to redis, skipping cache: {e}")
+        user_key = f'current_identity-{username}'
+        await redis_cache.set(user_key, json.dumps(result), ConfigClass.USER_CACHE_EXPIRY)
     return False
 
 
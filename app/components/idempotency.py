@@ -0,0 +1,197 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import base64
+import hashlib
+import json
+import math
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp
+from starlette.types import Message
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from app.components.rate_limit import get_client_identity
+from app.components.redis import RedisCache
+from app.components.route_class import RouteClass
+from app.components.route_class import match_route_class
+from app.logger import logger
+from models.api_response import EAPIResponseCode
+
+IDEMPOTENT_REQUESTS = Counter(
+    'bff_idempotent_requests_total', 'Requests sent with Idempotency-Key header.', ['route_class', 'outcome']
+)
+
+
+async def read_body(receive: Receive) -> bytes:
+    """Read the whole request body."""
+
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] != 'http.request':
+            break
+
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            break
+
+    return b''.join(chunks)
+
+
+def replay_body(body: bytes, receive: Receive) -> Receive:
+    """Return receive callable which passes the already read body to the application."""
+
+    consumed = False
+
+    async def receive_body() -> Message:
+        nonlocal consumed
+        if consumed:
+            return await receive()
+
+        consumed = True
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    return receive_body
+
+
+class IdempotencyMiddleware:
+    """Process requests sent with the same Idempotency-Key header only once.
+
+    The first request marks the key as in flight in Redis and stores its response once it is processed. Duplicates
+    arriving in the meantime wait for the stored response, later duplicates replay it until it expires. Reusing the key
+    for a different request is rejected with 422 response. Server errors are not stored, so the request can be retried.
+    Requests are processed as usual while Redis is unavailable.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        redis_cache: RedisCache,
+        route_classes: list[RouteClass],
+        ttl: int,
+        lock_ttl: int,
+        wait_timeout: float,
+        poll_interval: float,
+        max_response_size: int,
+    ) -> None:
+        self.app = app
+        self.redis_cache = redis_cache
+        self.route_classes = route_classes
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.max_response_size = max_response_size
+
+    @staticmethod
+    def get_fingerprint(scope: Scope, body: bytes) -> str:
+        request = f'{scope["method"]} {scope["path"]}?{scope.get("query_string", b"").decode("latin-1")}'
+        return hashlib.sha256(request.encode() + b'\n' + body).hexdigest()
+
+    async def _process(self, key: str, scope: Scope, receive: Receive, send: Send, fingerprint: str) -> None:
+        """Process the request and store its response under the key."""
+
+        response: dict[str, Any] = {'fingerprint': fingerprint, 'status': None, 'headers': []}
+        body = bytearray()
+
+        async def send_wrapper(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+                response['headers'] = [
+                    [name.decode('latin-1'), value.decode('latin-1')] for name, value in message['headers']
+                ]
+            elif message['type'] == 'http.response.body' and len(body) <= self.max_response_size:
+                body.extend(message.get('body', b''))
+            await send(message)
+
+        client = self.redis_cache.redis_manager.client
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            try:
+                if response['status'] is not None and response['status'] < 500 and len(body) <= self.max_response_size:
+                    response['body'] = base64.b64encode(body).decode()
+                    await client.set(key, json.dumps(response), ex=self.ttl)
+                else:
+                    await client.delete(key)
+            except (RedisError, OSError) as e:
+                logger.error(f'Unable to store response for idempotency key "{key}": {e}')
+
+    @staticmethod
+    async def _replay(response: dict[str, Any], send: Send) -> None:
+        headers = [(name.encode('latin-1'), value.encode('latin-1')) for name, value in response['headers']]
+        headers.append((b'idempotent-replayed', b'true'))
+        await send({'type': 'http.response.start', 'status': response['status'], 'headers': headers})
+        await send({'type': 'http.response.body', 'body': base64.b64decode(response['body'])})
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, code: EAPIResponseCode, error: str) -> None:
+        headers = {'Retry-After': str(math.ceil(self.poll_interval))} if code == EAPIResponseCode.conflict else None
+        response = JSONResponse(
+            status_code=code.value, content={'code': code.value, 'error_msg': error, 'result': ''}, headers=headers
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:  # noqa: C901
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        idempotency_key = Headers(scope=scope).get('idempotency-key')
+        route_class = match_route_class(self.route_classes, scope['method'], scope['path']) if idempotency_key else None
+        if route_class is None or self.redis_cache.is_open:
+            await self.app(scope, receive, send)
+            return
+
+        body = await read_body(receive)
+        receive = replay_body(body, receive)
+        fingerprint = self.get_fingerprint(scope, body)
+        key = f'idempotency:{route_class.name}:{get_client_identity(scope)}:{idempotency_key}'
+
+        client = self.redis_cache.redis_manager.client
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.wait_timeout
+        while True:
+            try:
+                acquired = await client.set(key, json.dumps({'fingerprint': fingerprint}), nx=True, ex=self.lock_ttl)
+                stored = None if acquired else await client.get(key)
+            except (RedisError, OSError) as e:
+                logger.error(f'Unable to check idempotency key "{key}", processing request: {e}')
+                await self.app(scope, receive, send)
+                return
+
+            if acquired:
+                IDEMPOTENT_REQUESTS.labels(route_class.name, 'processed').inc()
+                await self._process(key, scope, receive, send, fingerprint)
+                return
+
+            response = json.loads(stored) if stored else None
+            if response and response['fingerprint'] != fingerprint:
+                IDEMPOTENT_REQUESTS.labels(route_class.name, 'mismatch').inc()
+                error = 'Idempotency-Key was already used for a different request'
+                await self._reject(scope, receive, send, EAPIResponseCode.unprocessable_entity, error)
+                return
+
+            if response and response.get('status') is not None:
+                IDEMPOTENT_REQUESTS.labels(route_class.name, 'replayed').inc()
+                await self._replay(response, send)
+                return
+
+            if loop.time() >= deadline:
+                IDEMPOTENT_REQUESTS.labels(route_class.name, 'in_flight').inc()
+                error = 'Request with the same Idempotency-Key is still being processed'
+                await self._reject(scope, receive, send, EAPIResponseCode.conflict, error)
+                return
+
+            await asyncio.sleep(self.poll_interval)
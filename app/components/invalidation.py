@@ -0,0 +1,157 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import json
+from collections import defaultdict
+from collections.abc import Callable
+from enum import Enum
+from uuid import uuid4
+
+from redis.exceptions import RedisError
+
+from app.components.redis import RedisManager
+from app.components.redis import redis_manager
+from app.logger import logger
+from config import ConfigClass
+
+InvalidationHandler = Callable[[str | None], None]
+
+
+class InvalidationScope(str, Enum):
+    USER = 'user'
+    PROJECT = 'project'
+    DATASET = 'dataset'
+    TEMPLATE = 'template'
+
+
+class InvalidationBus:
+    """Propagate cache invalidation events between workers through Redis pub/sub.
+
+    In-process caches subscribe handlers for a scope and publishers emit events with the scope and the key of changed
+    entity. The event is handled locally right away and by every other worker once it is received from the channel.
+    Handlers receive None as a key when all entries of the scope have to be evicted, which happens after the
+    subscription was interrupted and some events might have been missed.
+    """
+
+    def __init__(self, redis_manager: RedisManager, *, channel: str, poll_timeout: float, reconnect_interval: float):
+        self.redis_manager = redis_manager
+        self.channel = channel
+        self.poll_timeout = poll_timeout
+        self.reconnect_interval = reconnect_interval
+
+        self.origin = uuid4().hex
+        self._handlers: defaultdict[InvalidationScope, list[InvalidationHandler]] = defaultdict(list)
+        self._listener: asyncio.Task | None = None
+        self._stopping = asyncio.Event()
+
+    def subscribe(self, scope: InvalidationScope, handler: InvalidationHandler) -> None:
+        """Register handler evicting entries of the scope from an in-process cache."""
+
+        self._handlers[scope].append(handler)
+
+    def _dispatch(self, scope: InvalidationScope, key: str | None) -> None:
+        for handler in self._handlers[scope]:
+            try:
+                handler(key)
+            except Exception:
+                logger.exception(f'Unable to handle invalidation of {scope.value} "{key}"')
+
+    def _dispatch_all(self) -> None:
+        for scope in InvalidationScope:
+            self._dispatch(scope, None)
+
+    async def publish(self, scope: InvalidationScope, key: str) -> None:
+        """Evict entries matching the key locally and notify other workers."""
+
+        self._dispatch(scope, key)
+
+        message = json.dumps({'scope': scope.value, 'key': key, 'origin': self.origin})
+        try:
+            await self.redis_manager.client.publish(self.channel, message)
+        except (RedisError, OSError) as e:
+            logger.error(f'Unable to publish invalidation of {scope.value} "{key}": {e}')
+
+    def _receive(self, data: str) -> None:
+        try:
+            event = json.loads(data)
+            scope = InvalidationScope(event['scope'])
+        except (ValueError, KeyError):
+            logger.error(f'Received malformed invalidation event: {data}')
+            return
+
+        if event.get('origin') != self.origin:
+            self._dispatch(scope, event.get('key'))
+
+    async def _wait_for_stop(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _listen(self) -> None:
+        interrupted = False
+        while not self._stopping.is_set():
+            pubsub = self.redis_manager.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                if interrupted:
+                    self._dispatch_all()
+                    interrupted = False
+                logger.info(f'Subscribed to cache invalidation channel "{self.channel}"')
+
+                while not self._stopping.is_set():
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=self.poll_timeout)
+                    if message:
+                        self._receive(message['data'])
+            except (RedisError, OSError) as e:
+                logger.error(f'Cache invalidation subscription was interrupted: {e}')
+                interrupted = True
+                await self._wait_for_stop(self.reconnect_interval)
+            finally:
+                try:
+                    await pubsub.close()
+                except (RedisError, OSError) as e:
+                    logger.warning(f'Unable to close cache invalidation subscription: {e}')
+
+    async def start(self) -> None:
+        """Start listening to invalidation events of other workers."""
+
+        if self._listener is not None:
+            return
+
+        if self.redis_manager.is_cluster:
+            logger.warning('Cache invalidation bus is not supported with redis cluster')
+            return
+
+        self._stopping = asyncio.Event()
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop listening to invalidation events.
+
+        The listener finishes on its own within the poll timeout and is cancelled only if it does not, so shutdown can
+        not hang on a cancellation lost inside of the Redis client.
+        """
+
+        if self._listener is None:
+            return
+
+        listener, self._listener = self._listener, None
+        self._stopping.set()
+        done, _ = await asyncio.wait({listener}, timeout=self.poll_timeout + 1)
+        if not done:
+            logger.warning('Cache invalidation listener did not stop in time, cancelling it')
+            listener.cancel()
+            await asyncio.wait({listener}, timeout=self.poll_timeout)
+
+
+invalidation_bus = InvalidationBus(
+    redis_manager,
+    channel=ConfigClass.CACHE_INVALIDATION_CHANNEL,
+    poll_timeout=ConfigClass.CACHE_INVALIDATION_POLL_TIMEOUT,
+    reconnect_interval=ConfigClass.CACHE_INVALIDATION_RECONNECT_INTERVAL,
+)
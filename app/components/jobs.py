@@ -0,0 +1,382 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+from uuid import uuid4
+
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+
+from app.components.redis import RedisManager
+from app.components.redis import redis_manager
+from app.logger import logger
+from config import ConfigClass
+from models.jobs import Job
+from models.jobs import JobStatus
+
+JOBS_PROCESSED = Counter('bff_jobs_processed_total', 'Background jobs processed by workers.', ['type', 'status'])
+
+
+class JobCancelled(Exception):
+    """Raised inside of the job handler once cancellation of the job was requested."""
+
+
+TRANSITION_SCRIPT = """
+if redis.call('HGET', KEYS[1], 'status') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+return 1
+"""
+
+REAP_SCRIPT = """
+local job = redis.call('HMGET', KEYS[1], 'status', 'heartbeat_at', 'updated_at', 'cancel_requested')
+if not job[1] then
+    return 'missing'
+end
+if job[1] ~= 'pending' and job[1] ~= 'running' then
+    return 'finished'
+end
+if tonumber(job[2] or job[3]) >= tonumber(ARGV[1]) then
+    return 'alive'
+end
+if job[4] then
+    redis.call('HSET', KEYS[1], 'status', 'cancelled', 'updated_at', ARGV[2])
+    return 'finished'
+end
+redis.call('HSET', KEYS[1], 'status', 'pending', 'updated_at', ARGV[2], 'heartbeat_at', ARGV[2])
+return 'requeue'
+"""
+
+
+class JobStore:
+    """Job records persisted in Redis hashes which expire after the ttl.
+
+    Status changes are compare-and-set transitions executed atomically in Redis, so concurrent workers, reapers and
+    cancellations can never move a job out of a status another party has already left it.
+    """
+
+    def __init__(self, redis_manager: RedisManager, *, ttl: int) -> None:
+        self.redis_manager = redis_manager
+        self.ttl = ttl
+
+    @staticmethod
+    def make_key(job_id: str) -> str:
+        return f'job:{job_id}'
+
+    @staticmethod
+    def _serialize(fields: dict[str, Any]) -> dict[str, Any]:
+        if isinstance(fields.get('status'), JobStatus):
+            fields['status'] = fields['status'].value
+        if 'result' in fields:
+            fields['result'] = json.dumps(fields['result'])
+        return fields
+
+    async def create(self, job_type: str, owner: str, payload: dict[str, Any]) -> Job:
+        now = time.time()
+        job = Job(id=uuid4().hex, type=job_type, owner=owner, status=JobStatus.PENDING, created_at=now, updated_at=now)
+        fields = self._serialize({**job.dict(), 'payload': json.dumps(payload)})
+
+        key = self.make_key(job.id)
+        async with self.redis_manager.client.pipeline(transaction=self.redis_manager.supports_transactions) as pipe:
+            pipe.hset(key, mapping=fields)
+            pipe.expire(key, self.ttl)
+            await pipe.execute()
+
+        return job
+
+    async def get(self, job_id: str) -> Job | None:
+        fields = await self.redis_manager.client.hgetall(self.make_key(job_id))
+        if not fields:
+            return None
+
+        return Job(**{**fields, 'result': json.loads(fields['result'])})
+
+    async def get_payload(self, job_id: str) -> dict[str, Any]:
+        return json.loads(await self.redis_manager.client.hget(self.make_key(job_id), 'payload') or '{}')
+
+    async def update(self, job_id: str, **fields: Any) -> None:
+        fields = self._serialize({**fields, 'updated_at': time.time()})
+        await self.redis_manager.client.hset(self.make_key(job_id), mapping=fields)
+
+    async def transition(self, job_id: str, expected: JobStatus, status: JobStatus, **fields: Any) -> bool:
+        """Change status of the job together with the fields only if the job is still in the expected status."""
+
+        now = time.time()
+        fields = self._serialize({**fields, 'status': status, 'updated_at': now, 'heartbeat_at': now})
+        args = [expected.value, *(value for item in fields.items() for value in item)]
+
+        script = self.redis_manager.client.register_script(TRANSITION_SCRIPT)
+        return bool(await script(keys=[self.make_key(job_id)], args=args))
+
+    async def heartbeat(self, job_id: str) -> None:
+        """Record that the worker processing the job is alive."""
+
+        await self.redis_manager.client.hset(self.make_key(job_id), 'heartbeat_at', time.time())
+
+    async def reap(self, job_id: str, stale_before: float) -> str:
+        """Return the job to pending status if its worker stopped sending heartbeats before the given time.
+
+        The result is "requeue" when the job should be queued again, "alive" when its worker is still active, and
+        "finished" or "missing" when the job does not need processing anymore. Jobs with requested cancellation are
+        cancelled instead of being returned to pending status.
+        """
+
+        script = self.redis_manager.client.register_script(REAP_SCRIPT)
+        return await script(keys=[self.make_key(job_id)], args=[stale_before, time.time()])
+
+    async def advance(self, job_id: str, count: int) -> bool:
+        """Increase number of completed steps and return whether cancellation of the job was requested."""
+
+        key = self.make_key(job_id)
+        async with self.redis_manager.client.pipeline(transaction=self.redis_manager.supports_transactions) as pipe:
+            pipe.hincrby(key, 'completed', count)
+            pipe.hset(key, 'updated_at', time.time())
+            pipe.hget(key, 'cancel_requested')
+            _, _, cancel_requested = await pipe.execute()
+
+        return bool(cancel_requested)
+
+    async def request_cancel(self, job_id: str) -> None:
+        await self.redis_manager.client.hset(self.make_key(job_id), 'cancel_requested', 1)
+
+
+class JobContext:
+    """Progress reporting for the handler of one job."""
+
+    def __init__(self, store: JobStore, job: Job) -> None:
+        self.store = store
+        self.job = job
+
+    async def set_total(self, total: int) -> None:
+        """Set number of steps the job consists of."""
+
+        await self.store.update(self.job.id, total=total)
+
+    async def advance(self, count: int = 1) -> None:
+        """Mark steps as completed, raising JobCancelled if the job should not continue."""
+
+        if await self.store.advance(self.job.id, count):
+            raise JobCancelled()
+
+
+JobHandler = Callable[[JobContext, dict[str, Any]], Awaitable[Any]]
+
+
+class JobRunner:
+    """Run long fan-out operations outside of HTTP requests.
+
+    Submitted jobs are recorded in Redis and their ids are queued in a Redis list consumed by a pool of asyncio workers
+    in every process, so a job is picked up by whichever worker is free. Workers atomically move the id to a processing
+    list and remove it only once the job is finished, while the job itself carries heartbeats of its worker. The reaper
+    of every process queues again jobs left in the processing list by workers which stopped sending heartbeats, so jobs
+    of crashed processes are not lost. Jobs interrupted by shutdown are queued again right away.
+
+    Handlers report progress through the job context, which is also where cancellation takes effect. A job may be run
+    again after its worker crashed, so handlers should be safe to repeat.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        *,
+        queue: str,
+        workers: int,
+        poll_timeout: int,
+        heartbeat_interval: float,
+        stale_after: float,
+    ) -> None:
+        self.store = store
+        self.queue = queue
+        self.processing_queue = f'{queue}:processing'
+        self.workers = workers
+        self.poll_timeout = poll_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+
+        self._handlers: dict[str, JobHandler] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def job_types(self) -> set[str]:
+        return set(self._handlers)
+
+    def handler(self, job_type: str) -> Callable[[JobHandler], JobHandler]:
+        """Register decorated function as the handler of the job type."""
+
+        def decorator(handler: JobHandler) -> JobHandler:
+            self._handlers[job_type] = handler
+            return handler
+
+        return decorator
+
+    async def submit(self, job_type: str, owner: str, payload: dict[str, Any]) -> Job:
+        """Record the job and queue it for the workers."""
+
+        if job_type not in self._handlers:
+            raise ValueError(f'Unknown job type "{job_type}"')
+
+        job = await self.store.create(job_type, owner, payload)
+        await self.store.redis_manager.client.rpush(self.queue, job.id)
+        logger.info(f'Submitted {job_type} job "{job.id}"')
+        return job
+
+    async def cancel(self, job_id: str) -> Job | None:
+        """Cancel pending job right away or request running job to stop at its next progress report."""
+
+        job = await self.store.get(job_id)
+        if job is None or job.is_finished:
+            return job
+
+        await self.store.request_cancel(job_id)
+        await self.store.transition(job_id, JobStatus.PENDING, JobStatus.CANCELLED)
+
+        return await self.store.get(job_id)
+
+    async def watch(self, job_id: str, interval: float) -> AsyncIterator[Job]:
+        """Yield the job every time it changes until it is finished."""
+
+        previous = None
+        while True:
+            job = await self.store.get(job_id)
+            if job is None:
+                return
+
+            if job != previous:
+                yield job
+                previous = job
+            if job.is_finished:
+                return
+
+            await asyncio.sleep(interval)
+
+    async def _requeue(self, job_id: str) -> None:
+        client = self.store.redis_manager.client
+        async with client.pipeline(transaction=self.store.redis_manager.supports_transactions) as pipe:
+            pipe.lrem(self.processing_queue, 1, job_id)
+            pipe.rpush(self.queue, job_id)
+            await pipe.execute()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.store.heartbeat(job_id)
+            except (RedisError, OSError) as e:
+                logger.error(f'Unable to record heartbeat of job "{job_id}": {e}')
+
+    async def run(self, job_id: str) -> None:
+        """Process the job unless it was cancelled or taken by another worker."""
+
+        job = await self.store.get(job_id)
+        if job is None:
+            return
+
+        handler = self._handlers.get(job.type)
+        if handler is None:
+            await self.store.transition(
+                job_id, JobStatus.PENDING, JobStatus.FAILED, error=f'Unknown job type "{job.type}"'
+            )
+            return
+
+        if not await self.store.transition(job_id, JobStatus.PENDING, JobStatus.RUNNING):
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        status = JobStatus.SUCCEEDED
+        fields = {}
+        try:
+            fields['result'] = await handler(JobContext(self.store, job), await self.store.get_payload(job_id))
+        except JobCancelled:
+            status = JobStatus.CANCELLED
+        except asyncio.CancelledError:
+            if await self.store.transition(job_id, JobStatus.RUNNING, JobStatus.PENDING):
+                await self._requeue(job_id)
+            raise
+        except Exception as e:
+            logger.exception(f'Job "{job_id}" failed')
+            status = JobStatus.FAILED
+            fields['error'] = str(e)
+        finally:
+            heartbeat.cancel()
+
+        if await self.store.transition(job_id, JobStatus.RUNNING, status, **fields):
+            JOBS_PROCESSED.labels(job.type, status.value).inc()
+            logger.info(f'Finished {job.type} job "{job_id}" with {status.value} status')
+
+    async def reap(self) -> None:
+        """Queue again jobs from the processing list whose workers stopped sending heartbeats."""
+
+        client = self.store.redis_manager.client
+        stale_before = time.time() - self.stale_after
+        for job_id in set(await client.lrange(self.processing_queue, 0, -1)):
+            state = await self.store.reap(job_id, stale_before)
+            if state == 'requeue':
+                logger.warning(f'Queueing again job "{job_id}" abandoned by its worker')
+                await self._requeue(job_id)
+            elif state != 'alive':
+                await client.lrem(self.processing_queue, 0, job_id)
+
+    async def _reap(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.reap()
+            except (RedisError, OSError) as e:
+                logger.error(f'Unable to reap abandoned jobs: {e}')
+
+    async def _work(self) -> None:
+        while True:
+            try:
+                job_id = await self.store.redis_manager.client.blmove(
+                    self.queue, self.processing_queue, self.poll_timeout
+                )
+            except (RedisError, OSError) as e:
+                logger.error(f'Unable to fetch job from the queue: {e}')
+                await asyncio.sleep(self.poll_timeout)
+                continue
+
+            if not job_id:
+                continue
+
+            try:
+                await self.run(job_id)
+                await self.store.redis_manager.client.lrem(self.processing_queue, 1, job_id)
+            except (RedisError, OSError) as e:
+                logger.error(f'Unable to update job "{job_id}", leaving it to the reaper: {e}')
+
+    async def start(self) -> None:
+        """Start the worker pool and the reaper of this process."""
+
+        if self._tasks:
+            return
+
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._reap()))
+
+    async def stop(self) -> None:
+        """Stop the workers, queueing again jobs in progress."""
+
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+job_runner = JobRunner(
+    JobStore(redis_manager, ttl=ConfigClass.JOB_TTL),
+    queue=ConfigClass.JOB_QUEUE,
+    workers=ConfigClass.JOB_WORKERS,
+    poll_timeout=ConfigClass.JOB_POLL_TIMEOUT,
+    heartbeat_interval=ConfigClass.JOB_HEARTBEAT_INTERVAL,
+    stale_after=ConfigClass.JOB_STALE_AFTER,
+)
@@ -0,0 +1,154 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+
+from fastapi.responses import JSONResponse
+from prometheus_client import Counter
+from prometheus_client import Gauge
+from starlette.types import ASGIApp
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from app.components.route_class import RouteClass
+from app.components.route_class import match_route_class
+from app.logger import logger
+from config import ConfigClass
+from models.api_response import EAPIResponseCode
+
+EVENT_LOOP_LAG = Gauge('bff_event_loop_lag_seconds', 'Delay of the event loop in running scheduled callbacks.')
+IN_FLIGHT_REQUESTS = Gauge('bff_in_flight_requests', 'Requests being processed by the worker.')
+LOAD_SHED = Counter(
+    'bff_load_shed_total', 'Requests rejected because the worker is overloaded.', ['route_class', 'reason']
+)
+
+
+class EventLoopLagMonitor:
+    """Measure how late the event loop wakes up a task sleeping for a fixed interval.
+
+    The lag also grows while the loop is still blocked and the task has not been woken up yet, so a single long blocking
+    call is noticed before it finishes.
+    """
+
+    def __init__(self, *, interval: float) -> None:
+        self.interval = interval
+
+        self._lag = 0.0
+        self._expected_at: float | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def lag(self) -> float:
+        if self._expected_at is None:
+            return self._lag
+
+        overdue = asyncio.get_running_loop().time() - self._expected_at
+        return max(self._lag, overdue)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._expected_at = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self._lag = max(0.0, loop.time() - self._expected_at)
+            EVENT_LOOP_LAG.set(self._lag)
+
+    def start(self) -> None:
+        """Start measuring lag of the running event loop unless it is already measured."""
+
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+
+        self._lag = 0.0
+        self._expected_at = None
+        self._task = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop measuring lag."""
+
+        if self._task is None:
+            return
+
+        task, self._task = self._task, None
+        self._expected_at = None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+class LoadSheddingMiddleware:
+    """Fail fast with 503 response for non-critical route classes while the worker is overloaded.
+
+    The worker is considered overloaded when the number of requests in flight or the event loop lag exceeds its limit.
+    Requests not matching any of the sheddable route classes, such as uploads and downloads, are always processed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        monitor: EventLoopLagMonitor,
+        route_classes: list[RouteClass],
+        max_in_flight: int,
+        max_event_loop_lag: float,
+        retry_after: int,
+    ) -> None:
+        self.app = app
+        self.monitor = monitor
+        self.route_classes = route_classes
+        self.max_in_flight = max_in_flight
+        self.max_event_loop_lag = max_event_loop_lag
+        self.retry_after = retry_after
+
+        self.in_flight = 0
+
+    def get_overload_reason(self) -> str | None:
+        """Return the exceeded limit or None if the worker is not overloaded."""
+
+        if self.in_flight >= self.max_in_flight:
+            return 'in_flight'
+        if self.monitor.lag >= self.max_event_loop_lag:
+            return 'event_loop_lag'
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        self.monitor.start()
+
+        route_class = match_route_class(self.route_classes, scope['method'], scope['path'])
+        reason = self.get_overload_reason() if route_class else None
+        if reason:
+            LOAD_SHED.labels(route_class.name, reason).inc()
+            logger.warning(f'Shedding "{scope["path"]}" request because of {reason} limit')
+            response = JSONResponse(
+                status_code=EAPIResponseCode.service_unavailable.value,
+                content={
+                    'code': EAPIResponseCode.service_unavailable.value,
+                    'error_msg': 'Service is overloaded',
+                    'result': '',
+                },
+                headers={'Retry-After': str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        IN_FLIGHT_REQUESTS.inc()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            IN_FLIGHT_REQUESTS.dec()
+
+
+event_loop_lag_monitor = EventLoopLagMonitor(interval=ConfigClass.LOAD_SHEDDING_LAG_CHECK_INTERVAL)
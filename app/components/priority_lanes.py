@@ -0,0 +1,117 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from prometheus_client import Gauge
+from starlette.types import ASGIApp
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from app.components.route_class import RouteClass
+from app.components.route_class import match_route_class
+from config import ConfigClass
+
+PRIORITY_LANE_ACTIVE = Gauge('bff_priority_lane_active', 'Requests holding a slot of the priority lane.', ['lane'])
+PRIORITY_LANE_WAITING = Gauge(
+    'bff_priority_lane_waiting', 'Requests waiting for a slot of the priority lane.', ['lane']
+)
+
+INTERACTIVE_LANE = 'interactive'
+
+current_lane: ContextVar[str] = ContextVar('current_lane', default=INTERACTIVE_LANE)
+
+
+class PriorityLane:
+    """Lane with its own budget of requests which can be processed concurrently."""
+
+    def __init__(self, name: str, concurrency: int) -> None:
+        self.name = name
+        self.concurrency = concurrency
+
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for a free slot of the lane and hold it until the block exits."""
+
+        PRIORITY_LANE_WAITING.labels(self.name).inc()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            PRIORITY_LANE_WAITING.labels(self.name).dec()
+
+        PRIORITY_LANE_ACTIVE.labels(self.name).inc()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+            PRIORITY_LANE_ACTIVE.labels(self.name).dec()
+
+
+class PriorityLanes:
+    """Separate bulk work from latency-sensitive interactive requests.
+
+    Requests are classified into lanes by route, or explicitly by handlers when only the payload tells the request is
+    bulk work. Every lane with a budget processes at most that many requests at once, so its downstream calls can never
+    take more than the share of the worker and of the downstream services. The interactive lane is unbounded unless a
+    budget is configured for it.
+    """
+
+    def __init__(self, *, enabled: bool, budgets: dict[str, int], route_classes: list[RouteClass]) -> None:
+        self.enabled = enabled
+        self.route_classes = route_classes
+
+        self.lanes = {name: PriorityLane(name, concurrency) for name, concurrency in budgets.items()}
+
+    def classify(self, method: str, path: str) -> str:
+        """Return name of the lane the request belongs to."""
+
+        route_class = match_route_class(self.route_classes, method, path)
+        return route_class.name if route_class else INTERACTIVE_LANE
+
+    @asynccontextmanager
+    async def enter(self, name: str) -> AsyncIterator[None]:
+        """Process the block within the lane unless the current request is already in it."""
+
+        lane = self.lanes.get(name)
+        if not self.enabled or lane is None or current_lane.get() == name:
+            yield
+            return
+
+        async with lane.slot():
+            token = current_lane.set(name)
+            try:
+                yield
+            finally:
+                current_lane.reset(token)
+
+
+class PriorityLaneMiddleware:
+    """Process every request within the lane of its route."""
+
+    def __init__(self, app: ASGIApp, priority_lanes: PriorityLanes) -> None:
+        self.app = app
+        self.priority_lanes = priority_lanes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        async with self.priority_lanes.enter(self.priority_lanes.classify(scope['method'], scope['path'])):
+            await self.app(scope, receive, send)
+
+
+priority_lanes = PriorityLanes(
+    enabled=ConfigClass.PRIORITY_LANES_ENABLED,
+    budgets=ConfigClass.PRIORITY_LANE_BUDGETS,
+    route_classes=[RouteClass.parse(route_class) for route_class in ConfigClass.PRIORITY_LANE_ROUTE_CLASSES],
+)
@@ -0,0 +1,206 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import math
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+import jwt
+from fastapi.responses import JSONResponse
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp
+from starlette.types import Receive
+from starlette.types import Scope
+from starlette.types import Send
+
+from app.components.cache import InMemoryCache
+from app.components.redis import RedisCache
+from app.components.route_class import RouteClass
+from app.logger import logger
+from models.api_response import EAPIResponseCode
+
+RATE_LIMIT_THROTTLED = Counter('bff_rate_limit_throttled_total', 'Requests rejected by rate limits.', ['route_class'])
+
+TOKEN_BUCKET_SCRIPT = '''
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'timestamp')
+local tokens = tonumber(bucket[1]) or burst
+local timestamp = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - timestamp) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'timestamp', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(retry_after)
+'''
+
+
+@dataclass
+class RateLimitRule:
+    """Token bucket limit of the route class shared by all requests of one client."""
+
+    route: RouteClass
+    rate: float
+    burst: int
+
+    @classmethod
+    def parse(cls, rule: Mapping[str, Any]) -> 'RateLimitRule':
+        return cls(route=RouteClass.parse(rule), rate=float(rule['rate']), burst=int(rule['burst']))
+
+    @property
+    def route_class(self) -> str:
+        return self.route.name
+
+    def matches(self, method: str, path: str) -> bool:
+        return self.route.matches(method, path)
+
+    @property
+    def idle_ttl(self) -> float:
+        """Return time after which an unused bucket is full again."""
+
+        return self.burst / self.rate + 1
+
+
+class TokenBucket:
+    """In-process token bucket."""
+
+    def __init__(self, rate: float, burst: int, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.timestamp = now
+
+    def take(self, now: float) -> float:
+        """Take one token and return zero or the number of seconds until a token is available."""
+
+        self.tokens = min(self.burst, self.tokens + max(0.0, now - self.timestamp) * self.rate)
+        self.timestamp = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Enforce rate limits with buckets shared between workers through Redis.
+
+    Every worker keeps its own bucket for each client as a fast path. A client exceeding the limit in a single worker
+    exceeds it overall, so it is rejected without a Redis round-trip, as is a client rejected by Redis until the retry
+    time passes. Only the local buckets are used while Redis is unavailable.
+    """
+
+    def __init__(self, redis_cache: RedisCache, rules: list[RateLimitRule], *, local_max_size: int) -> None:
+        self.redis_cache = redis_cache
+        self.rules = rules
+
+        self._buckets = InMemoryCache(ttl=60, max_size=local_max_size)
+        self._blocked = InMemoryCache(ttl=60, max_size=local_max_size)
+        self._script = None
+
+    def get_rule(self, method: str, path: str) -> RateLimitRule | None:
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return None
+
+    async def _acquire_shared(self, rule: RateLimitRule, client: str, now: float) -> float:
+        redis = self.redis_cache.redis_manager.client
+        if self._script is None:
+            self._script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+        key = f'rate-limit:{rule.route_class}:{client}'
+        return float(await self._script(keys=[key], args=[rule.rate, rule.burst, now], client=redis))
+
+    async def acquire(self, rule: RateLimitRule, client: str) -> float:
+        """Take one token for the client and return zero or the number of seconds the client has to wait."""
+
+        now = time.time()
+        key = (rule.route_class, client)
+
+        blocked_until = self._blocked.get(key)
+        if blocked_until is not None and blocked_until > now:
+            return blocked_until - now
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(rule.rate, rule.burst, now)
+        retry_after = bucket.take(now)
+        self._buckets.set(key, bucket, ttl=rule.idle_ttl)
+        if retry_after or self.redis_cache.is_open:
+            return retry_after
+
+        try:
+            retry_after = await self._acquire_shared(rule, client, now)
+        except (RedisError, OSError) as e:
+            logger.error(f'Unable to check rate limit in redis, using local limit: {e}')
+            return 0
+
+        if retry_after:
+            self._blocked.set(key, now + retry_after, ttl=retry_after)
+        return retry_after
+
+
+def get_client_identity(scope: Scope) -> str:
+    """Return username from the token or address of the client."""
+
+    headers = Headers(scope=scope)
+    token = headers.get('authorization')
+    if token:
+        try:
+            username = jwt.decode(token.split()[-1], options={'verify_signature': False}).get('preferred_username')
+        except jwt.PyJWTError:
+            username = None
+        if username:
+            return f'user:{username}'
+
+    forwarded_for = headers.get('x-forwarded-for')
+    if forwarded_for:
+        return f'ip:{forwarded_for.split(",")[0].strip()}'
+
+    client = scope.get('client')
+    return f'ip:{client[0]}' if client else 'anonymous'
+
+
+class RateLimitMiddleware:
+    """Reject requests exceeding rate limit of their route class with 429 response."""
+
+    def __init__(self, app: ASGIApp, rate_limiter: RateLimiter) -> None:
+        self.app = app
+        self.rate_limiter = rate_limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.rate_limiter.get_rule(scope['method'], scope['path'])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = await self.rate_limiter.acquire(rule, get_client_identity(scope))
+        if not retry_after:
+            await self.app(scope, receive, send)
+            return
+
+        RATE_LIMIT_THROTTLED.labels(rule.route_class).inc()
+        response = JSONResponse(
+            status_code=EAPIResponseCode.too_many_requests.value,
+            content={'code': EAPIResponseCode.too_many_requests.value, 'error_msg': 'Too many requests', 'result': ''},
+            headers={'Retry-After': str(math.ceil(retry_after))},
+        )
+        await response(scope, receive, send)
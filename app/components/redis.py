@@ -0,0 +1,305 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+from prometheus_client import Gauge
+from prometheus_client import Histogram
+from redis.asyncio import ConnectionPool
+from redis.asyncio import Redis
+from redis.asyncio.cluster import RedisCluster
+from redis.asyncio.sentinel import Sentinel
+from redis.exceptions import ConnectionError
+from redis.exceptions import RedisError
+from redis.exceptions import TimeoutError
+
+from app.components.cache import InMemoryCache
+from app.logger import logger
+from config import ConfigClass
+from config import Settings
+
+REDIS_COMMAND_DURATION = Histogram(
+    'bff_redis_command_duration_seconds', 'Duration of Redis commands.', ['command', 'status']
+)
+REDIS_CIRCUIT_OPEN = Gauge('bff_redis_circuit_open', 'Whether Redis is bypassed because it is unavailable.')
+REDIS_POOL_CONNECTIONS = Gauge('bff_redis_pool_connections', 'Connections in the Redis connection pool.', ['state'])
+
+
+class InstrumentedCommandsMixin:
+    """Record duration of every executed command."""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        start = time.perf_counter()
+        status = 'success'
+        try:
+            return await super().execute_command(*args, **options)
+        except RedisError:
+            status = 'error'
+            raise
+        finally:
+            REDIS_COMMAND_DURATION.labels(str(args[0]).lower(), status).observe(time.perf_counter() - start)
+
+
+class InstrumentedRedis(InstrumentedCommandsMixin, Redis):
+    """Redis client with command metrics."""
+
+
+class InstrumentedRedisCluster(InstrumentedCommandsMixin, RedisCluster):
+    """Redis Cluster client with command metrics."""
+
+
+class RedisManager:
+    """Owner of the Redis client shared by the whole application.
+
+    The client is created lazily on first use with an explicit connection pool, so every cache goes through the same
+    pool. Sentinel or Cluster deployments are used when the corresponding url is configured, otherwise the standalone
+    Redis url is used.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+
+        self._client: Redis | RedisCluster | None = None
+
+    @property
+    def is_cluster(self) -> bool:
+        return bool(self.settings.REDIS_CLUSTER_URL)
+
+    @property
+    def supports_transactions(self) -> bool:
+        """Cluster pipelines can not be wrapped into MULTI/EXEC transactions."""
+
+        return not self.is_cluster
+
+    def _get_connection_kwargs(self) -> dict[str, Any]:
+        return {
+            'max_connections': self.settings.REDIS_MAX_CONNECTIONS,
+            'socket_timeout': self.settings.REDIS_SOCKET_TIMEOUT,
+            'socket_connect_timeout': self.settings.REDIS_SOCKET_TIMEOUT,
+            'socket_keepalive': True,
+            'health_check_interval': self.settings.REDIS_HEALTH_CHECK_INTERVAL,
+            'retry_on_error': [ConnectionError, TimeoutError],
+            'decode_responses': True,
+        }
+
+    def _create_sentinel_client(self, url: str) -> Redis:
+        """Create client for the master of sentinel url formatted as redis+sentinel://[:password@]host:port,.../name."""
+
+        parsed = urlsplit(url)
+        hosts = []
+        for host in parsed.netloc.rpartition('@')[2].split(','):
+            hostname, _, port = host.rpartition(':')
+            hosts.append((hostname, int(port)))
+        service_name, _, db = parsed.path.strip('/').partition('/')
+
+        sentinel = Sentinel(hosts, password=parsed.password, socket_timeout=self.settings.REDIS_SOCKET_TIMEOUT)
+        return sentinel.master_for(
+            service_name, redis_class=InstrumentedRedis, db=int(db or 0), **self._get_connection_kwargs()
+        )
+
+    def _create_client(self) -> Redis | RedisCluster:
+        if self.settings.REDIS_SENTINEL_URL:
+            logger.info('Connecting to redis through sentinel')
+            return self._create_sentinel_client(self.settings.REDIS_SENTINEL_URL)
+
+        if self.settings.REDIS_CLUSTER_URL:
+            logger.info('Connecting to redis cluster')
+            return InstrumentedRedisCluster.from_url(self.settings.REDIS_CLUSTER_URL, **self._get_connection_kwargs())
+
+        logger.info('Connecting to redis')
+        pool = ConnectionPool.from_url(self.settings.REDIS_URL, **self._get_connection_kwargs())
+        return InstrumentedRedis(connection_pool=pool)
+
+    @property
+    def client(self) -> Redis | RedisCluster:
+        """Return the shared client, creating it on first use."""
+
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    def get_pool_stats(self) -> dict[str, int]:
+        """Return number of in use and available connections of the standalone or sentinel connection pool."""
+
+        pool = getattr(self._client, 'connection_pool', None)
+        if pool is None:
+            return {'in_use': 0, 'available': 0}
+
+        return {'in_use': len(pool._in_use_connections), 'available': len(pool._available_connections)}
+
+    async def ping(self) -> bool:
+        """Check that Redis responds."""
+
+        try:
+            return bool(await self.client.ping())
+        except RedisError as e:
+            logger.error(f'Redis health check failed: {e}')
+            return False
+
+    async def connect(self) -> None:
+        """Create the client and check the connection on application startup."""
+
+        if not await self.ping():
+            logger.warning('Redis is unavailable on startup, caches will be skipped until it recovers')
+
+    async def disconnect(self) -> None:
+        """Close the client together with all pooled connections."""
+
+        if self._client is None:
+            return
+
+        client, self._client = self._client, None
+        try:
+            await client.close()
+            if isinstance(client, Redis):
+                await client.connection_pool.disconnect()
+        except (RedisError, RuntimeError) as e:
+            logger.warning(f'Unable to close redis connections: {e}')
+
+
+class RedisCache:
+    """Key value cache in Redis which falls back to a bounded in-process store while Redis is unavailable.
+
+    Consecutive failures trip the circuit, after which the operations go straight to the in-process store without
+    touching Redis, and Redis is probed in the background until it responds again. Keys which could not be deleted from
+    Redis, during the outage or because of a single failed call, are deleted before the next Redis operation, so no
+    stale entries are served afterwards.
+    """
+
+    def __init__(
+        self,
+        redis_manager: RedisManager,
+        *,
+        failure_threshold: int,
+        probe_interval: float,
+        fallback_ttl: int,
+        fallback_max_size: int,
+    ) -> None:
+        self.redis_manager = redis_manager
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+
+        self.fallback = InMemoryCache(ttl=fallback_ttl, max_size=fallback_max_size)
+        self._failures = 0
+        self._probe_task: asyncio.Task | None = None
+        self._pending_deletes: set[str] = set()
+
+    @property
+    def is_open(self) -> bool:
+        """Return True when the circuit is tripped and Redis is bypassed."""
+
+        return self._probe_task is not None
+
+    def _record_success(self) -> None:
+        self._failures = 0
+
+    async def _flush_pending_deletes(self) -> None:
+        """Delete keys which were invalidated while Redis was not reachable."""
+
+        if not self._pending_deletes:
+            return
+
+        keys = list(self._pending_deletes)
+        await self.redis_manager.client.delete(*keys)
+        self._pending_deletes.difference_update(keys)
+
+    def _record_failure(self, error: Exception) -> None:
+        self._failures += 1
+        logger.error(f"Couldn't connect to redis, using in-process cache: {error}")
+        if self._failures >= self.failure_threshold and not self.is_open:
+            logger.warning('Redis circuit is open, probing redis in background')
+            REDIS_CIRCUIT_OPEN.set(1)
+            self._probe_task = asyncio.create_task(self._probe())
+
+    async def _probe(self) -> None:
+        while True:
+            await asyncio.sleep(self.probe_interval)
+            if await self.redis_manager.ping():
+                break
+
+        try:
+            await self._flush_pending_deletes()
+        except (RedisError, OSError) as e:
+            logger.error(f'Unable to delete keys invalidated during redis outage: {e}')
+
+        self.fallback.clear()
+        self._failures = 0
+        self._probe_task = None
+        REDIS_CIRCUIT_OPEN.set(0)
+        logger.info('Redis circuit is closed')
+
+    async def get(self, key: str) -> str | None:
+        """Return value stored under the key or None if it is missing."""
+
+        if self.is_open:
+            return self.fallback.get(key)
+
+        try:
+            await self._flush_pending_deletes()
+            value = await self.redis_manager.client.get(key)
+        except (RedisError, OSError) as e:
+            self._record_failure(e)
+            return self.fallback.get(key)
+
+        self._record_success()
+        return value
+
+    async def set(self, key: str, value: str, ttl: int | None = None) -> None:
+        """Store value under the key, expiring after ttl seconds."""
+
+        if self.is_open:
+            self.fallback.set(key, value, ttl)
+            return
+
+        try:
+            await self._flush_pending_deletes()
+            await self.redis_manager.client.set(key, value, ex=ttl)
+        except (RedisError, OSError) as e:
+            self._record_failure(e)
+            self.fallback.set(key, value, ttl)
+            return
+
+        self._record_success()
+
+    async def delete(self, key: str) -> None:
+        """Remove the key from both stores."""
+
+        self.fallback.delete(key)
+        if self.is_open:
+            self._pending_deletes.add(key)
+            return
+
+        self._pending_deletes.add(key)
+        try:
+            await self._flush_pending_deletes()
+        except (RedisError, OSError) as e:
+            self._record_failure(e)
+            return
+
+        self._record_success()
+
+    async def close(self) -> None:
+        """Stop probing redis."""
+
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            self._probe_task = None
+
+
+redis_manager = RedisManager(ConfigClass)
+redis_cache = RedisCache(
+    redis_manager,
+    failure_threshold=ConfigClass.REDIS_CIRCUIT_FAILURE_THRESHOLD,
+    probe_interval=ConfigClass.REDIS_CIRCUIT_PROBE_INTERVAL,
+    fallback_ttl=ConfigClass.REDIS_FALLBACK_CACHE_TTL,
+    fallback_max_size=ConfigClass.REDIS_FALLBACK_CACHE_MAX_SIZE,
+)
+
+REDIS_POOL_CONNECTIONS.labels('in_use').set_function(lambda: redis_manager.get_pool_stats()['in_use'])
+REDIS_POOL_CONNECTIONS.labels('available').set_function(lambda: redis_manager.get_pool_stats()['available'])
@@ -4,6 +4,8 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from typing import Any
 
 from httpx import URL
@@ -91,3 +93,18 @@ class HTTPClient:
     ) -> Response:
         async with self.client as client:
             return await client.request('DELETE', url, json=json, params=params, headers=headers)
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        url: URL | str,
+        *,
+        params: QueryParamTypes | None = None,
+        headers: HeaderTypes | None = None,
+    ) -> AsyncIterator[Response]:
+        """Send request and yield response without reading its body into memory."""
+
+        async with self.client as client:
+            async with client.stream(method, url, params=params, headers=headers) as response:
+                yield response
@@ -0,0 +1,40 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import re
+from collections.abc import Iterable
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class RouteClass:
+    """Named group of routes matched by path pattern and optionally by request methods."""
+
+    name: str
+    path: re.Pattern
+    methods: frozenset[str] = frozenset()
+
+    @classmethod
+    def parse(cls, route_class: Mapping[str, Any]) -> 'RouteClass':
+        return cls(
+            name=route_class['route_class'],
+            path=re.compile(route_class['path']),
+            methods=frozenset(method.upper() for method in route_class.get('methods', [])),
+        )
+
+    def matches(self, method: str, path: str) -> bool:
+        return (not self.methods or method in self.methods) and self.path.match(path) is not None
+
+
+def match_route_class(route_classes: Iterable[RouteClass], method: str, path: str) -> RouteClass | None:
+    """Return the first route class matching the request."""
+
+    for route_class in route_classes:
+        if route_class.matches(method, path):
+            return route_class
+    return None
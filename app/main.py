@@ -4,6 +4,9 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from common import ProjectException
 from common import configure_logging
 from fastapi import FastAPI
@@ -24,6 +27,19 @@ from app.api_registry import api_registry
 from app.components.exceptions import APIException
 from app.components.exceptions import ServiceException
 from app.components.exceptions import UnhandledException
+from app.components.idempotency import IdempotencyMiddleware
+from app.components.invalidation import invalidation_bus
+from app.components.jobs import job_runner
+from app.components.load_shedding import LoadSheddingMiddleware
+from app.components.load_shedding import event_loop_lag_monitor
+from app.components.priority_lanes import PriorityLaneMiddleware
+from app.components.priority_lanes import priority_lanes
+from app.components.rate_limit import RateLimiter
+from app.components.rate_limit import RateLimitMiddleware
+from app.components.rate_limit import RateLimitRule
+from app.components.redis import redis_cache
+from app.components.redis import redis_manager
+from app.components.route_class import RouteClass
 from app.logger import logger
 from config import Settings
 from config import get_settings
@@ -40,6 +56,7 @@ def create_app(settings: Settings | None = None) -> FastAPI:
         description='Backend for Frontend Web',
         docs_url='/v1/api-doc',
         redoc_url='/v1/api-redoc',
+        lifespan=lifespan,
     )
 
     setup_logging(settings)
@@ -52,6 +69,21 @@ def create_app(settings: Settings | None = None) -> FastAPI:
     return app
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Manage connections shared by the application for its lifetime."""
+
+    await redis_manager.connect()
+    await invalidation_bus.start()
+    await job_runner.start()
+    yield
+    await job_runner.stop()
+    await event_loop_lag_monitor.stop()
+    await invalidation_bus.stop()
+    await redis_cache.close()
+    await redis_manager.disconnect()
+
+
 def setup_logging(settings: Settings) -> None:
     """Configure the application logging."""
 
@@ -67,6 +99,36 @@ def setup_routers(app: FastAPI) -> None:
 def setup_middlewares(app: FastAPI, settings: Settings) -> None:
     """Configure the application middlewares."""
 
+    if settings.IDEMPOTENCY_ENABLED:
+        app.add_middleware(
+            IdempotencyMiddleware,
+            redis_cache=redis_cache,
+            route_classes=[RouteClass.parse(route_class) for route_class in settings.IDEMPOTENCY_ROUTE_CLASSES],
+            ttl=settings.IDEMPOTENCY_TTL,
+            lock_ttl=settings.IDEMPOTENCY_LOCK_TTL,
+            wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT,
+            poll_interval=settings.IDEMPOTENCY_POLL_INTERVAL,
+            max_response_size=settings.IDEMPOTENCY_MAX_RESPONSE_SIZE,
+        )
+
+    if settings.RATE_LIMIT_ENABLED:
+        rules = [RateLimitRule.parse(rule) for rule in settings.RATE_LIMIT_RULES]
+        rate_limiter = RateLimiter(redis_cache, rules, local_max_size=settings.RATE_LIMIT_LOCAL_MAX_SIZE)
+        app.add_middleware(RateLimitMiddleware, rate_limiter=rate_limiter)
+
+    if settings.PRIORITY_LANES_ENABLED:
+        app.add_middleware(PriorityLaneMiddleware, priority_lanes=priority_lanes)
+
+    if settings.LOAD_SHEDDING_ENABLED:
+        app.add_middleware(
+            LoadSheddingMiddleware,
+            monitor=event_loop_lag_monitor,
+            route_classes=[RouteClass.parse(route_class) for route_class in settings.LOAD_SHEDDING_ROUTE_CLASSES],
+            max_in_flight=settings.LOAD_SHEDDING_MAX_IN_FLIGHT,
+            max_event_loop_lag=settings.LOAD_SHEDDING_MAX_EVENT_LOOP_LAG,
+            retry_after=settings.LOAD_SHEDDING_RETRY_AFTER,
+        )
+
     app.add_middleware(
         CORSMiddleware,
         allow_origins='*',
@@ -7,6 +7,7 @@
 import logging
 from functools import lru_cache
 from typing import Annotated
+from typing import Any
 
 from fastapi import Depends
 from pydantic import BaseSettings
@@ -35,6 +36,9 @@ class Settings(BaseSettings):
 
     FORBIDDEN_CONTAINER_CODES: set[str] = {'platform'}
 
+    UPLOAD_PRESIGNED_URLS_LIMIT: int = 1000
+    UPLOAD_PRESIGNED_URLS_CONCURRENCY: int = 20
+
     CORE_ZONE_LABEL: str = 'Core'
     GREENROOM_ZONE_LABEL: str = 'Greenroom'
 
@@ -59,10 +63,96 @@ class Settings(BaseSettings):
     REDIS_HOST: str = '127.0.0.1'
     REDIS_PORT: int = 6379
     REDIS_PASSWORD: str = ''
+    REDIS_SENTINEL_URL: str = ''
+    REDIS_CLUSTER_URL: str = ''
+    REDIS_MAX_CONNECTIONS: int = 100
+    REDIS_SOCKET_TIMEOUT: float = 5
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    REDIS_CIRCUIT_FAILURE_THRESHOLD: int = 3
+    REDIS_CIRCUIT_PROBE_INTERVAL: float = 5
+    REDIS_FALLBACK_CACHE_TTL: int = 300
+    REDIS_FALLBACK_CACHE_MAX_SIZE: int = 10000
+    CACHE_INVALIDATION_CHANNEL: str = 'bff:cache-invalidation'
+    CACHE_INVALIDATION_POLL_TIMEOUT: float = 1
+    CACHE_INVALIDATION_RECONNECT_INTERVAL: float = 5
+
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_LOCAL_MAX_SIZE: int = 10000
+    RATE_LIMIT_RULES: list[dict[str, Any]] = [
+        {'route_class': 'files-meta', 'path': r'^/v1/files/meta', 'methods': ['GET'], 'rate': 5, 'burst': 20},
+        {'route_class': 'project-files-search', 'path': r'^/v1/project-files/[^/]+/search', 'rate': 2, 'burst': 10},
+    ]
+
+    LOAD_SHEDDING_ENABLED: bool = False
+    LOAD_SHEDDING_MAX_IN_FLIGHT: int = 500
+    LOAD_SHEDDING_MAX_EVENT_LOOP_LAG: float = 0.5
+    LOAD_SHEDDING_LAG_CHECK_INTERVAL: float = 0.1
+    LOAD_SHEDDING_RETRY_AFTER: int = 5
+    LOAD_SHEDDING_ROUTE_CLASSES: list[dict[str, Any]] = [
+        {
+            'route_class': 'statistics',
+            'path': r'^/v1/project-files/[^/]+/(statistics|size|activity)$',
+            'methods': ['GET'],
+        },
+        {'route_class': 'statistics', 'path': r'^/v1/containers/[^/]+/roles/users/stats$', 'methods': ['GET']},
+        {
+            'route_class': 'dashboards',
+            'path': r'^/v1/(visits|user-notifications|maintenance-announcements/)$',
+            'methods': ['GET'],
+        },
+        {'route_class': 'dashboards', 'path': r'^/v1/project/[^/]+/announcements/$', 'methods': ['GET']},
+        {'route_class': 'listings', 'path': r'^/v1/(project/)?activity-logs/', 'methods': ['GET']},
+        {'route_class': 'listings', 'path': r'^/v1/files/meta$', 'methods': ['GET']},
+    ]
+
+    PRIORITY_LANES_ENABLED: bool = False
+    PRIORITY_LANE_BUDGETS: dict[str, int] = {'bulk': 4}
+    PRIORITY_LANE_ROUTE_CLASSES: list[dict[str, Any]] = [
+        {'route_class': 'bulk', 'path': r'^/v2/entity/tags$', 'methods': ['POST']},
+        {'route_class': 'bulk', 'path': r'^/v1/file/attributes/attach$', 'methods': ['POST']},
+        {'route_class': 'bulk', 'path': r'^/v1/users$', 'methods': ['PUT']},
+    ]
+
+    IDEMPOTENCY_ENABLED: bool = True
+    IDEMPOTENCY_TTL: int = 86400
+    IDEMPOTENCY_LOCK_TTL: int = 300
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 30
+    IDEMPOTENCY_POLL_INTERVAL: float = 0.2
+    IDEMPOTENCY_MAX_RESPONSE_SIZE: int = 1048576
+    IDEMPOTENCY_ROUTE_CLASSES: list[dict[str, Any]] = [
+        {'route_class': 'preupload', 'path': r'^/v1/project/[^/]+/files$', 'methods': ['POST']},
+        {'route_class': 'file-actions', 'path': r'^/v1/files/actions$', 'methods': ['POST']},
+        {'route_class': 'download', 'path': r'^/v2/download/pre$', 'methods': ['POST']},
+        {'route_class': 'publish', 'path': r'^/v1/dataset/[^/]+/publish$', 'methods': ['POST']},
+        {'route_class': 'version-sharing', 'path': r'^/v1/dataset-version-sharing-requests/$', 'methods': ['POST']},
+    ]
+
+    JOB_QUEUE: str = '{bff:jobs}'
+    JOB_WORKERS: int = 4
+    JOB_TTL: int = 86400
+    JOB_POLL_TIMEOUT: int = 1
+    JOB_HEARTBEAT_INTERVAL: float = 5
+    JOB_STALE_AFTER: float = 60
+    JOB_PROGRESS_INTERVAL: float = 1
 
     USER_CACHE_EXPIRY: int = 180
     ENABLE_USER_CACHE: bool = True
     ENABLE_CACHE: bool = True
+    FOLDER_PATH_CACHE_TTL: int = 30
+    FOLDER_PATH_CACHE_NEGATIVE_TTL: int = 5
+    FOLDER_PATH_CACHE_MAX_SIZE: int = 10000
+    ARCHIVE_LISTING_CACHE_TTL: int = 24 * 60 * 60
+    ARCHIVE_LISTING_LOCAL_CACHE_TTL: int = 300
+    ARCHIVE_LISTING_LOCAL_CACHE_MAX_SIZE: int = 100
+    VISITS_ENTITY_CACHE_TTL: int = 300
+    VISITS_ENTITY_CACHE_MAX_SIZE: int = 10000
+    VISITS_HYDRATION_CACHE_TTL: int = 60
+    VISITS_HYDRATION_CACHE_MAX_SIZE: int = 10000
+
+    PREVIEW_CACHE_ENABLED: bool = False
+    PREVIEW_CACHE_DIRECTORY: str = '/tmp/bff-preview-cache'
+    PREVIEW_CACHE_MAX_SIZE: int = 1024 * 1024 * 1024
+    PREVIEW_CACHE_MAX_ENTRY_SIZE: int = 64 * 1024 * 1024
 
     # Email addresses
     EMAIL_SUPPORT: str
@@ -11,12 +11,16 @@ from fastapi.responses import JSONResponse
 
 class EAPIResponseCode(Enum):
     success = 200
+    accepted = 202
     internal_error = 500
     bad_request = 400
     not_found = 404
     forbidden = 403
     unauthorized = 401
     conflict = 409
+    unprocessable_entity = 422
+    too_many_requests = 429
+    service_unavailable = 503
 
 
 class APIResponse:
@@ -18,6 +18,9 @@ class AddVisits(BaseModel):
     code: str
     entity: Entities
 
+    class Config:
+        use_enum_values = True
+
 
 class AddVisitsResponse(BaseModel):
     result: str
@@ -0,0 +1,44 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from enum import Enum
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class JobStatus(str, Enum):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    @classmethod
+    def get_finished(cls) -> set['JobStatus']:
+        return {cls.SUCCEEDED, cls.FAILED, cls.CANCELLED}
+
+
+class Job(BaseModel):
+    id: str
+    type: str
+    owner: str
+    status: JobStatus
+    total: int = 0
+    completed: int = 0
+    result: Any = None
+    error: str = ''
+    created_at: float
+    updated_at: float
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in JobStatus.get_finished()
+
+
+class SubmitJob(BaseModel):
+    type: str
+    payload: dict[str, Any] = {}
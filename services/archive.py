@@ -0,0 +1,104 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import json
+import math
+from typing import Any
+
+from prometheus_client import Counter
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.components.cache import InMemoryCache
+from app.logger import logger
+from config import ConfigClass
+
+ARCHIVE_LISTING_CACHE_REQUESTS = Counter(
+    'bff_archive_listing_cache_requests_total', 'Archive listing cache lookups.', ['result']
+)
+
+
+class ArchiveListingCache:
+    """Cache of zip archive listings keyed by file id and file version.
+
+    Listings are shared between workers through Redis and kept in a small in-process cache in front of it, so repeated
+    browsing inside the same archive does not leave the process at all.
+    """
+
+    def __init__(self, *, enabled: bool, ttl: int, local_ttl: int, local_max_size: int) -> None:
+        self.enabled = enabled
+        self.ttl = ttl
+
+        self.local = InMemoryCache(ttl=local_ttl, max_size=local_max_size)
+
+    @staticmethod
+    def make_key(file_id: str, version: str) -> str:
+        return f'archive-listing:{file_id}:{version}'
+
+    async def get(self, redis: Redis, file_id: str, version: str) -> dict[str, Any] | None:
+        """Return cached listing or None if it is not available."""
+
+        if not self.enabled:
+            return None
+
+        key = self.make_key(file_id, version)
+        listing = self.local.get(key)
+        if listing is not None:
+            ARCHIVE_LISTING_CACHE_REQUESTS.labels('local').inc()
+            return listing
+
+        try:
+            value = await redis.get(key)
+        except RedisError:
+            logger.exception(f'Unable to read archive listing "{key}" from redis')
+            value = None
+
+        if value is None:
+            ARCHIVE_LISTING_CACHE_REQUESTS.labels('miss').inc()
+            return None
+
+        listing = json.loads(value)
+        self.local.set(key, listing)
+        ARCHIVE_LISTING_CACHE_REQUESTS.labels('redis').inc()
+        return listing
+
+    async def set(self, redis: Redis, file_id: str, version: str, listing: dict[str, Any]) -> None:
+        """Store listing in both cache layers."""
+
+        if not self.enabled:
+            return
+
+        key = self.make_key(file_id, version)
+        self.local.set(key, listing)
+        try:
+            await redis.set(key, json.dumps(listing), ex=self.ttl)
+        except RedisError:
+            logger.exception(f'Unable to write archive listing "{key}" to redis')
+
+
+def paginate_listing(listing: dict[str, Any], page: int, page_size: int) -> dict[str, Any]:
+    """Return copy of the listing response with only one page of the top level archive entries."""
+
+    result = listing.get('result') or {}
+    entries = list(result.items()) if isinstance(result, dict) else list(result)
+    start = page * page_size
+    page_entries = entries[start : start + page_size]
+
+    return {
+        **listing,
+        'result': dict(page_entries) if isinstance(result, dict) else page_entries,
+        'page': page,
+        'total': len(entries),
+        'num_of_pages': math.ceil(len(entries) / page_size),
+    }
+
+
+archive_listing_cache = ArchiveListingCache(
+    enabled=ConfigClass.ENABLE_CACHE,
+    ttl=ConfigClass.ARCHIVE_LISTING_CACHE_TTL,
+    local_ttl=ConfigClass.ARCHIVE_LISTING_LOCAL_CACHE_TTL,
+    local_max_size=ConfigClass.ARCHIVE_LISTING_LOCAL_CACHE_MAX_SIZE,
+)
@@ -4,16 +4,21 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
-import itertools
+from functools import partial
 from typing import Annotated
 from typing import Any
 
+import httpx
 from common.project.project_exceptions import ProjectNotFoundException
 from fastapi import Depends
 from redis.asyncio import Redis
 from redis.exceptions import RedisError
 
+from app.components.cache import InMemoryCache
 from app.components.exceptions import APIException
+from app.components.invalidation import InvalidationScope
+from app.components.invalidation import invalidation_bus
+from app.components.redis import redis_manager
 from app.logger import logger
 from config import ConfigClass
 from services.dataset.client import DatasetServiceClient
@@ -27,6 +32,16 @@ class BridgeService:
     REDIS = None
     BASE_VISIT_KEY = '{}:{}:visits'
     VISITS_LIMIT = 10
+    EXISTING_ENTITIES = (
+        InMemoryCache(ttl=ConfigClass.VISITS_ENTITY_CACHE_TTL, max_size=ConfigClass.VISITS_ENTITY_CACHE_MAX_SIZE)
+        if ConfigClass.ENABLE_CACHE
+        else None
+    )
+    VISITED_ENTITIES = (
+        InMemoryCache(ttl=ConfigClass.VISITS_HYDRATION_CACHE_TTL, max_size=ConfigClass.VISITS_HYDRATION_CACHE_MAX_SIZE)
+        if ConfigClass.ENABLE_CACHE
+        else None
+    )
 
     def __init__(
         self, *, project_service_client: ProjectServiceClient, dataset_service_client: DatasetServiceClient
@@ -34,35 +49,45 @@ class BridgeService:
         self.project_service_client = project_service_client
         self.dataset_service_client = dataset_service_client
 
-    async def _get_key(self, entity: str, username: str) -> bool:
-        key = self.BASE_VISIT_KEY.format(entity, username)
-        exists = await self.REDIS.exists(key)
-        return key, exists
+    def _get_key(self, entity: str, username: str) -> str:
+        return self.BASE_VISIT_KEY.format(entity, username)
 
     async def _is_entity_exists(self, entity: str, code: str) -> bool:
+        """Check that entity exists, remembering the existing ones for a while to skip the service calls."""
+
+        if self.EXISTING_ENTITIES and self.EXISTING_ENTITIES.get((entity, code)):
+            return True
+
         if entity == 'project':
             await self.project_service_client.get(code=code)
         else:
             await self.dataset_service_client.get_dataset_by_code(code)
+
+        if self.EXISTING_ENTITIES is not None:
+            self.EXISTING_ENTITIES.set((entity, code), True)
         return True
 
     async def connect_redis(self) -> Redis:
         if not self.REDIS:
-            logger.info('connection to redis')
-            self.REDIS = await Redis.from_url(ConfigClass.REDIS_URL, decode_responses=True)
+            self.REDIS = redis_manager.client
         return self.REDIS
 
     async def add_visit(self, entity: str, code: str, username: str) -> bool:
+        """Move code to the head of the user visits, keeping only the latest unique visits.
+
+        Deduplication, push and cap are sent as a single pipeline, so the update costs one round-trip to Redis. The
+        pipeline is a transaction unless Redis Cluster is used.
+        """
+
         try:
             await self._is_entity_exists(entity, code)
-            key, key_exists = await self._get_key(entity, username)
+            key = self._get_key(entity, username)
             logger.info(f'key: {key}')
-            if not key_exists:
-                limit = self.VISITS_LIMIT - 1
-                logger.info(f'setting trim to new key {limit}')
-                await self.REDIS.ltrim(key, 0, limit)
-            await self.REDIS.lrem(key, 0, code)
-            await self.REDIS.lpush(key, code)
+            async with self.REDIS.pipeline(transaction=redis_manager.supports_transactions) as pipeline:
+                pipeline.lrem(key, 0, code)
+                pipeline.lpush(key, code)
+                pipeline.ltrim(key, 0, self.VISITS_LIMIT - 1)
+                await pipeline.execute()
             return True
         except RedisError:
             raise APIException(400, 'add visits ERROR')
@@ -73,10 +98,8 @@ class BridgeService:
 
     async def get_visits(self, entity: str, username: str, last: int) -> list:
         try:
-            key, key_exists = await self._get_key(entity, username)
+            key = self._get_key(entity, username)
             logger.info(f'key: {key}')
-            if not key_exists:
-                return []
             logger.info(f'redis getting last {last} visits')
             return await self.REDIS.lrange(key, 0, last - 1)
         except RedisError:
@@ -86,13 +109,59 @@ class BridgeService:
     async def sort_result_by_visit_codes_order(
         self, codes: list[str], entity_result: list[dict[str, Any]]
     ) -> list[dict[str, Any]]:
-        result = []
-        if entity_result:
-            for codes_entities in itertools.product(codes, entity_result):
-                if codes_entities[0] == codes_entities[1]['code']:
-                    result.append(codes_entities[1])
-            return result
-        return entity_result
+        entities = {entity['code']: entity for entity in entity_result}
+        return [entities[code] for code in codes if code in entities]
+
+    async def hydrate_visits(self, entity: str, codes: list[str]) -> tuple[int, dict[str, Any]]:
+        """Return status code and content with the visited entities ordered as the visit codes.
+
+        Entities found in the cache are reused and only the missing codes are fetched from the project or dataset
+        service. The content is the same whether the entities came from the cache or not.
+        """
+
+        entities = []
+        if self.VISITED_ENTITIES is not None:
+            for code in codes:
+                cached = self.VISITED_ENTITIES.get((entity, code))
+                if cached is not None:
+                    entities.append(cached)
+
+        cached_codes = {cached['code'] for cached in entities}
+        missing_codes = [code for code in codes if code not in cached_codes]
+        if missing_codes:
+            if entity == 'project':
+                url = f'{ConfigClass.PROJECT_SERVICE}/v1/projects/'
+            else:
+                url = f'{ConfigClass.DATASET_SERVICE}datasets/'
+
+            async with httpx.AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
+                response = await client.get(url, params={'code_any': ','.join(missing_codes)})
+            if response.status_code != 200:
+                return response.status_code, response.json()
+
+            for fetched in response.json()['result']:
+                entities.append(fetched)
+                if self.VISITED_ENTITIES is not None:
+                    self.VISITED_ENTITIES.set((entity, fetched['code']), fetched)
+
+        result = await self.sort_result_by_visit_codes_order(codes, entities)
+        return 200, {'result': result, 'total': len(result)}
+
+
+def evict_entity(entity: str, code: str | None) -> None:
+    """Evict entity with the code or all entities of the type from the in-process caches."""
+
+    for cache in (BridgeService.EXISTING_ENTITIES, BridgeService.VISITED_ENTITIES):
+        if cache is None:
+            continue
+        if code is None:
+            cache.delete_matching(lambda key: key[0] == entity)
+        else:
+            cache.delete((entity, code))
+
+
+invalidation_bus.subscribe(InvalidationScope.PROJECT, partial(evict_entity, 'project'))
+invalidation_bus.subscribe(InvalidationScope.DATASET, partial(evict_entity, 'dataset'))
 
 
 async def get_bridge_service(
@@ -4,7 +4,9 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from collections.abc import AsyncIterator
 from collections.abc import Mapping
+from contextlib import asynccontextmanager
 from typing import Any
 from uuid import UUID
 
@@ -39,6 +41,22 @@ class DatasetServiceClient:
 
         return await self.client.get(f'{self.endpoint_v1}/datasets/', params=parameters)
 
+    async def get_file_preview(self, file_id: str, parameters: Mapping[str, str]) -> Response:
+        """Get file preview."""
+
+        return await self.client.get(f'{self.endpoint_v1}/{file_id}/preview', params=parameters)
+
+    @asynccontextmanager
+    async def stream_file_preview(
+        self, file_id: str, parameters: Mapping[str, str], headers: Mapping[str, str] | None = None
+    ) -> AsyncIterator[Response]:
+        """Open streaming file preview and yield response with unread body."""
+
+        async with self.client.stream(
+            'GET', f'{self.endpoint_v1}/{file_id}/preview/stream', params=parameters, headers=headers
+        ) as response:
+            yield response
+
     async def get_dataset_version(self, version_id: UUID) -> dict[str, Any]:
         """Get dataset version by id."""
 
@@ -0,0 +1,216 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import hashlib
+import json
+import mmap
+import os
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Iterator
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import uuid4
+
+from fastapi.concurrency import run_in_threadpool
+from prometheus_client import Counter
+from prometheus_client import Gauge
+
+from app.logger import logger
+from config import ConfigClass
+
+PREVIEW_CACHE_REQUESTS = Counter('bff_preview_cache_requests_total', 'Preview cache lookups.', ['result'])
+PREVIEW_CACHE_SIZE = Gauge('bff_preview_cache_size_bytes', 'Total size of cached previews on disk.')
+
+
+@dataclass
+class CachedPreview:
+    """File preview read from the cache."""
+
+    status_code: int
+    headers: dict[str, str]
+    body: mmap.mmap
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[bytes]:
+        """Iterate over the body in chunks and release the memory map afterwards."""
+
+        try:
+            for offset in range(0, len(self.body), chunk_size):
+                yield self.body[offset : offset + chunk_size]
+        finally:
+            self.body.close()
+
+    def read(self) -> bytes:
+        """Read the whole body and release the memory map."""
+
+        try:
+            return self.body[:]
+        finally:
+            self.body.close()
+
+
+class PreviewCache:
+    """Local on-disk cache of immutable dataset file previews.
+
+    Entries are stored under the digest of file id, file version, requested range and query parameters and are read
+    back through memory mapping. The directory may be shared by all workers, so the usage is taken from the directory
+    itself before evicting, and reading an entry refreshes its modification time to mark it as recently used. The least
+    recently used entries are evicted once the total size exceeds the cap. Disk access runs in the threadpool.
+    """
+
+    def __init__(self, *, enabled: bool, directory: str, max_size: int, max_entry_size: int) -> None:
+        self.enabled = enabled
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.max_entry_size = max_entry_size
+
+    @staticmethod
+    def make_key(
+        file_id: str, version: str, byte_range: str | None, parameters: Mapping[str, str], stream: bool
+    ) -> str:
+        """Compute the cache key from everything that affects the preview content."""
+
+        parts = [file_id, version, byte_range or '', 'stream' if stream else 'json', *sorted(parameters.items())]
+        return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+    def _body_path(self, key: str) -> Path:
+        return self.directory / key
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / f'{key}.meta'
+
+    def _temporary_path(self) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return self.directory / f'{uuid4().hex}.tmp'
+
+    def _remove(self, key: str) -> None:
+        for path in (self._body_path(key), self._meta_path(key)):
+            path.unlink(missing_ok=True)
+
+    def _scan(self) -> tuple[list[tuple[int, str, int]], int]:
+        """Return entries of all workers ordered from the least recently used together with their total size."""
+
+        entries = []
+        for path in self.directory.iterdir():
+            if path.suffix or not self._meta_path(path.name).exists():
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, path.name, stat.st_size))
+
+        entries.sort()
+        return entries, sum(size for _, _, size in entries)
+
+    def _evict(self) -> None:
+        entries, size = self._scan()
+        for _, key, entry_size in entries:
+            if size <= self.max_size:
+                break
+            logger.info(f'Evicting preview cache entry "{key}"')
+            self._remove(key)
+            size -= entry_size
+
+        PREVIEW_CACHE_SIZE.set(size)
+
+    def _read(self, key: str) -> CachedPreview | None:
+        body_path = self._body_path(key)
+        try:
+            meta = json.loads(self._meta_path(key).read_text())
+            with open(body_path, 'rb') as file:
+                body = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.exception(f'Unable to read preview cache entry "{key}"')
+            self._remove(key)
+            return None
+
+        now = time.time_ns()
+        try:
+            os.utime(body_path, ns=(now, now))
+        except FileNotFoundError:
+            pass
+
+        return CachedPreview(status_code=meta['status_code'], headers=meta['headers'], body=body)
+
+    def _commit(self, key: str, temporary_path: Path, status_code: int, headers: Mapping[str, str]) -> None:
+        if not temporary_path.stat().st_size:
+            temporary_path.unlink()
+            return
+
+        self._meta_path(key).write_text(json.dumps({'status_code': status_code, 'headers': dict(headers)}))
+        os.replace(temporary_path, self._body_path(key))
+        self._evict()
+
+    def _write(self, key: str, status_code: int, headers: Mapping[str, str], body: bytes) -> None:
+        temporary_path = self._temporary_path()
+        temporary_path.write_bytes(body)
+        self._commit(key, temporary_path, status_code, headers)
+
+    async def get(self, key: str) -> CachedPreview | None:
+        """Return cached preview or None if it is not available."""
+
+        if not self.enabled:
+            return None
+
+        cached = await run_in_threadpool(self._read, key)
+        PREVIEW_CACHE_REQUESTS.labels('hit' if cached else 'miss').inc()
+        return cached
+
+    async def put(self, key: str, status_code: int, headers: Mapping[str, str], body: bytes) -> None:
+        """Store non-empty preview in the cache if it fits."""
+
+        if not self.enabled or len(body) > self.max_entry_size:
+            return
+
+        await run_in_threadpool(self._write, key, status_code, headers, body)
+
+    async def tee(
+        self, key: str, status_code: int, headers: Mapping[str, str], chunks: AsyncIterator[bytes]
+    ) -> AsyncIterator[bytes]:
+        """Relay chunks while storing them in the cache.
+
+        The entry is committed only when the whole body was relayed and it does not exceed the entry size cap.
+        """
+
+        if not self.enabled:
+            async for chunk in chunks:
+                yield chunk
+            return
+
+        temporary_path = await run_in_threadpool(self._temporary_path)
+        written = 0
+        file = await run_in_threadpool(open, temporary_path, 'wb')
+        try:
+            async for chunk in chunks:
+                if file and written + len(chunk) <= self.max_entry_size:
+                    await run_in_threadpool(file.write, chunk)
+                    written += len(chunk)
+                elif file:
+                    await run_in_threadpool(file.close)
+                    file = None
+                    await run_in_threadpool(temporary_path.unlink, missing_ok=True)
+                yield chunk
+
+            if file:
+                await run_in_threadpool(file.close)
+                file = None
+                await run_in_threadpool(self._commit, key, temporary_path, status_code, headers)
+        finally:
+            if file:
+                file.close()
+            temporary_path.unlink(missing_ok=True)
+
+
+preview_cache = PreviewCache(
+    enabled=ConfigClass.PREVIEW_CACHE_ENABLED,
+    directory=ConfigClass.PREVIEW_CACHE_DIRECTORY,
+    max_size=ConfigClass.PREVIEW_CACHE_MAX_SIZE,
+    max_entry_size=ConfigClass.PREVIEW_CACHE_MAX_ENTRY_SIZE,
+)
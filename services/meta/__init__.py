@@ -15,6 +15,13 @@ from config import ConfigClass
 from models.api_response import EAPIResponseCode
 
 
+def get_item_version(item: dict[str, Any]) -> str | None:
+    """Return the value identifying the immutable version of the item content."""
+
+    storage = item.get('storage') or {}
+    return storage.get('version') or item.get('last_updated_time')
+
+
 async def async_get_entity_by_id(entity_id: str) -> dict[str, Any]:
     async with httpx.AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
         url = f'{ConfigClass.METADATA_SERVICE}item/{entity_id}/'
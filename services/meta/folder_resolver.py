@@ -0,0 +1,171 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Any
+
+from httpx import AsyncClient
+
+from app.components.exceptions import APIException
+from app.components.invalidation import InvalidationScope
+from app.components.invalidation import invalidation_bus
+from app.logger import logger
+from config import ConfigClass
+from models.api_response import EAPIResponseCode
+from models.models_item import ItemStatus
+
+CacheKey = tuple[str, int, str, str]
+
+
+class FolderPathResolver:
+    """Resolve metadata items by project, zone and path with a short-lived in-process cache.
+
+    Missing items are cached as well, but for a shorter period of time, so the items created outside the BFF become
+    visible quickly.
+    """
+
+    def __init__(self, *, enabled: bool, ttl: int, negative_ttl: int, max_size: int) -> None:
+        self.enabled = enabled
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+
+        self._entries: OrderedDict[CacheKey, tuple[float, dict[str, Any] | None]] = OrderedDict()
+        self._pending: dict[CacheKey, asyncio.Task] = {}
+
+    @staticmethod
+    def split_path(path: str) -> tuple[str, str]:
+        """Split path into parent path and name."""
+
+        parent_path, _, name = path.strip('/').rpartition('/')
+        return parent_path, name
+
+    def _get(self, key: CacheKey) -> tuple[bool, dict[str, Any] | None]:
+        try:
+            expires_at, entity = self._entries[key]
+        except KeyError:
+            return False, None
+
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return False, None
+
+        self._entries.move_to_end(key)
+        return True, entity
+
+    def _set(self, key: CacheKey, entity: dict[str, Any] | None) -> None:
+        ttl = self.ttl if entity else self.negative_ttl
+        self._entries[key] = (time.monotonic() + ttl, entity)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def _search(
+        self, project_code: str, zone: int, path: str, status: str, headers: Mapping[str, str] | None
+    ) -> dict[str, Any] | None:
+        parent_path, name = self.split_path(path)
+        params = {
+            'container_code': project_code,
+            'container_type': 'project',
+            'zone': zone,
+            'parent_path': parent_path,
+            'name': name,
+            'status': status,
+            'recursive': False,
+        }
+        if headers:
+            headers = {key: value for key, value in headers.items() if value is not None}
+
+        async with AsyncClient(timeout=ConfigClass.SERVICE_CLIENT_TIMEOUT) as client:
+            response = await client.get(ConfigClass.METADATA_SERVICE + 'items/search/', params=params, headers=headers)
+
+        if response.status_code != 200:
+            error_msg = f'Error calling Meta service search_entities: {response.text}'
+            raise APIException(error_msg=error_msg, status_code=EAPIResponseCode.internal_error.value)
+
+        result = response.json()['result']
+        return result[0] if result else None
+
+    async def _fetch(
+        self, key: CacheKey, project_code: str, zone: int, path: str, status: str, headers: Mapping[str, str] | None
+    ) -> dict[str, Any] | None:
+        entity = await self._search(project_code, zone, path, status, headers)
+        self._set(key, entity)
+        return entity
+
+    async def resolve(
+        self,
+        project_code: str,
+        zone: int,
+        path: str,
+        headers: Mapping[str, str] | None = None,
+        status: str = ItemStatus.ACTIVE,
+    ) -> dict[str, Any] | None:
+        """Return item located at the path or None if it does not exist.
+
+        Concurrent lookups of the same path share a single call to the metadata service.
+        """
+
+        if not self.enabled:
+            return await self._search(project_code, zone, path, status, headers)
+
+        key = (project_code, zone, path.strip('/'), str(status))
+        found, entity = self._get(key)
+        if found:
+            return entity
+
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, project_code, zone, path, status, headers))
+            self._pending[key] = task
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    def invalidate(self, project_code: str, zone: int | None = None, path: str | None = None) -> None:
+        """Evict cached items of the project, optionally narrowed down to a zone and a path with its descendants."""
+
+        path = path.strip('/') if path is not None else None
+        for key in list(self._entries):
+            key_project_code, key_zone, key_path, _ = key
+            if key_project_code != project_code:
+                continue
+            if zone is not None and key_zone != zone:
+                continue
+            if path is not None and key_path != path and not key_path.startswith(f'{path}/'):
+                continue
+            del self._entries[key]
+
+        logger.info(f'Invalidated folder path cache for project "{project_code}", zone "{zone}" and path "{path}"')
+
+    def clear(self) -> None:
+        """Evict all cached items."""
+
+        self._entries.clear()
+
+
+folder_path_resolver = FolderPathResolver(
+    enabled=ConfigClass.ENABLE_CACHE,
+    ttl=ConfigClass.FOLDER_PATH_CACHE_TTL,
+    negative_ttl=ConfigClass.FOLDER_PATH_CACHE_NEGATIVE_TTL,
+    max_size=ConfigClass.FOLDER_PATH_CACHE_MAX_SIZE,
+)
+
+
+def evict_project_folders(project_code: str | None) -> None:
+    """Evict cached items of the project or all cached items."""
+
+    if project_code is None:
+        folder_path_resolver.clear()
+    else:
+        folder_path_resolver.invalidate(project_code)
+
+
+invalidation_bus.subscribe(InvalidationScope.PROJECT, evict_project_folders)
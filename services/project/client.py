@@ -9,11 +9,17 @@ from uuid import UUID
 from common import ProjectClient
 from fastapi import Depends
 
+from app.components.redis import redis_manager
 from config import Settings
 from config import get_settings
 
 
 class ProjectServiceClient(ProjectClient):
+    async def connect_redis(self) -> None:
+        """Use the shared Redis client instead of opening a new connection on every call."""
+
+        self.redis = redis_manager.client
+
     async def convert_project_codes_into_ids(self, project_codes: list[str]) -> list[UUID]:
         """Convert list of project codes into list of project ids."""
 
@@ -0,0 +1,87 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from collections.abc import Iterable
+from collections.abc import Mapping
+from typing import Any
+
+from fastapi import Depends
+from httpx import AsyncClient
+from httpx import Response
+
+from app.logger import logger
+from config import Settings
+from config import get_settings
+
+
+class UploadServiceException(Exception):
+    """Raised when any unexpected behaviour occurred while querying upload service."""
+
+
+class UploadServiceClient:
+    """Client for upload service."""
+
+    def __init__(self, endpoint: str, timeout: int, concurrency: int) -> None:
+        self.endpoint_v1 = f'{endpoint}/v1'
+        self.client = AsyncClient(timeout=timeout)
+        self.concurrency = concurrency
+
+    async def _get(self, url: str, params: Mapping[str, Any], headers: Mapping[str, str] | None = None) -> Response:
+        try:
+            response = await self.client.get(url, params=params, headers=headers)
+            assert response.is_success
+        except Exception:
+            message = f'Unable to query data from upload service with url "{url}" and params "{params}".'
+            logger.exception(message)
+            raise UploadServiceException(message)
+
+        return response
+
+    async def generate_presigned_url(
+        self, bucket: str, key: str, upload_id: str, chunk_number: int, headers: Mapping[str, str] | None = None
+    ) -> str:
+        """Generate presigned url for uploading a single chunk."""
+
+        url = self.endpoint_v1 + '/files/chunks/presigned'
+        params = {'bucket': bucket, 'key': key, 'upload_id': upload_id, 'chunk_number': chunk_number}
+        response = await self._get(url, params, headers)
+
+        return response.json()['result']
+
+    async def generate_presigned_urls(
+        self,
+        bucket: str,
+        key: str,
+        upload_id: str,
+        chunk_numbers: Iterable[int],
+        headers: Mapping[str, str] | None = None,
+    ) -> dict[int, str]:
+        """Generate presigned urls for uploading multiple chunks.
+
+        Requests are sent concurrently over the same connection pool and never exceed the configured concurrency.
+        """
+
+        chunk_numbers = sorted(set(chunk_numbers))
+        logger.info(f'Generating {len(chunk_numbers)} chunk presigned urls for upload "{upload_id}"')
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def generate(chunk_number: int) -> str:
+            async with semaphore:
+                return await self.generate_presigned_url(bucket, key, upload_id, chunk_number, headers)
+
+        presigned_urls = await asyncio.gather(*(generate(chunk_number) for chunk_number in chunk_numbers))
+
+        return dict(zip(chunk_numbers, presigned_urls))
+
+
+def get_upload_service_client(settings: Settings = Depends(get_settings)) -> UploadServiceClient:
+    """Get upload service client as a FastAPI dependency."""
+
+    return UploadServiceClient(
+        settings.UPLOAD_SERVICE, settings.SERVICE_CLIENT_TIMEOUT, settings.UPLOAD_PRESIGNED_URLS_CONCURRENCY
+    )
@@ -0,0 +1,47 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import json
+import re
+
+from config import ConfigClass
+
+
+async def test_folder_creation_creates_folder_under_resolved_parent(test_async_client, httpx_mock, jwt_token_admin):
+    parent = {'id': 'parent-id', 'name': 'folder', 'parent_path': 'admin'}
+    search_url = re.compile(r'^' + ConfigClass.METADATA_SERVICE + 'items/search/.*$')
+    httpx_mock.add_response(method='GET', url=search_url, json={'result': [parent]})
+    httpx_mock.add_response(method='POST', url=ConfigClass.METADATA_SERVICE + 'item/', json={'result': {}})
+
+    payload = {'folder_name': 'new', 'project_code': 'test_project', 'zone': 'greenroom', 'parent_path': 'admin/folder'}
+    response = await test_async_client.post('/v1/containers/project-id/folder', json=payload)
+
+    assert response.status_code == 200
+    search_request = httpx_mock.get_request(method='GET', url=search_url)
+    create_request = httpx_mock.get_request(method='POST')
+    assert search_request.url.params['parent_path'] == 'admin'
+    assert search_request.url.params['name'] == 'folder'
+    created = json.loads(create_request.content)
+    assert created['parent'] == 'parent-id'
+    assert created['parent_path'] == 'admin/folder'
+
+
+async def test_folder_creation_returns_403_when_parent_does_not_exist(test_async_client, httpx_mock, jwt_token_admin):
+    httpx_mock.add_response(
+        method='GET',
+        url=re.compile(r'^' + ConfigClass.METADATA_SERVICE + 'items/search/.*$'),
+        json={'result': []},
+    )
+
+    payload = {
+        'folder_name': 'new',
+        'project_code': 'test_project',
+        'zone': 'greenroom',
+        'parent_path': 'admin/missing',
+    }
+    response = await test_async_client.post('/v1/containers/project-id/folder', json=payload)
+
+    assert response.status_code == 403
@@ -7,7 +7,10 @@
 import re
 from uuid import uuid4
 
+from app.components.jobs import job_runner
+from app.components.redis import redis_manager
 from config import ConfigClass
+from models.jobs import JobStatus
 from models.models_item import ItemStatus
 
 MOCK_FILE_DATA = {
@@ -190,3 +193,34 @@ def test_update_tags_contrib_200(test_client, requests_mocker, jwt_token_contrib
     headers = {'Authorization': jwt_token_contrib}
     response = test_client.post('/v2/entity/tags', json=payload, headers=headers)
     assert response.status_code == 200
+
+
+async def test_update_tags_in_background_runs_batch_tags_job(
+    test_async_client, requests_mocker, jwt_token_admin, has_permission_true
+):
+    requests_mocker.get(ConfigClass.METADATA_SERVICE + 'items/search', json={'result': [MOCK_FILE_DATA]})
+    matcher = re.compile(ConfigClass.METADATA_SERVICE + 'items/batch.*')
+    requests_mocker.get(matcher, json={'result': [MOCK_FILE_DATA]})
+    requests_mocker.put(ConfigClass.METADATA_SERVICE + 'items/batch', json={'result': [MOCK_FILE_DATA]})
+
+    payload = {
+        'entity': [MOCK_FILE_DATA['id']],
+        'tags': ['tag3'],
+        'only_files': False,
+        'operation': 'add',
+        'inherit': True,
+    }
+    response = await test_async_client.post(
+        '/v2/entity/tags?background=true', json=payload, headers={'Authorization': jwt_token_admin}
+    )
+    assert response.status_code == 202
+
+    job_id = response.json()['result']['id']
+    await job_runner.run(job_id)
+
+    job = await job_runner.store.get(job_id)
+    assert job.status == JobStatus.SUCCEEDED
+    assert (job.completed, job.total) == (1, 1)
+    assert requests_mocker.last_request.qs['ids'] == [MOCK_FILE_DATA['id']] * 2
+
+    await redis_manager.client.flushall()
@@ -8,7 +8,10 @@ import copy
 from urllib import parse
 from uuid import uuid4
 
+from app.components.jobs import job_runner
+from app.components.redis import redis_manager
 from config import ConfigClass
+from models.jobs import JobStatus
 from models.models_item import ItemStatus
 
 MOCK_FILE_DATA = {
@@ -480,3 +483,68 @@ async def test_attach_attributes_to_file_and_folder_contrib_200(
     }
     response = await test_async_client.post('/v1/file/attributes/attach', json=payload, headers=headers)
     assert response.status_code == 200
+
+
+async def test_delete_template_in_background_fails_job_when_template_is_attached_to_files(
+    test_async_client, httpx_mock, jwt_token_admin, has_permission_true
+):
+    httpx_mock.add_response(
+        method='GET', url=ConfigClass.METADATA_SERVICE + f'template/{template_id}/', json={'result': MOCK_TEMPLATE_DATA}
+    )
+    attached_file = copy.deepcopy(MOCK_FILE_DATA_2)
+    attached_file['extended']['extra']['attributes'] = {template_id: {'attr1': 'A'}}
+    url = (
+        f'{ConfigClass.METADATA_SERVICE}items/search/'
+        f'?container_code=test_project&zone=0&recursive=true&status={ItemStatus.ACTIVE}&type=file'
+    )
+    httpx_mock.add_response(method='GET', url=url, json={'result': [attached_file]})
+
+    headers = {'Authorization': ''}
+    response = await test_async_client.delete(f'/v1/data/manifest/{template_id}?background=true', headers=headers)
+    assert response.status_code == 202
+
+    job_id = response.json()['result']['id']
+    await job_runner.run(job_id)
+
+    job = await job_runner.store.get(job_id)
+    assert job.status == JobStatus.FAILED
+    assert job.error == 'Cant delete manifest attached to files'
+
+    await redis_manager.client.flushall()
+
+
+async def test_attach_attributes_in_background_reports_progress_and_result(
+    test_async_client, httpx_mock, jwt_token_contrib, has_permission_true
+):
+    file_id = MOCK_FILE_DATA_2['id']
+    httpx_mock.add_response(
+        method='GET', url=f'{ConfigClass.METADATA_SERVICE}item/{file_id}/', json={'result': MOCK_FILE_DATA_2}
+    )
+    httpx_mock.add_response(
+        method='PUT',
+        url=f'{ConfigClass.METADATA_SERVICE}items/batch/?ids={file_id}',
+        json={'result': [MOCK_FILE_DATA_2]},
+    )
+
+    headers = {'Authorization': ''}
+    payload = {
+        'item_ids': [file_id],
+        'manifest_id': template_id,
+        'project_code': MOCK_FILE_DATA_2['container_code'],
+        'attributes': {'attr1': 'A'},
+    }
+    response = await test_async_client.post('/v1/file/attributes/attach?background=true', json=payload, headers=headers)
+    assert response.status_code == 202
+
+    job_id = response.json()['result']['id']
+    await job_runner.run(job_id)
+
+    job = await job_runner.store.get(job_id)
+    assert job.status == JobStatus.SUCCEEDED
+    assert (job.completed, job.total) == (1, 1)
+    assert job.result == {
+        'result': [{'name': MOCK_FILE_DATA_2['name'], 'geid': file_id, 'operation_status': 'SUCCEED'}],
+        'total': 1,
+    }
+
+    await redis_manager.client.flushall()
@@ -0,0 +1,90 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from uuid import uuid4
+
+import pytest
+
+from app.components.redis import redis_manager
+from config import ConfigClass
+from services.archive import ArchiveListingCache
+
+LISTING = {'code': 200, 'error_msg': '', 'result': {'a.txt': {'is_dir': False}, 'b.txt': {'is_dir': False}}}
+
+
+@pytest.fixture
+def file_id(httpx_mock) -> str:
+    file_id = str(uuid4())
+    httpx_mock.add_response(
+        method='GET',
+        url=f'{ConfigClass.METADATA_SERVICE}item/{file_id}/',
+        json={'result': {'id': file_id, 'storage': {'version': 'v1'}}},
+    )
+    return file_id
+
+
+@pytest.fixture
+async def archive_listing_cache(mocker) -> ArchiveListingCache:
+    archive_listing_cache = ArchiveListingCache(enabled=True, ttl=60, local_ttl=60, local_max_size=10)
+    mocker.patch('api.api_archive.archive_listing_cache', archive_listing_cache)
+    yield archive_listing_cache
+    await redis_manager.client.flushall()
+
+
+async def test_archive_returns_listing_from_dataops(
+    test_async_client, httpx_mock, mocker, jwt_token_admin, file_id, archive_listing_cache
+):
+    mocker.patch('api.api_archive.has_file_permission', return_value=True)
+    httpx_mock.add_response(method='GET', url=f'{ConfigClass.DATAOPS_SERVICE}archive?file_id={file_id}', json=LISTING)
+
+    response = await test_async_client.get('/v1/archive', params={'file_id': file_id}, headers={'Authorization': ''})
+
+    assert response.status_code == 200
+    assert response.json() == LISTING
+
+
+async def test_archive_calls_dataops_once_for_same_file_version(
+    test_async_client, httpx_mock, mocker, jwt_token_admin, file_id, archive_listing_cache
+):
+    mocker.patch('api.api_archive.has_file_permission', return_value=True)
+    httpx_mock.add_response(method='GET', url=f'{ConfigClass.DATAOPS_SERVICE}archive?file_id={file_id}', json=LISTING)
+
+    for page in range(2):
+        response = await test_async_client.get(
+            '/v1/archive', params={'file_id': file_id, 'page': page, 'page_size': 1}, headers={'Authorization': ''}
+        )
+        assert response.status_code == 200
+
+    assert response.json()['result'] == {'b.txt': {'is_dir': False}}
+    assert response.json()['total'] == 2
+    assert len(httpx_mock.get_requests(url=f'{ConfigClass.DATAOPS_SERVICE}archive?file_id={file_id}')) == 1
+
+
+async def test_archive_does_not_cache_failed_listing(
+    test_async_client, httpx_mock, mocker, jwt_token_admin, file_id, archive_listing_cache
+):
+    mocker.patch('api.api_archive.has_file_permission', return_value=True)
+    httpx_mock.add_response(
+        method='GET',
+        url=f'{ConfigClass.DATAOPS_SERVICE}archive?file_id={file_id}',
+        status_code=500,
+        json={'error_msg': 'failed'},
+    )
+
+    response = await test_async_client.get('/v1/archive', params={'file_id': file_id}, headers={'Authorization': ''})
+
+    assert response.status_code == 500
+    assert len(archive_listing_cache.local) == 0
+
+
+async def test_archive_returns_403_without_permission(
+    test_async_client, httpx_mock, mocker, jwt_token_admin, file_id, archive_listing_cache
+):
+    mocker.patch('api.api_archive.has_file_permission', return_value=False)
+
+    response = await test_async_client.get('/v1/archive', params={'file_id': file_id}, headers={'Authorization': ''})
+
+    assert response.status_code == 403
@@ -73,7 +73,7 @@ async def test_add_visits_redis_error_returns_400(mocker, test_async_client, htt
         url=f'{ConfigClass.PROJECT_SERVICE}/v1/projects/any',
         json={'code': 'any'},
     )
-    mocked_redis = mocker.patch.object(Redis, 'exists')
+    mocked_redis = mocker.patch('redis.asyncio.client.Pipeline.execute')
     mocked_redis.side_effect = RedisError()
     params = {'entity': 'project', 'code': 'any'}
 
@@ -104,19 +104,19 @@ async def test_get_visits_with_no_visits_returns_404(mocker, test_async_client):
 @pytest.mark.parametrize(
     'entity,url,service_response,api_response',
     [
-        ('project', f'{ConfigClass.PROJECT_SERVICE}/v1/projects/', {'result': []}, {'result': []}),
-        ('dataset', f'{ConfigClass.DATASET_SERVICE}datasets/', {'result': []}, {'result': []}),
+        ('project', f'{ConfigClass.PROJECT_SERVICE}/v1/projects/', {'result': []}, {'result': [], 'total': 0}),
+        ('dataset', f'{ConfigClass.DATASET_SERVICE}datasets/', {'result': []}, {'result': [], 'total': 0}),
         (
             'project',
             f'{ConfigClass.PROJECT_SERVICE}/v1/projects/',
             {'result': [{'code': 'code_1'}, {'code': 'code_2'}]},
-            {'result': [{'code': 'code_2'}, {'code': 'code_1'}]},
+            {'result': [{'code': 'code_2'}, {'code': 'code_1'}], 'total': 2},
         ),
         (
             'dataset',
             f'{ConfigClass.DATASET_SERVICE}datasets/',
             {'result': [{'code': 'code_1'}, {'code': 'code_2'}]},
-            {'result': [{'code': 'code_2'}, {'code': 'code_1'}]},
+            {'result': [{'code': 'code_2'}, {'code': 'code_1'}], 'total': 2},
         ),
     ],
 )
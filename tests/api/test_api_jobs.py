@@ -0,0 +1,54 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import json
+
+from app.components.jobs import job_runner
+from app.components.redis import redis_manager
+
+
+async def test_submit_job_returns_pending_job_that_can_be_polled_and_cancelled(test_async_client, jwt_token_admin):
+    payload = {'type': 'notification-email', 'payload': {'subject': 's', 'message_body': 'm', 'emails': ['a@b.c']}}
+    response = await test_async_client.post('/v1/jobs', json=payload, headers={'Authorization': ''})
+
+    assert response.status_code == 202
+    job_id = response.json()['result']['id']
+
+    response = await test_async_client.get(f'/v1/jobs/{job_id}', headers={'Authorization': ''})
+    assert response.json()['result']['status'] == 'pending'
+
+    response = await test_async_client.delete(f'/v1/jobs/{job_id}', headers={'Authorization': ''})
+    assert response.json()['result']['status'] == 'cancelled'
+
+    response = await test_async_client.get(f'/v1/jobs/{job_id}/progress', headers={'Authorization': ''})
+    assert response.headers['content-type'].startswith('text/event-stream')
+    assert json.loads(response.text.removeprefix('data: '))['status'] == 'cancelled'
+
+    await redis_manager.client.flushall()
+
+
+async def test_submit_job_is_forbidden_for_non_admin_users(test_async_client, jwt_token_contrib):
+    payload = {'type': 'notification-email', 'payload': {}}
+    response = await test_async_client.post('/v1/jobs', json=payload, headers={'Authorization': ''})
+
+    assert response.status_code == 403
+
+
+async def test_get_job_returns_not_found_for_unknown_job(test_async_client, jwt_token_admin):
+    response = await test_async_client.get('/v1/jobs/unknown', headers={'Authorization': ''})
+
+    assert response.status_code == 404
+
+
+async def test_email_in_background_is_submitted_as_job(test_async_client, jwt_token_admin, has_permission_true):
+    payload = {'subject': 'subject', 'message_body': 'message', 'send_to_all_active': True}
+    response = await test_async_client.post('/v1/email?background=true', json=payload, headers={'Authorization': ''})
+
+    assert response.status_code == 202
+    job = await job_runner.store.get(response.json()['result']['id'])
+    assert job.type == 'notification-email'
+
+    await redis_manager.client.flushall()
@@ -0,0 +1,133 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from uuid import uuid4
+
+import pytest
+
+from config import ConfigClass
+from services.dataset.preview_cache import PreviewCache
+
+
+@pytest.fixture
+def dataset_with_file(httpx_mock):
+    dataset_id = str(uuid4())
+    file_id = str(uuid4())
+    httpx_mock.add_response(
+        method='GET',
+        url=f'{ConfigClass.DATASET_SERVICE}datasets/{dataset_id}',
+        json={'id': dataset_id, 'code': 'dataset', 'creator': 'test'},
+    )
+    httpx_mock.add_response(
+        method='GET',
+        url=f'{ConfigClass.METADATA_SERVICE}item/{file_id}/',
+        json={'result': {'id': file_id, 'container_code': 'dataset'}},
+    )
+    return dataset_id, file_id
+
+
+async def test_stream_preview_forwards_range_header_and_streams_partial_content(
+    test_async_client, httpx_mock, jwt_token_admin, dataset_with_file
+):
+    dataset_id, file_id = dataset_with_file
+    httpx_mock.add_response(
+        method='GET',
+        url=f'{ConfigClass.DATASET_SERVICE}{file_id}/preview/stream?dataset_geid={dataset_id}',
+        status_code=206,
+        content=b'a,b\n1,2\n',
+        headers={'Content-Type': 'text/csv', 'Content-Range': 'bytes 0-7/1000', 'Accept-Ranges': 'bytes'},
+    )
+
+    response = await test_async_client.get(
+        f'/v1/{file_id}/preview/stream',
+        params={'dataset_geid': dataset_id},
+        headers={'Authorization': '', 'Range': 'bytes=0-7'},
+    )
+
+    assert response.status_code == 206
+    assert response.content == b'a,b\n1,2\n'
+    assert response.headers['content-type'] == 'text/csv'
+    assert response.headers['content-range'] == 'bytes 0-7/1000'
+    upstream_request = httpx_mock.get_request(
+        url=f'{ConfigClass.DATASET_SERVICE}{file_id}/preview/stream?dataset_geid={dataset_id}'
+    )
+    assert upstream_request.headers['range'] == 'bytes=0-7'
+
+
+async def test_stream_preview_returns_403_when_file_does_not_belong_to_dataset(
+    test_async_client, httpx_mock, jwt_token_admin
+):
+    dataset_id = str(uuid4())
+    file_id = str(uuid4())
+    httpx_mock.add_response(
+        method='GET',
+        url=f'{ConfigClass.DATASET_SERVICE}datasets/{dataset_id}',
+        json={'id': dataset_id, 'code': 'dataset', 'creator': 'test'},
+    )
+    httpx_mock.add_response(
+        method='GET',
+        url=f'{ConfigClass.METADATA_SERVICE}item/{file_id}/',
+        json={'result': {'id': file_id, 'container_code': 'other'}},
+    )
+
+    response = await test_async_client.get(
+        f'/v1/{file_id}/preview/stream', params={'dataset_geid': dataset_id}, headers={'Authorization': ''}
+    )
+
+    assert response.status_code == 403
+
+
+async def test_preview_returns_dataset_service_response(
+    test_async_client, httpx_mock, jwt_token_admin, dataset_with_file
+):
+    dataset_id, file_id = dataset_with_file
+    httpx_mock.add_response(
+        method='GET',
+        url=f'{ConfigClass.DATASET_SERVICE}{file_id}/preview?dataset_geid={dataset_id}',
+        json={'result': {'content': 'a,b'}},
+    )
+
+    response = await test_async_client.get(
+        f'/v1/{file_id}/preview/', params={'dataset_geid': dataset_id}, headers={'Authorization': ''}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {'result': {'content': 'a,b'}}
+
+
+async def test_stream_preview_serves_repeated_requests_from_preview_cache(
+    mocker, tmp_path, test_async_client, httpx_mock, jwt_token_admin
+):
+    mocker.patch(
+        'api.api_preview.preview_cache',
+        PreviewCache(enabled=True, directory=str(tmp_path), max_size=1024, max_entry_size=1024),
+    )
+    dataset_id = str(uuid4())
+    file_id = str(uuid4())
+    for _ in range(2):
+        httpx_mock.add_response(
+            method='GET',
+            url=f'{ConfigClass.DATASET_SERVICE}datasets/{dataset_id}',
+            json={'id': dataset_id, 'code': 'dataset', 'creator': 'test'},
+        )
+        httpx_mock.add_response(
+            method='GET',
+            url=f'{ConfigClass.METADATA_SERVICE}item/{file_id}/',
+            json={'result': {'id': file_id, 'container_code': 'dataset', 'storage': {'version': 'v1'}}},
+        )
+    stream_url = f'{ConfigClass.DATASET_SERVICE}{file_id}/preview/stream?dataset_geid={dataset_id}'
+    httpx_mock.add_response(method='GET', url=stream_url, content=b'a,b\n', headers={'Content-Type': 'text/csv'})
+
+    responses = [
+        await test_async_client.get(
+            f'/v1/{file_id}/preview/stream', params={'dataset_geid': dataset_id}, headers={'Authorization': ''}
+        )
+        for _ in range(2)
+    ]
+
+    assert [response.content for response in responses] == [b'a,b\n', b'a,b\n']
+    assert responses[1].headers['content-type'] == 'text/csv'
+    assert len(httpx_mock.get_requests(url=stream_url)) == 1
@@ -167,6 +167,83 @@ async def test_proxy_chunk_presigned_successful(test_async_client, requests_mock
     assert response.status_code == 200
 
 
+async def test_proxy_chunk_presigned_bulk_returns_urls_for_chunk_range(test_async_client, httpx_mock, jwt_token_admin):
+    project_code = 'test_project'
+    key = 'filepath'
+    upload_id = 'test_upload_id'
+
+    for chunk_number in (1, 2, 3):
+        httpx_mock.add_response(
+            method='GET',
+            url=(
+                f'{ConfigClass.UPLOAD_SERVICE}/v1/files/chunks/presigned?'
+                f'bucket=gr-{project_code}&key={key}&upload_id={upload_id}&chunk_number={chunk_number}'
+            ),
+            json={'result': f'http://minio/{chunk_number}'},
+        )
+    headers = {'Authorization': ''}
+    response = await test_async_client.get(
+        f'/v1/project/{project_code}/files/chunks/presigned/bulk',
+        params={'key': key, 'upload_id': upload_id, 'chunk_start': 1, 'chunk_end': 3},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json()['result'] == {'1': 'http://minio/1', '2': 'http://minio/2', '3': 'http://minio/3'}
+
+
+async def test_proxy_chunk_presigned_bulk_returns_urls_for_chunk_numbers(
+    test_async_client, httpx_mock, jwt_token_admin
+):
+    project_code = 'test_project'
+    key = 'filepath'
+    upload_id = 'test_upload_id'
+
+    for chunk_number in (2, 5):
+        httpx_mock.add_response(
+            method='GET',
+            url=(
+                f'{ConfigClass.UPLOAD_SERVICE}/v1/files/chunks/presigned?'
+                f'bucket=gr-{project_code}&key={key}&upload_id={upload_id}&chunk_number={chunk_number}'
+            ),
+            json={'result': f'http://minio/{chunk_number}'},
+        )
+    headers = {'Authorization': ''}
+    response = await test_async_client.get(
+        f'/v1/project/{project_code}/files/chunks/presigned/bulk',
+        params={'key': key, 'upload_id': upload_id, 'chunk_numbers': [5, 2]},
+        headers=headers,
+    )
+
+    assert response.status_code == 200
+    assert response.json()['result'] == {'2': 'http://minio/2', '5': 'http://minio/5'}
+
+
+@pytest.mark.parametrize(
+    'params',
+    [
+        {},
+        {'chunk_start': 3, 'chunk_end': 1},
+        {'chunk_start': 1, 'chunk_end': 2, 'chunk_numbers': [1]},
+        {'chunk_start': 1, 'chunk_end': 100000},
+        {'chunk_start': 0, 'chunk_end': 10**10},
+        {'chunk_start': -1, 'chunk_end': 1},
+        {'chunk_numbers': [-1, 1]},
+    ],
+)
+async def test_proxy_chunk_presigned_bulk_returns_400_for_invalid_chunk_selection(
+    test_async_client, jwt_token_admin, params
+):
+    headers = {'Authorization': ''}
+    response = await test_async_client.get(
+        '/v1/project/test_project/files/chunks/presigned/bulk',
+        params={'key': 'filepath', 'upload_id': 'test_upload_id', **params},
+        headers=headers,
+    )
+
+    assert response.status_code == 400
+
+
 async def test_proxy_get_resumable_successful(
     test_async_client, requests_mocker, httpx_mock, jwt_token_admin, get_file_entity, has_permission_true
 ):
@@ -0,0 +1,45 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import time
+
+from app.components.cache import InMemoryCache
+
+
+class TestInMemoryCache:
+    def test_get_returns_stored_value(self):
+        cache = InMemoryCache(ttl=30, max_size=10)
+        cache.set('key', 'value')
+
+        assert cache.get('key') == 'value'
+        assert cache.get('missing', 'default') == 'default'
+
+    def test_get_returns_default_for_expired_value(self):
+        cache = InMemoryCache(ttl=30, max_size=10)
+        cache.set('key', 'value', ttl=0)
+        time.sleep(0.01)
+
+        assert cache.get('key') is None
+        assert len(cache) == 0
+
+    def test_set_evicts_least_recently_used_values_above_max_size(self):
+        cache = InMemoryCache(ttl=30, max_size=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+
+    def test_delete_matching_removes_only_matching_keys(self):
+        cache = InMemoryCache(ttl=30, max_size=10)
+        for key in ('project:a', 'project:b', 'dataset:a'):
+            cache.set(key, key)
+
+        assert cache.delete_matching(lambda key: key.startswith('project:')) == 2
+        assert cache.get('dataset:a') == 'dataset:a'
@@ -0,0 +1,133 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+
+import pytest
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport
+from httpx import AsyncClient
+
+from app.components.idempotency import IdempotencyMiddleware
+from app.components.redis import RedisCache
+from app.components.redis import RedisManager
+from app.components.route_class import RouteClass
+
+
+class Endpoint:
+    def __init__(self, status_code: int = 200) -> None:
+        self.status_code = status_code
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, scope, receive, send):
+        self.calls += 1
+        message = await receive()
+        await self.release.wait()
+        response = JSONResponse({'call': self.calls, 'body': message['body'].decode()}, status_code=self.status_code)
+        await response(scope, receive, send)
+
+
+@pytest.fixture
+async def redis_cache(settings, redis_uri) -> RedisCache:
+    redis_manager = RedisManager(settings.copy(update={'REDIS_URL': redis_uri}))
+    yield RedisCache(redis_manager, failure_threshold=1, probe_interval=60, fallback_ttl=60, fallback_max_size=10)
+    await redis_manager.client.flushall()
+    await redis_manager.disconnect()
+
+
+def create_client(endpoint: Endpoint, redis_cache: RedisCache, wait_timeout: float = 5) -> AsyncClient:
+    middleware = IdempotencyMiddleware(
+        endpoint,
+        redis_cache=redis_cache,
+        route_classes=[
+            RouteClass.parse({'route_class': 'download', 'path': '^/v2/download/pre$', 'methods': ['POST']})
+        ],
+        ttl=60,
+        lock_ttl=60,
+        wait_timeout=wait_timeout,
+        poll_interval=0.01,
+        max_response_size=1024,
+    )
+    return AsyncClient(transport=ASGITransport(app=middleware), base_url='http://test')
+
+
+class TestIdempotencyMiddleware:
+    async def test_duplicate_request_replays_stored_response(self, redis_cache):
+        endpoint = Endpoint()
+        headers = {'Idempotency-Key': 'key'}
+
+        async with create_client(endpoint, redis_cache) as client:
+            first = await client.post('/v2/download/pre', json={'files': []}, headers=headers)
+            second = await client.post('/v2/download/pre', json={'files': []}, headers=headers)
+
+        assert endpoint.calls == 1
+        assert second.status_code == first.status_code == 200
+        assert second.json() == first.json() == {'call': 1, 'body': '{"files": []}'}
+        assert second.headers['Idempotent-Replayed'] == 'true'
+
+    async def test_concurrent_duplicate_waits_for_in_flight_response(self, redis_cache):
+        endpoint = Endpoint()
+        endpoint.release.clear()
+        headers = {'Idempotency-Key': 'key'}
+
+        async with create_client(endpoint, redis_cache) as client:
+            first = asyncio.create_task(client.post('/v2/download/pre', json={}, headers=headers))
+            second = asyncio.create_task(client.post('/v2/download/pre', json={}, headers=headers))
+            await asyncio.sleep(0.1)
+            endpoint.release.set()
+            responses = await asyncio.gather(first, second)
+
+        assert endpoint.calls == 1
+        assert [response.json()['call'] for response in responses] == [1, 1]
+
+    async def test_in_flight_duplicate_is_rejected_with_conflict_after_wait_timeout(self, redis_cache):
+        endpoint = Endpoint()
+        endpoint.release.clear()
+        headers = {'Idempotency-Key': 'key'}
+
+        async with create_client(endpoint, redis_cache, wait_timeout=0.05) as client:
+            first = asyncio.create_task(client.post('/v2/download/pre', json={}, headers=headers))
+            second = await client.post('/v2/download/pre', json={}, headers=headers)
+            endpoint.release.set()
+            await first
+
+        assert second.status_code == 409
+        assert second.headers['Retry-After'] == '1'
+
+    async def test_key_reused_for_different_request_is_rejected(self, redis_cache):
+        endpoint = Endpoint()
+        headers = {'Idempotency-Key': 'key'}
+
+        async with create_client(endpoint, redis_cache) as client:
+            await client.post('/v2/download/pre', json={'files': [1]}, headers=headers)
+            response = await client.post('/v2/download/pre', json={'files': [2]}, headers=headers)
+
+        assert response.status_code == 422
+        assert endpoint.calls == 1
+
+    async def test_server_error_is_not_stored_and_request_can_be_retried(self, redis_cache):
+        endpoint = Endpoint(status_code=500)
+        headers = {'Idempotency-Key': 'key'}
+
+        async with create_client(endpoint, redis_cache) as client:
+            await client.post('/v2/download/pre', json={}, headers=headers)
+            response = await client.post('/v2/download/pre', json={}, headers=headers)
+
+        assert endpoint.calls == 2
+        assert 'Idempotent-Replayed' not in response.headers
+
+    async def test_requests_without_key_or_outside_route_classes_are_always_processed(self, redis_cache):
+        endpoint = Endpoint()
+
+        async with create_client(endpoint, redis_cache) as client:
+            await client.post('/v2/download/pre', json={})
+            await client.post('/v2/download/pre', json={})
+            await client.post('/v1/files/actions', json={}, headers={'Idempotency-Key': 'key'})
+            await client.post('/v1/files/actions', json={}, headers={'Idempotency-Key': 'key'})
+
+        assert endpoint.calls == 4
@@ -0,0 +1,102 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+from collections.abc import Callable
+
+import pytest
+
+from app.components.invalidation import InvalidationBus
+from app.components.invalidation import InvalidationScope
+from app.components.redis import RedisManager
+
+
+@pytest.fixture
+async def redis_manager(settings, redis_uri) -> RedisManager:
+    redis_manager = RedisManager(settings.copy(update={'REDIS_URL': redis_uri}))
+    yield redis_manager
+    await redis_manager.disconnect()
+
+
+def create_bus(redis_manager: RedisManager) -> InvalidationBus:
+    return InvalidationBus(redis_manager, channel='invalidation', poll_timeout=0.1, reconnect_interval=0.1)
+
+
+async def wait_for_subscribers(redis_manager: RedisManager, number: int) -> None:
+    while (await redis_manager.client.pubsub_numsub('invalidation'))[0][1] < number:
+        await asyncio.sleep(0.01)
+
+
+async def wait_until(condition: Callable[[], bool]) -> None:
+    while not condition():
+        await asyncio.sleep(0.01)
+
+
+class TestInvalidationBus:
+    async def test_publish_evicts_entries_in_current_and_other_workers(self, redis_manager):
+        publisher = create_bus(redis_manager)
+        subscriber = create_bus(redis_manager)
+        published, received = [], []
+        publisher.subscribe(InvalidationScope.USER, published.append)
+        subscriber.subscribe(InvalidationScope.USER, received.append)
+        subscriber.subscribe(InvalidationScope.PROJECT, lambda key: received.append(f'project {key}'))
+        await publisher.start()
+        await subscriber.start()
+        await asyncio.wait_for(wait_for_subscribers(redis_manager, 2), 5)
+
+        await publisher.publish(InvalidationScope.USER, 'username')
+
+        await asyncio.wait_for(wait_until(lambda: bool(received)), 5)
+        assert received == ['username']
+        assert published == ['username']
+
+        await publisher.stop()
+        await subscriber.stop()
+
+    async def test_stop_finishes_listener_and_closes_subscription(self, redis_manager):
+        bus = create_bus(redis_manager)
+        await bus.start()
+        await asyncio.wait_for(wait_for_subscribers(redis_manager, 1), 5)
+        listener = bus._listener
+
+        await asyncio.wait_for(bus.stop(), 1)
+
+        assert listener.done() and not listener.cancelled()
+        assert (await redis_manager.client.pubsub_numsub('invalidation'))[0][1] == 0
+
+    async def test_received_event_is_not_handled_twice_by_publisher(self, redis_manager):
+        bus = create_bus(redis_manager)
+        handled = []
+        bus.subscribe(InvalidationScope.DATASET, handled.append)
+
+        bus._receive(f'{{"scope": "dataset", "key": "code", "origin": "{bus.origin}"}}')
+        bus._receive('{"scope": "dataset", "key": "other", "origin": "other-worker"}')
+        bus._receive('{"scope": "unknown", "key": "code"}')
+
+        assert handled == ['other']
+
+    async def test_publish_evicts_local_entries_when_redis_is_unavailable(self, settings):
+        redis_manager = RedisManager(
+            settings.copy(update={'REDIS_URL': 'redis://127.0.0.1:1', 'REDIS_SOCKET_TIMEOUT': 1})
+        )
+        bus = create_bus(redis_manager)
+        handled = []
+        bus.subscribe(InvalidationScope.PROJECT, handled.append)
+
+        await bus.publish(InvalidationScope.PROJECT, 'project')
+
+        assert handled == ['project']
+        await redis_manager.disconnect()
+
+    async def test_handler_failure_does_not_stop_other_handlers(self):
+        bus = InvalidationBus(RedisManager.__new__(RedisManager), channel='', poll_timeout=1, reconnect_interval=1)
+        handled = []
+        bus.subscribe(InvalidationScope.TEMPLATE, lambda key: 1 / 0)
+        bus.subscribe(InvalidationScope.TEMPLATE, handled.append)
+
+        bus._dispatch_all()
+
+        assert handled == [None]
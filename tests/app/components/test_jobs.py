@@ -0,0 +1,163 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+
+import pytest
+
+from app.components.jobs import JobRunner
+from app.components.jobs import JobStore
+from app.components.redis import RedisManager
+from models.jobs import JobStatus
+
+
+@pytest.fixture
+async def job_runner(settings, redis_uri) -> JobRunner:
+    redis_manager = RedisManager(settings.copy(update={'REDIS_URL': redis_uri}))
+    job_runner = JobRunner(
+        JobStore(redis_manager, ttl=60),
+        queue='test:jobs',
+        workers=2,
+        poll_timeout=1,
+        heartbeat_interval=0.05,
+        stale_after=0.2,
+    )
+    yield job_runner
+    await job_runner.stop()
+    await redis_manager.client.flushall()
+    await redis_manager.disconnect()
+
+
+class TestJobRunner:
+    async def test_run_records_progress_and_result(self, job_runner):
+        @job_runner.handler('count')
+        async def count(context, payload):
+            await context.set_total(len(payload['items']))
+            for _ in payload['items']:
+                await context.advance()
+            return len(payload['items'])
+
+        job = await job_runner.submit('count', 'test', {'items': [1, 2, 3]})
+        await job_runner.run(job.id)
+
+        job = await job_runner.store.get(job.id)
+        assert job.status == JobStatus.SUCCEEDED
+        assert (job.completed, job.total, job.result) == (3, 3, 3)
+
+    async def test_run_records_error_of_failed_handler(self, job_runner):
+        @job_runner.handler('fail')
+        async def fail(context, payload):
+            raise ValueError('Downstream failed')
+
+        job = await job_runner.submit('fail', 'test', {})
+        await job_runner.run(job.id)
+
+        job = await job_runner.store.get(job.id)
+        assert job.status == JobStatus.FAILED
+        assert job.error == 'Downstream failed'
+
+    async def test_submit_raises_error_for_unknown_job_type(self, job_runner):
+        with pytest.raises(ValueError):
+            await job_runner.submit('unknown', 'test', {})
+
+    async def test_cancel_stops_running_job_at_next_progress_report(self, job_runner):
+        started = asyncio.Event()
+        proceed = asyncio.Event()
+
+        @job_runner.handler('wait')
+        async def wait(context, payload):
+            started.set()
+            await proceed.wait()
+            await context.advance()
+            await context.advance()
+
+        job = await job_runner.submit('wait', 'test', {})
+        running = asyncio.create_task(job_runner.run(job.id))
+        await started.wait()
+        await job_runner.cancel(job.id)
+        proceed.set()
+        await running
+
+        job = await job_runner.store.get(job.id)
+        assert job.status == JobStatus.CANCELLED
+        assert job.completed == 1
+
+    async def test_cancelled_pending_job_is_not_run(self, job_runner, mocker):
+        handler = mocker.AsyncMock()
+        job_runner.handler('skipped')(handler)
+
+        job = await job_runner.submit('skipped', 'test', {})
+        assert (await job_runner.cancel(job.id)).status == JobStatus.CANCELLED
+        await job_runner.run(job.id)
+
+        handler.assert_not_called()
+
+    async def test_workers_process_queued_jobs_and_watch_follows_progress(self, job_runner):
+        @job_runner.handler('noop')
+        async def noop(context, payload):
+            await context.set_total(1)
+            await context.advance()
+            return 'done'
+
+        job = await job_runner.submit('noop', 'test', {})
+        await job_runner.start()
+
+        async def watch():
+            return [job.status async for job in job_runner.watch(job.id, 0.01)]
+
+        statuses = await asyncio.wait_for(watch(), 5)
+
+        assert statuses[-1] == JobStatus.SUCCEEDED
+        assert await job_runner.store.redis_manager.client.llen(job_runner.processing_queue) == 0
+
+    async def test_job_is_run_once_when_workers_race_for_it(self, job_runner, mocker):
+        handler = mocker.AsyncMock(return_value='done')
+        job_runner.handler('once')(handler)
+
+        job = await job_runner.submit('once', 'test', {})
+        await asyncio.gather(job_runner.run(job.id), job_runner.run(job.id))
+
+        handler.assert_awaited_once()
+        assert (await job_runner.store.get(job.id)).status == JobStatus.SUCCEEDED
+
+    async def test_reap_requeues_job_abandoned_by_crashed_worker(self, job_runner):
+        @job_runner.handler('noop')
+        async def noop(context, payload):
+            return 'done'
+
+        client = job_runner.store.redis_manager.client
+        job = await job_runner.submit('noop', 'test', {})
+        await client.blmove(job_runner.queue, job_runner.processing_queue, 1)
+        await job_runner.store.transition(job.id, JobStatus.PENDING, JobStatus.RUNNING)
+
+        await job_runner.reap()
+        assert await client.lrange(job_runner.processing_queue, 0, -1) == [job.id]
+
+        await asyncio.sleep(0.3)
+        await job_runner.reap()
+        assert await client.lrange(job_runner.queue, 0, -1) == [job.id]
+        assert await client.llen(job_runner.processing_queue) == 0
+
+        await job_runner.run(job.id)
+        assert (await job_runner.store.get(job.id)).result == 'done'
+
+    async def test_stop_queues_again_job_interrupted_by_shutdown(self, job_runner):
+        started = asyncio.Event()
+
+        @job_runner.handler('endless')
+        async def endless(context, payload):
+            started.set()
+            await asyncio.Event().wait()
+
+        job = await job_runner.submit('endless', 'test', {})
+        await job_runner.start()
+        await asyncio.wait_for(started.wait(), 5)
+        await job_runner.stop()
+
+        client = job_runner.store.redis_manager.client
+        assert (await job_runner.store.get(job.id)).status == JobStatus.PENDING
+        assert await client.lrange(job_runner.queue, 0, -1) == [job.id]
+        assert await client.llen(job_runner.processing_queue) == 0
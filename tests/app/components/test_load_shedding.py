@@ -0,0 +1,83 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import time
+
+import pytest
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport
+from httpx import AsyncClient
+
+from app.components.load_shedding import EventLoopLagMonitor
+from app.components.load_shedding import LoadSheddingMiddleware
+from app.components.route_class import RouteClass
+
+
+async def endpoint(scope, receive, send):
+    await JSONResponse({'result': 'ok'})(scope, receive, send)
+
+
+@pytest.fixture
+async def monitor() -> EventLoopLagMonitor:
+    monitor = EventLoopLagMonitor(interval=0.01)
+    yield monitor
+    await monitor.stop()
+
+
+@pytest.fixture
+def middleware(monitor) -> LoadSheddingMiddleware:
+    route_classes = [RouteClass.parse({'route_class': 'statistics', 'path': '^/v1/statistics$', 'methods': ['GET']})]
+    return LoadSheddingMiddleware(
+        endpoint, monitor=monitor, route_classes=route_classes, max_in_flight=1, max_event_loop_lag=0.5, retry_after=3
+    )
+
+
+class TestEventLoopLagMonitor:
+    async def test_lag_is_reported_while_event_loop_is_blocked(self, monitor):
+        monitor.start()
+        await asyncio.sleep(0.05)
+
+        time.sleep(0.2)
+
+        assert monitor.lag >= 0.1
+
+    async def test_start_is_idempotent_within_event_loop(self, monitor):
+        monitor.start()
+        task = monitor._task
+        monitor.start()
+
+        assert monitor._task is task
+
+
+class TestLoadSheddingMiddleware:
+    async def test_sheddable_request_is_rejected_when_too_many_requests_are_in_flight(self, middleware):
+        middleware.in_flight = 1
+
+        async with AsyncClient(transport=ASGITransport(app=middleware), base_url='http://test') as client:
+            response = await client.get('/v1/statistics')
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '3'
+        assert response.json()['error_msg'] == 'Service is overloaded'
+
+    async def test_critical_request_is_processed_when_event_loop_lags(self, mocker, middleware):
+        mocker.patch.object(EventLoopLagMonitor, 'lag', new_callable=mocker.PropertyMock, return_value=1)
+
+        async with AsyncClient(transport=ASGITransport(app=middleware), base_url='http://test') as client:
+            shed_response = await client.get('/v1/statistics')
+            response = await client.get('/v1/files/download')
+
+        assert shed_response.status_code == 503
+        assert response.status_code == 200
+
+    async def test_in_flight_requests_are_released_after_response(self, middleware):
+        async with AsyncClient(transport=ASGITransport(app=middleware), base_url='http://test') as client:
+            for _ in range(2):
+                response = await client.get('/v1/statistics')
+                assert response.status_code == 200
+
+        assert middleware.in_flight == 0
@@ -0,0 +1,82 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+
+import pytest
+from fastapi.responses import JSONResponse
+from httpx import ASGITransport
+from httpx import AsyncClient
+
+from app.components.priority_lanes import PriorityLaneMiddleware
+from app.components.priority_lanes import PriorityLanes
+from app.components.priority_lanes import current_lane
+from app.components.route_class import RouteClass
+
+
+@pytest.fixture
+def priority_lanes() -> PriorityLanes:
+    route_classes = [RouteClass.parse({'route_class': 'bulk', 'path': '^/v2/entity/tags$', 'methods': ['POST']})]
+    return PriorityLanes(enabled=True, budgets={'bulk': 1}, route_classes=route_classes)
+
+
+class TestPriorityLanes:
+    def test_classify_returns_interactive_lane_for_unmatched_routes(self, priority_lanes):
+        assert priority_lanes.classify('POST', '/v2/entity/tags') == 'bulk'
+        assert priority_lanes.classify('GET', '/v2/entity/tags') == 'interactive'
+
+    async def test_enter_limits_concurrency_of_lane_to_its_budget(self, priority_lanes):
+        running = []
+        max_running = 0
+
+        async def work():
+            nonlocal max_running
+            async with priority_lanes.enter('bulk'):
+                running.append(current_lane.get())
+                max_running = max(max_running, len(running))
+                await asyncio.sleep(0.01)
+                running.pop()
+
+        await asyncio.gather(*(work() for _ in range(3)))
+
+        assert max_running == 1
+
+    async def test_enter_is_reentrant_within_the_same_lane(self, priority_lanes):
+        async def enter_again():
+            async with priority_lanes.enter('bulk'):
+                return current_lane.get()
+
+        async with priority_lanes.enter('bulk'):
+            assert await asyncio.wait_for(enter_again(), 1) == 'bulk'
+
+        assert current_lane.get() == 'interactive'
+
+
+class TestPriorityLaneMiddleware:
+    async def test_interactive_requests_are_not_blocked_by_exhausted_bulk_lane(self, priority_lanes):
+        lane_entered = asyncio.Event()
+        release = asyncio.Event()
+
+        async def endpoint(scope, receive, send):
+            if current_lane.get() == 'bulk':
+                lane_entered.set()
+                await release.wait()
+            await JSONResponse({'lane': current_lane.get()})(scope, receive, send)
+
+        middleware = PriorityLaneMiddleware(endpoint, priority_lanes)
+        async with AsyncClient(transport=ASGITransport(app=middleware), base_url='http://test') as client:
+            bulk_request = asyncio.create_task(client.post('/v2/entity/tags'))
+            await lane_entered.wait()
+            queued_bulk_request = asyncio.create_task(client.post('/v2/entity/tags'))
+
+            response = await client.get('/v1/visits')
+            assert response.json() == {'lane': 'interactive'}
+            assert not queued_bulk_request.done()
+
+            release.set()
+            responses = await asyncio.gather(bulk_request, queued_bulk_request)
+
+        assert [response.json() for response in responses] == [{'lane': 'bulk'}, {'lane': 'bulk'}]
@@ -0,0 +1,124 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import jwt
+import pytest
+from httpx import ASGITransport
+from httpx import AsyncClient
+
+from app.components.rate_limit import RateLimiter
+from app.components.rate_limit import RateLimitRule
+from app.components.rate_limit import TokenBucket
+from app.components.rate_limit import get_client_identity
+from app.components.redis import RedisCache
+from app.components.redis import RedisManager
+from app.components.redis import redis_manager
+from app.main import create_app
+
+
+@pytest.fixture
+async def redis_cache(settings, redis_uri) -> RedisCache:
+    redis_manager = RedisManager(settings.copy(update={'REDIS_URL': redis_uri}))
+    yield RedisCache(redis_manager, failure_threshold=1, probe_interval=60, fallback_ttl=60, fallback_max_size=10)
+    await redis_manager.client.flushall()
+    await redis_manager.disconnect()
+
+
+def create_rule(rate: float = 1, burst: int = 2) -> RateLimitRule:
+    return RateLimitRule.parse({'route_class': 'health', 'path': '^/v1/health', 'rate': rate, 'burst': burst})
+
+
+class TestTokenBucket:
+    def test_take_returns_wait_time_when_bucket_is_empty(self):
+        bucket = TokenBucket(rate=2, burst=2, now=0)
+
+        assert bucket.take(0) == 0
+        assert bucket.take(0) == 0
+        assert bucket.take(0) == 0.5
+        assert bucket.take(0.5) == 0
+
+
+class TestRateLimitRule:
+    def test_matches_path_and_methods(self):
+        rule = RateLimitRule.parse(
+            {
+                'route_class': 'search',
+                'path': '^/v1/project-files/[^/]+/search',
+                'methods': ['get'],
+                'rate': 1,
+                'burst': 1,
+            }
+        )
+
+        assert rule.matches('GET', '/v1/project-files/project/search')
+        assert not rule.matches('POST', '/v1/project-files/project/search')
+        assert not rule.matches('GET', '/v1/project-files/project')
+
+
+class TestRateLimiter:
+    async def test_acquire_shares_bucket_between_workers(self, redis_cache):
+        rule = create_rule(burst=2)
+        workers = [RateLimiter(redis_cache, [rule], local_max_size=10) for _ in range(2)]
+
+        assert await workers[0].acquire(rule, 'user:first') == 0
+        assert await workers[1].acquire(rule, 'user:first') == 0
+        assert await workers[1].acquire(rule, 'user:first') > 0
+        assert await workers[0].acquire(rule, 'user:second') == 0
+
+    async def test_acquire_rejects_locally_after_redis_rejection(self, mocker, redis_cache):
+        rule = create_rule(burst=1)
+        rate_limiter = RateLimiter(redis_cache, [rule], local_max_size=10)
+        await RateLimiter(redis_cache, [rule], local_max_size=10).acquire(rule, 'user:first')
+
+        assert await rate_limiter.acquire(rule, 'user:first') > 0
+        execute_script = mocker.spy(rate_limiter, '_acquire_shared')
+        assert await rate_limiter.acquire(rule, 'user:first') > 0
+        execute_script.assert_not_called()
+
+    async def test_acquire_uses_local_bucket_when_redis_is_unavailable(self, settings):
+        redis_manager = RedisManager(
+            settings.copy(update={'REDIS_URL': 'redis://127.0.0.1:1', 'REDIS_SOCKET_TIMEOUT': 1})
+        )
+        redis_cache = RedisCache(
+            redis_manager, failure_threshold=1, probe_interval=60, fallback_ttl=60, fallback_max_size=1
+        )
+        rule = create_rule(burst=1)
+        rate_limiter = RateLimiter(redis_cache, [rule], local_max_size=10)
+
+        assert await rate_limiter.acquire(rule, 'user:first') == 0
+        assert await rate_limiter.acquire(rule, 'user:first') > 0
+        await redis_manager.disconnect()
+
+
+def test_get_client_identity_prefers_username_from_token():
+    token = jwt.encode({'preferred_username': 'test'}, key='')
+    headers = [(b'authorization', f'Bearer {token}'.encode()), (b'x-forwarded-for', b'10.0.0.1, 10.0.0.2')]
+
+    assert get_client_identity({'type': 'http', 'headers': headers}) == 'user:test'
+    assert get_client_identity({'type': 'http', 'headers': headers[1:]}) == 'ip:10.0.0.1'
+    assert get_client_identity({'type': 'http', 'headers': [], 'client': ('10.0.0.3', 80)}) == 'ip:10.0.0.3'
+
+
+async def test_rate_limit_middleware_returns_429_with_retry_after(mocker, settings, redis_uri):
+    mocker.patch.object(settings, 'REDIS_URL', redis_uri)
+    settings = settings.copy(
+        update={
+            'RATE_LIMIT_ENABLED': True,
+            'RATE_LIMIT_RULES': [{'route_class': 'health', 'path': '^/v1/health', 'rate': 0.1, 'burst': 1}],
+        }
+    )
+    app = create_app(settings)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url='https://bff') as client:
+        first = await client.get('/v1/health')
+        second = await client.get('/v1/health')
+
+    assert first.status_code == 204
+    assert second.status_code == 429
+    assert second.headers['Retry-After'] == '10'
+    assert second.json() == {'code': 429, 'error_msg': 'Too many requests', 'result': ''}
+    await redis_manager.client.flushall()
+    await redis_manager.disconnect()
@@ -0,0 +1,153 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+
+import pytest
+from redis.asyncio import Redis
+from redis.asyncio.sentinel import SentinelConnectionPool
+from redis.exceptions import ConnectionError
+
+from app.components.redis import REDIS_COMMAND_DURATION
+from app.components.redis import InstrumentedRedis
+from app.components.redis import InstrumentedRedisCluster
+from app.components.redis import RedisCache
+from app.components.redis import RedisManager
+
+
+@pytest.fixture
+async def redis_manager(settings, redis_uri) -> RedisManager:
+    redis_manager = RedisManager(settings.copy(update={'REDIS_URL': redis_uri, 'REDIS_MAX_CONNECTIONS': 5}))
+    yield redis_manager
+    await redis_manager.disconnect()
+
+
+class TestRedisManager:
+    async def test_client_is_created_once_with_connection_pool(self, redis_manager):
+        client = redis_manager.client
+
+        assert isinstance(client, InstrumentedRedis)
+        assert client is redis_manager.client
+        assert client.connection_pool.max_connections == 5
+        assert redis_manager.supports_transactions is True
+
+    async def test_ping_records_command_duration_and_returns_connection_to_pool(self, redis_manager):
+        before = REDIS_COMMAND_DURATION.labels('ping', 'success')._sum.get()
+
+        assert await redis_manager.ping() is True
+
+        assert REDIS_COMMAND_DURATION.labels('ping', 'success')._sum.get() > before
+        assert redis_manager.get_pool_stats() == {'in_use': 0, 'available': 1}
+
+    async def test_ping_returns_false_when_redis_is_unavailable(self, settings):
+        redis_manager = RedisManager(
+            settings.copy(update={'REDIS_URL': 'redis://127.0.0.1:1', 'REDIS_SOCKET_TIMEOUT': 1})
+        )
+
+        assert await redis_manager.ping() is False
+
+        await redis_manager.disconnect()
+
+    async def test_disconnect_drops_client(self, redis_manager):
+        client = redis_manager.client
+        await redis_manager.ping()
+
+        await redis_manager.disconnect()
+
+        assert redis_manager.client is not client
+        assert redis_manager.get_pool_stats() == {'in_use': 0, 'available': 0}
+
+    def test_client_connects_to_sentinel_master_when_sentinel_url_is_set(self, settings):
+        url = 'redis+sentinel://:password@sentinel-1:26379,sentinel-2:26380/mymaster/2'
+        redis_manager = RedisManager(settings.copy(update={'REDIS_SENTINEL_URL': url}))
+
+        pool = redis_manager.client.connection_pool
+
+        assert isinstance(pool, SentinelConnectionPool)
+        assert pool.service_name == 'mymaster'
+        assert pool.connection_kwargs['db'] == 2
+        sentinels = pool.sentinel_manager.sentinels
+        assert [sentinel.connection_pool.connection_kwargs['port'] for sentinel in sentinels] == [26379, 26380]
+
+    def test_client_connects_to_cluster_when_cluster_url_is_set(self, settings):
+        redis_manager = RedisManager(settings.copy(update={'REDIS_CLUSTER_URL': 'redis://redis-cluster:6379'}))
+
+        assert isinstance(redis_manager.client, InstrumentedRedisCluster)
+        assert redis_manager.supports_transactions is False
+
+
+class TestRedisCache:
+    async def test_operations_use_redis_when_it_is_available(self, redis_manager):
+        redis_cache = RedisCache(
+            redis_manager, failure_threshold=1, probe_interval=1, fallback_ttl=60, fallback_max_size=10
+        )
+
+        await redis_cache.set('key', 'value', 60)
+        assert await redis_manager.client.get('key') == 'value'
+        assert await redis_cache.get('key') == 'value'
+
+        await redis_cache.delete('key')
+        assert await redis_cache.get('key') is None
+        assert len(redis_cache.fallback) == 0
+
+    async def test_circuit_opens_after_failures_and_bypasses_redis(self, mocker, settings):
+        redis_manager = RedisManager(
+            settings.copy(update={'REDIS_URL': 'redis://127.0.0.1:1', 'REDIS_SOCKET_TIMEOUT': 1})
+        )
+        redis_cache = RedisCache(
+            redis_manager, failure_threshold=2, probe_interval=60, fallback_ttl=60, fallback_max_size=10
+        )
+
+        await redis_cache.set('key', 'value', 60)
+        assert not redis_cache.is_open
+        assert await redis_cache.get('key') == 'value'
+        assert redis_cache.is_open
+
+        client = mocker.patch.object(redis_manager, '_client')
+        assert await redis_cache.get('key') == 'value'
+        client.get.assert_not_called()
+
+        await redis_cache.close()
+        assert not redis_cache.is_open
+
+    async def test_circuit_closes_when_redis_recovers(self, settings, redis_uri):
+        redis = Redis.from_url(redis_uri, decode_responses=True)
+        await redis.set('stale', 'value')
+        redis_manager = RedisManager(
+            settings.copy(update={'REDIS_URL': 'redis://127.0.0.1:1', 'REDIS_SOCKET_TIMEOUT': 1})
+        )
+        redis_cache = RedisCache(
+            redis_manager, failure_threshold=1, probe_interval=0.01, fallback_ttl=60, fallback_max_size=10
+        )
+        await redis_cache.set('key', 'value', 60)
+        await redis_cache.delete('stale')
+        probe_task = redis_cache._probe_task
+
+        redis_manager.settings = settings.copy(update={'REDIS_URL': redis_uri})
+        await redis_manager.disconnect()
+        await asyncio.wait_for(probe_task, 5)
+
+        assert not redis_cache.is_open
+        assert await redis_cache.get('key') is None
+        assert await redis.get('stale') is None
+
+        await redis.flushall()
+        await redis.close()
+        await redis_manager.disconnect()
+
+    async def test_failed_delete_is_retried_before_next_operation_while_circuit_is_closed(self, mocker, redis_manager):
+        redis_cache = RedisCache(
+            redis_manager, failure_threshold=3, probe_interval=60, fallback_ttl=60, fallback_max_size=10
+        )
+        await redis_manager.client.set('stale', 'value')
+        mocker.patch.object(redis_manager.client, 'delete', side_effect=ConnectionError('Connection refused'))
+
+        await redis_cache.delete('stale')
+        assert not redis_cache.is_open
+
+        mocker.stopall()
+        assert await redis_cache.get('stale') is None
+        assert await redis_manager.client.get('stale') is None
@@ -0,0 +1,18 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+from app.components.redis import redis_manager
+from app.main import create_app
+
+
+async def test_lifespan_connects_redis_on_startup_and_disconnects_on_shutdown(mocker, redis_uri):
+    mocker.patch.object(redis_manager.settings, 'REDIS_URL', redis_uri)
+    app = create_app()
+
+    async with app.router.lifespan_context(app):
+        assert redis_manager.get_pool_stats() == {'in_use': 0, 'available': 1}
+
+    assert redis_manager._client is None
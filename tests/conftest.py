@@ -76,6 +76,7 @@ environ['ENABLE_CACHE'] = 'false'
 environ['PACT_BROKER_URL'] = ''
 
 # These imports are located here because of ConfigClass, which must first consume the above redefined env vars
+from app.components.redis import redis_manager  # noqa: E402
 from app.main import create_app  # noqa: E402
 from config import ConfigClass  # noqa: E402
 from config import Settings  # noqa: E402
@@ -99,6 +100,8 @@ async def test_async_client(redis_uri) -> AsyncGenerator[AsyncClient]:
     async with AsyncClient(transport=ASGITransport(app=app), base_url='https://bff') as client:
         yield client
 
+    await redis_manager.disconnect()
+
 
 @pytest.fixture
 def requests_mocker():
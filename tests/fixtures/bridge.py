@@ -4,12 +4,16 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from collections.abc import AsyncGenerator
+
 import pytest
 
+from app.components.redis import redis_manager
 from services.bridge import BridgeService
 from services.bridge import get_bridge_service
 
 
 @pytest.fixture
-async def bridge_service(project_service_client, dataset_service_client) -> BridgeService:
-    return await get_bridge_service(project_service_client, dataset_service_client)
+async def bridge_service(project_service_client, dataset_service_client) -> AsyncGenerator[BridgeService]:
+    yield await get_bridge_service(project_service_client, dataset_service_client)
+    await redis_manager.disconnect()
@@ -110,3 +110,18 @@ class TestDatasetServiceClient:
         )
 
         assert response.status_code == 200
+
+    async def test_stream_file_preview_yields_unread_response(self, httpx_mock, fake, dataset_service_client):
+        file_id = fake.uuid4()
+        httpx_mock.add_response(
+            method='GET',
+            url=f'{dataset_service_client.endpoint_v1}/{file_id}/preview/stream?page=1',
+            content=b'preview',
+        )
+
+        async with dataset_service_client.stream_file_preview(file_id, {'page': 1}, {'Range': 'bytes=0-6'}) as response:
+            assert not response.is_stream_consumed
+            content = b''.join([chunk async for chunk in response.aiter_bytes()])
+
+        assert content == b'preview'
+        assert httpx_mock.get_request().headers['range'] == 'bytes=0-6'
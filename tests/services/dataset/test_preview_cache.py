@@ -0,0 +1,91 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import pytest
+
+from services.dataset.preview_cache import PreviewCache
+
+
+@pytest.fixture
+def preview_cache(tmp_path) -> PreviewCache:
+    return PreviewCache(enabled=True, directory=str(tmp_path), max_size=10, max_entry_size=6)
+
+
+async def chunks_of(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+class TestPreviewCache:
+    def test_make_key_depends_on_version_range_and_parameters(self):
+        key = PreviewCache.make_key('file', 'v1', None, {'a': '1'}, stream=True)
+
+        assert key == PreviewCache.make_key('file', 'v1', None, {'a': '1'}, stream=True)
+        assert key != PreviewCache.make_key('file', 'v2', None, {'a': '1'}, stream=True)
+        assert key != PreviewCache.make_key('file', 'v1', 'bytes=0-1', {'a': '1'}, stream=True)
+        assert key != PreviewCache.make_key('file', 'v1', None, {'a': '2'}, stream=True)
+        assert key != PreviewCache.make_key('file', 'v1', None, {'a': '1'}, stream=False)
+
+    async def test_get_returns_stored_preview(self, preview_cache):
+        await preview_cache.put('key', 200, {'content-type': 'text/csv'}, b'a,b')
+
+        cached = await preview_cache.get('key')
+
+        assert cached.status_code == 200
+        assert cached.headers == {'content-type': 'text/csv'}
+        assert list(cached.iter_chunks(2)) == [b'a,', b'b']
+
+    async def test_get_returns_none_when_disabled(self, tmp_path):
+        preview_cache = PreviewCache(enabled=False, directory=str(tmp_path), max_size=10, max_entry_size=10)
+        await preview_cache.put('key', 200, {}, b'a')
+
+        assert await preview_cache.get('key') is None
+
+    async def test_put_skips_entries_above_max_entry_size(self, preview_cache):
+        await preview_cache.put('key', 200, {}, b'1234567')
+
+        assert await preview_cache.get('key') is None
+
+    async def test_put_evicts_least_recently_used_entries_above_max_size(self, preview_cache):
+        await preview_cache.put('first', 200, {}, b'1234')
+        await preview_cache.put('second', 200, {}, b'1234')
+        (await preview_cache.get('first')).read()
+        await preview_cache.put('third', 200, {}, b'1234')
+
+        assert await preview_cache.get('second') is None
+        assert (await preview_cache.get('first')).read() == b'1234'
+        assert (await preview_cache.get('third')).read() == b'1234'
+
+    async def test_get_reads_entries_stored_by_other_instances(self, preview_cache, tmp_path):
+        await preview_cache.put('key', 200, {}, b'a')
+        other = PreviewCache(enabled=True, directory=str(tmp_path), max_size=10, max_entry_size=10)
+
+        assert (await other.get('key')).read() == b'a'
+
+    async def test_put_evicts_entries_of_other_instances_sharing_directory(self, preview_cache, tmp_path):
+        other = PreviewCache(enabled=True, directory=str(tmp_path), max_size=10, max_entry_size=10)
+
+        await preview_cache.put('first', 200, {}, b'1234')
+        await other.put('second', 200, {}, b'1234')
+        await preview_cache.put('third', 200, {}, b'1234')
+
+        assert await other.get('first') is None
+        assert sum(path.stat().st_size for path in tmp_path.iterdir() if not path.suffix) <= 10
+
+    async def test_tee_relays_chunks_and_stores_complete_body(self, preview_cache):
+        relayed = [chunk async for chunk in preview_cache.tee('key', 206, {}, chunks_of(b'ab', b'cd'))]
+
+        assert relayed == [b'ab', b'cd']
+        cached = await preview_cache.get('key')
+        assert cached.status_code == 206
+        assert cached.read() == b'abcd'
+
+    async def test_tee_relays_but_does_not_store_body_above_max_entry_size(self, preview_cache, tmp_path):
+        relayed = [chunk async for chunk in preview_cache.tee('key', 200, {}, chunks_of(b'abcd', b'efgh'))]
+
+        assert relayed == [b'abcd', b'efgh']
+        assert await preview_cache.get('key') is None
+        assert list(tmp_path.iterdir()) == []
@@ -12,6 +12,7 @@ from app.components.exceptions import APIException
 from config import ConfigClass
 from models.models_item import ItemStatus
 from services.meta import async_get_entity_by_id
+from services.meta import get_item_version
 
 MOCK_FILE_DATA = {
     'status': ItemStatus.ACTIVE,
@@ -68,3 +69,15 @@ async def test_async_get_entity_by_id_missing_entity(httpx_mock):
 
     expected_template_error_msg = 'Entity not found'
     assert expected_template_error_msg in exc.value.error_msg
+
+
+@pytest.mark.parametrize(
+    'item,expected_version',
+    [
+        ({'storage': {'version': 'v1'}, 'last_updated_time': 't'}, 'v1'),
+        ({'storage': {'version': None}, 'last_updated_time': 't'}, 't'),
+        ({}, None),
+    ],
+)
+def test_get_item_version_prefers_storage_version(item, expected_version):
+    assert get_item_version(item) == expected_version
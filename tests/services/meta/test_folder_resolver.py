@@ -0,0 +1,111 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import asyncio
+import re
+
+import pytest
+
+from app.components.exceptions import APIException
+from config import ConfigClass
+from services.meta.folder_resolver import FolderPathResolver
+
+SEARCH_URL = re.compile(r'^' + ConfigClass.METADATA_SERVICE + 'items/search/.*$')
+
+
+@pytest.fixture
+def folder_path_resolver() -> FolderPathResolver:
+    return FolderPathResolver(enabled=True, ttl=30, negative_ttl=30, max_size=2)
+
+
+class TestFolderPathResolver:
+    @pytest.mark.parametrize(
+        'path,expected_parent_path,expected_name',
+        [('admin', '', 'admin'), ('admin/folder', 'admin', 'folder'), ('/admin/a/b/', 'admin/a', 'b')],
+    )
+    def test_split_path_returns_parent_path_and_name(self, path, expected_parent_path, expected_name):
+        assert FolderPathResolver.split_path(path) == (expected_parent_path, expected_name)
+
+    async def test_resolve_queries_metadata_service_once_for_same_path(self, folder_path_resolver, httpx_mock):
+        folder = {'id': 'folder-id', 'name': 'folder', 'parent_path': 'admin'}
+        httpx_mock.add_response(method='GET', url=SEARCH_URL, json={'result': [folder]})
+
+        first = await folder_path_resolver.resolve('project', 1, 'admin/folder')
+        second = await folder_path_resolver.resolve('project', 1, 'admin/folder')
+
+        assert first == second == folder
+        requests = httpx_mock.get_requests()
+        assert len(requests) == 1
+        assert requests[0].url.params['parent_path'] == 'admin'
+        assert requests[0].url.params['name'] == 'folder'
+
+    async def test_resolve_caches_missing_items(self, folder_path_resolver, httpx_mock):
+        httpx_mock.add_response(method='GET', url=SEARCH_URL, json={'result': []})
+
+        assert await folder_path_resolver.resolve('project', 0, 'admin/missing') is None
+        assert await folder_path_resolver.resolve('project', 0, 'admin/missing') is None
+        assert len(httpx_mock.get_requests()) == 1
+
+    async def test_resolve_expires_missing_items_after_negative_ttl(self, httpx_mock):
+        folder_path_resolver = FolderPathResolver(enabled=True, ttl=30, negative_ttl=0, max_size=10)
+        httpx_mock.add_response(method='GET', url=SEARCH_URL, json={'result': []})
+        httpx_mock.add_response(method='GET', url=SEARCH_URL, json={'result': [{'id': 'folder-id'}]})
+
+        assert await folder_path_resolver.resolve('project', 0, 'admin/folder') is None
+        await asyncio.sleep(0.01)
+        assert await folder_path_resolver.resolve('project', 0, 'admin/folder') == {'id': 'folder-id'}
+
+    async def test_resolve_shares_single_call_between_concurrent_lookups(self, folder_path_resolver, httpx_mock):
+        httpx_mock.add_response(method='GET', url=SEARCH_URL, json={'result': [{'id': 'folder-id'}]})
+
+        results = await asyncio.gather(*(folder_path_resolver.resolve('project', 0, 'admin') for _ in range(5)))
+
+        assert results == [{'id': 'folder-id'}] * 5
+        assert len(httpx_mock.get_requests()) == 1
+
+    async def test_resolve_raises_exception_when_metadata_service_fails(self, folder_path_resolver, httpx_mock):
+        httpx_mock.add_response(method='GET', url=SEARCH_URL, status_code=500, json={})
+
+        with pytest.raises(APIException) as exc:
+            await folder_path_resolver.resolve('project', 0, 'admin')
+
+        assert exc.value.status_code == 500
+
+    async def test_resolve_evicts_least_recently_used_items_above_max_size(self, folder_path_resolver, httpx_mock):
+        httpx_mock.add_response(method='GET', url=SEARCH_URL, json={'result': [{'id': 'folder-id'}]})
+
+        for path in ('a', 'b', 'a', 'c', 'a'):
+            await folder_path_resolver.resolve('project', 0, path)
+
+        assert len(httpx_mock.get_requests()) == 3
+
+    async def test_invalidate_evicts_path_and_its_descendants_only(self, folder_path_resolver, httpx_mock):
+        folder_path_resolver.max_size = 10
+        httpx_mock.add_response(method='GET', url=SEARCH_URL, json={'result': [{'id': 'folder-id'}]})
+        for path in ('admin', 'admin/a', 'admin/a/b', 'admin/ab'):
+            await folder_path_resolver.resolve('project', 0, path)
+
+        folder_path_resolver.invalidate('project', 0, 'admin/a')
+
+        assert {key[2] for key in folder_path_resolver._entries} == {'admin', 'admin/ab'}
+
+    async def test_invalidate_without_path_evicts_whole_project(self, folder_path_resolver, httpx_mock):
+        httpx_mock.add_response(method='GET', url=SEARCH_URL, json={'result': [{'id': 'folder-id'}]})
+        await folder_path_resolver.resolve('project', 0, 'admin')
+        await folder_path_resolver.resolve('other', 0, 'admin')
+
+        folder_path_resolver.invalidate('project')
+
+        assert {key[0] for key in folder_path_resolver._entries} == {'other'}
+
+    async def test_resolve_skips_cache_when_disabled(self, httpx_mock):
+        folder_path_resolver = FolderPathResolver(enabled=False, ttl=30, negative_ttl=30, max_size=10)
+        httpx_mock.add_response(method='GET', url=SEARCH_URL, json={'result': [{'id': 'folder-id'}]})
+
+        await folder_path_resolver.resolve('project', 0, 'admin')
+        await folder_path_resolver.resolve('project', 0, 'admin')
+
+        assert len(httpx_mock.get_requests()) == 2
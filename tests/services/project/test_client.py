@@ -4,6 +4,9 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
+from app.components.redis import redis_manager
+from config import ConfigClass
+
 
 class TestProjectServiceClient:
     async def test_convert_project_codes_into_ids_returns_list_of_project_ids(
@@ -17,3 +20,19 @@ class TestProjectServiceClient:
         )
 
         assert received_project_ids == [project_1.id, project_2.id]
+
+    async def test_get_caches_project_using_shared_redis_client(
+        self, monkeypatch, redis_uri, project_factory, project_service_client
+    ):
+        monkeypatch.setattr(ConfigClass, 'REDIS_URL', redis_uri)
+        project_service_client.enable_cache = True
+        project = project_factory.mock_retrieval_by_code()
+
+        try:
+            await project_service_client.get(code=project.code)
+
+            assert project_service_client.redis is redis_manager.client
+            assert await redis_manager.client.exists(f'project_client-{project.code}')
+        finally:
+            await redis_manager.client.delete(f'project_client-{project.code}')
+            await redis_manager.disconnect()
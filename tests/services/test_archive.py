@@ -0,0 +1,70 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import pytest
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError
+
+from services.archive import ArchiveListingCache
+from services.archive import paginate_listing
+
+
+@pytest.fixture
+async def redis(redis_uri) -> Redis:
+    redis = Redis.from_url(redis_uri)
+    yield redis
+    await redis.flushall()
+    await redis.close()
+
+
+@pytest.fixture
+def archive_listing_cache() -> ArchiveListingCache:
+    return ArchiveListingCache(enabled=True, ttl=60, local_ttl=60, local_max_size=10)
+
+
+class TestArchiveListingCache:
+    async def test_get_returns_listing_stored_by_another_worker(self, redis, archive_listing_cache):
+        listing = {'code': 200, 'result': {'file.txt': {'is_dir': False, 'size': 1}}}
+        await ArchiveListingCache(enabled=True, ttl=60, local_ttl=60, local_max_size=10).set(
+            redis, 'file-id', 'v1', listing
+        )
+
+        assert await archive_listing_cache.get(redis, 'file-id', 'v1') == listing
+        assert await archive_listing_cache.get(redis, 'file-id', 'v2') is None
+
+    async def test_set_stores_listing_with_expiration(self, redis, archive_listing_cache):
+        await archive_listing_cache.set(redis, 'file-id', 'v1', {'result': {}})
+
+        assert 0 < await redis.ttl(ArchiveListingCache.make_key('file-id', 'v1')) <= 60
+
+    async def test_get_returns_local_listing_when_redis_is_unavailable(self, mocker, archive_listing_cache):
+        redis = mocker.AsyncMock(Redis)
+        redis.get.side_effect = ConnectionError
+        redis.set.side_effect = ConnectionError
+
+        await archive_listing_cache.set(redis, 'file-id', 'v1', {'result': {}})
+
+        assert await archive_listing_cache.get(redis, 'file-id', 'v1') == {'result': {}}
+        assert await archive_listing_cache.get(redis, 'file-id', 'v2') is None
+
+    async def test_get_returns_none_when_disabled(self, redis):
+        archive_listing_cache = ArchiveListingCache(enabled=False, ttl=60, local_ttl=60, local_max_size=10)
+        await archive_listing_cache.set(redis, 'file-id', 'v1', {'result': {}})
+
+        assert await archive_listing_cache.get(redis, 'file-id', 'v1') is None
+
+
+@pytest.mark.parametrize(
+    'result,page,expected_result',
+    [
+        ({'a': 1, 'b': 2, 'c': 3}, 1, {'c': 3}),
+        (['a', 'b', 'c'], 0, ['a', 'b']),
+    ],
+)
+def test_paginate_listing_returns_page_of_top_level_entries(result, page, expected_result):
+    listing = paginate_listing({'code': 200, 'result': result}, page, 2)
+
+    assert listing == {'code': 200, 'result': expected_result, 'page': page, 'total': 3, 'num_of_pages': 2}
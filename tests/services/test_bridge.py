@@ -4,10 +4,10 @@
 # Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
 # You may not use this file except in compliance with the License.
 
-from unittest.mock import AsyncMock
-
 import pytest
+from redis.asyncio import Redis
 
+from app.components.cache import InMemoryCache
 from config import ConfigClass
 from services.bridge import BridgeService
 
@@ -18,51 +18,99 @@ KEY = f'{ENTITY}:{USERNAME}:visits'
 
 
 @pytest.fixture
-def mocked_redis(mocker):
-    redis = mocker.patch.object(BridgeService, 'REDIS', side_effect=AsyncMock())
-    redis.ltrim.side_effect = AsyncMock()
-    redis.lpush.side_effect = AsyncMock()
-    redis.lrange.side_effect = AsyncMock()
-    redis.lrem.side_effect = AsyncMock()
-    return redis
+async def redis(mocker, redis_uri):
+    redis = Redis.from_url(redis_uri, decode_responses=True)
+    mocker.patch.object(BridgeService, 'REDIS', redis)
+    yield redis
+    await redis.flushall()
+    await redis.close()
 
 
-async def test_bridge_service_add_visit_calls_ltrim_lpush_when_key_doest_exist(
-    mocked_redis, httpx_mock, bridge_service
-):
-    mocked_redis.exists.side_effect = AsyncMock(return_value=False)
+@pytest.fixture
+def dataset_exists(httpx_mock):
     httpx_mock.add_response(
         method='GET',
         url=f'{ConfigClass.DATASET_SERVICE}datasets/{CODE}',
         status_code=200,
         json={'code': 'any'},
     )
+
+
+async def test_bridge_service_add_visit_pushes_code_to_head_without_duplicates(redis, dataset_exists, bridge_service):
+    await redis.rpush(KEY, 'other', CODE)
+
+    await bridge_service.add_visit(ENTITY, CODE, USERNAME)
+
+    assert await redis.lrange(KEY, 0, -1) == [CODE, 'other']
+
+
+async def test_bridge_service_add_visit_caps_visits_at_limit(redis, dataset_exists, bridge_service):
+    await redis.rpush(KEY, *(f'code_{i}' for i in range(bridge_service.VISITS_LIMIT)))
+
+    await bridge_service.add_visit(ENTITY, CODE, USERNAME)
+
+    visits = await redis.lrange(KEY, 0, -1)
+    assert len(visits) == bridge_service.VISITS_LIMIT
+    assert visits[0] == CODE
+    assert f'code_{bridge_service.VISITS_LIMIT - 1}' not in visits
+
+
+async def test_bridge_service_add_visit_checks_entity_existence_once_when_cache_is_enabled(
+    mocker, redis, dataset_exists, httpx_mock, bridge_service
+):
+    mocker.patch.object(BridgeService, 'EXISTING_ENTITIES', InMemoryCache(ttl=60, max_size=10))
+
+    await bridge_service.add_visit(ENTITY, CODE, USERNAME)
     await bridge_service.add_visit(ENTITY, CODE, USERNAME)
 
-    mocked_redis.ltrim.assert_called_with(KEY, 0, bridge_service.VISITS_LIMIT - 1)
-    mocked_redis.lrem.assert_called_with(KEY, 0, CODE)
-    mocked_redis.lpush.assert_called_with(KEY, CODE)
+    assert len(httpx_mock.get_requests()) == 1
+
+
+async def test_bridge_service_get_visits_returns_last_visits(redis, bridge_service):
+    await redis.rpush(KEY, 'code_1', 'code_2', 'code_3')
+
+    assert await bridge_service.get_visits(ENTITY, USERNAME, 2) == ['code_1', 'code_2']
+    assert await bridge_service.get_visits('other', USERNAME, 2) == []
+
+
+async def test_bridge_service_sort_result_by_visit_codes_order_skips_missing_entities(bridge_service):
+    result = await bridge_service.sort_result_by_visit_codes_order(
+        ['code_3', 'code_1', 'code_2'], [{'code': 'code_1'}, {'code': 'code_2'}]
+    )
+
+    assert result == [{'code': 'code_1'}, {'code': 'code_2'}]
 
 
-async def test_bridge_service_add_visit_calls_lpush_when_key_exist(mocked_redis, httpx_mock, bridge_service):
-    mocked_redis.exists.side_effect = AsyncMock(return_value=True)
+async def test_bridge_service_hydrate_visits_fetches_only_missing_codes(mocker, httpx_mock, bridge_service):
+    mocker.patch.object(BridgeService, 'VISITED_ENTITIES', InMemoryCache(ttl=60, max_size=10))
+    bridge_service.VISITED_ENTITIES.set(('project', 'code_1'), {'code': 'code_1', 'name': 'cached'})
     httpx_mock.add_response(
         method='GET',
-        url=f'{ConfigClass.DATASET_SERVICE}datasets/{CODE}',
-        status_code=200,
-        json={'code': 'any'},
+        url=f'{ConfigClass.PROJECT_SERVICE}/v1/projects/?code_any=code_2',
+        json={'result': [{'code': 'code_2', 'name': 'fetched'}], 'total': 1, 'page': 0, 'num_of_pages': 1},
     )
-    await bridge_service.add_visit(ENTITY, CODE, USERNAME)
 
-    mocked_redis.ltrim.call_count = 0
-    mocked_redis.lrem.assert_called_with(KEY, 0, CODE)
-    mocked_redis.lpush.assert_called_with(KEY, CODE)
+    status_code, content = await bridge_service.hydrate_visits('project', ['code_2', 'code_1'])
+    assert status_code == 200
+    assert content == {
+        'result': [{'code': 'code_2', 'name': 'fetched'}, {'code': 'code_1', 'name': 'cached'}],
+        'total': 2,
+    }
 
+    status_code, content = await bridge_service.hydrate_visits('project', ['code_1', 'code_2'])
+    assert content == {
+        'result': [{'code': 'code_1', 'name': 'cached'}, {'code': 'code_2', 'name': 'fetched'}],
+        'total': 2,
+    }
+    assert len(httpx_mock.get_requests()) == 1
 
-async def test_bridge_service_get_visits_calls_lrange(mocked_redis, bridge_service):
-    mocked_redis.exists.side_effect = AsyncMock(return_value=True)
-    last = 2
 
-    await bridge_service.get_visits(ENTITY, USERNAME, last)
+async def test_bridge_service_hydrate_visits_returns_service_error(httpx_mock, bridge_service):
+    httpx_mock.add_response(
+        method='GET',
+        url=f'{ConfigClass.DATASET_SERVICE}datasets/?code_any=code_1',
+        status_code=500,
+        json={'error_msg': 'error'},
+    )
 
-    mocked_redis.lrange.assert_called_with(KEY, 0, last - 1)
+    assert await bridge_service.hydrate_visits('dataset', ['code_1']) == (500, {'error_msg': 'error'})
@@ -0,0 +1,62 @@
+# Copyright (C) 2022-Present Indoc Systems
+#
+# Licensed under the GNU AFFERO GENERAL PUBLIC LICENSE,
+# Version 3.0 (the "License") available at https://www.gnu.org/licenses/agpl-3.0.en.html.
+# You may not use this file except in compliance with the License.
+
+import pytest
+
+from services.upload.client import UploadServiceClient
+from services.upload.client import UploadServiceException
+
+
+@pytest.fixture
+def upload_service_client(settings) -> UploadServiceClient:
+    return UploadServiceClient(settings.UPLOAD_SERVICE, settings.SERVICE_CLIENT_TIMEOUT, 2)
+
+
+class TestUploadServiceClient:
+    async def test_generate_presigned_urls_returns_url_for_each_unique_chunk(
+        self, upload_service_client, httpx_mock, settings
+    ):
+        for chunk_number in (1, 2, 3):
+            httpx_mock.add_response(
+                method='GET',
+                url=(
+                    f'{settings.UPLOAD_SERVICE}/v1/files/chunks/presigned?'
+                    f'bucket=gr-project&key=file&upload_id=upload&chunk_number={chunk_number}'
+                ),
+                json={'result': f'http://minio/chunk-{chunk_number}'},
+            )
+
+        result = await upload_service_client.generate_presigned_urls('gr-project', 'file', 'upload', [3, 1, 2, 1])
+
+        assert result == {
+            1: 'http://minio/chunk-1',
+            2: 'http://minio/chunk-2',
+            3: 'http://minio/chunk-3',
+        }
+        assert len(httpx_mock.get_requests()) == 3
+
+    async def test_generate_presigned_urls_raises_exception_when_any_chunk_fails(
+        self, upload_service_client, httpx_mock, settings
+    ):
+        httpx_mock.add_response(
+            method='GET',
+            url=(
+                f'{settings.UPLOAD_SERVICE}/v1/files/chunks/presigned?'
+                f'bucket=gr-project&key=file&upload_id=upload&chunk_number=1'
+            ),
+            json={'result': 'http://minio/chunk-1'},
+        )
+        httpx_mock.add_response(
+            method='GET',
+            url=(
+                f'{settings.UPLOAD_SERVICE}/v1/files/chunks/presigned?'
+                f'bucket=gr-project&key=file&upload_id=upload&chunk_number=2'
+            ),
+            status_code=500,
+        )
+
+        with pytest.raises(UploadServiceException):
+            await upload_service_client.generate_presigned_urls('gr-project', 'file', 'upload', [1, 2])